@@ -5,8 +5,16 @@ RESOURCE.csv 생성 및 RESERVATION.csv에 RESOURCE_ID 배정
 
 import pandas as pd
 from datetime import datetime, timedelta
+import os
 import sys
 
+from data_loader import DATA_DIR, data_path, load_exam_master, load_reservation, load_resource_capability
+from incremental_assigner import PARTITION_DIR, write_day_partitions
+from resource_analytics import analyze_utilization, write_analytics
+from resource_assigner import assign_resources, find_double_bookings, resource_lists_from_counts
+from resource_calendar import load_calendar
+from resource_capability import CapabilityMatrix, assign_with_capabilities, capability_violations
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # =============================================================================
@@ -41,7 +49,7 @@ for equip_type in sorted(RESOURCE_COUNTS.keys()):
         })
 
 resource_df = pd.DataFrame(resources)
-resource_df.to_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESOURCE.csv', index=False, encoding='utf-8-sig')
+resource_df.to_csv(data_path('RESOURCE'), index=False, encoding='utf-8-sig')
 
 print(f'총 자원 수: {len(resource_df)}개')
 for equip_type in sorted(RESOURCE_COUNTS.keys()):
@@ -54,50 +62,33 @@ print('\n' + '='*70)
 print('2. RESERVATION.csv에 RESOURCE_ID 배정')
 print('='*70)
 
-reservation = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESERVATION.csv')
-reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
-reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(reservation['DURATION_MIN'], unit='m')
-
-# 자원 배정 결과 저장
-reservation['RESOURCE_ID'] = ''
+reservation = load_reservation()
 
 # 장비유형별 자원 목록
-resource_lists = {}
-for equip_type in RESOURCE_COUNTS.keys():
-    resource_lists[equip_type] = [f'{equip_type}_{i:02d}' for i in range(1, RESOURCE_COUNTS[equip_type] + 1)]
-
-# 각 날짜/장비유형별로 자원 배정
-for equip_type in sorted(RESOURCE_COUNTS.keys()):
-    equip_mask = reservation['EQUIPMENT_TYPE'] == equip_type
-    equip_indices = reservation[equip_mask].index.tolist()
-
-    # 날짜별로 처리
-    dates = reservation.loc[equip_mask, 'RESERVATION_DATE'].unique()
-
-    for date in dates:
-        date_mask = equip_mask & (reservation['RESERVATION_DATE'] == date)
-        day_data = reservation[date_mask].sort_values('RESERVATION_DATETIME')
-
-        # 각 자원별 종료 시간 추적
-        resource_end_times = {res_id: pd.Timestamp.min for res_id in resource_lists[equip_type]}
-
-        for idx in day_data.index:
-            start_time = reservation.loc[idx, 'RESERVATION_DATETIME']
-            end_time = reservation.loc[idx, 'END_DATETIME']
-
-            # 사용 가능한 자원 찾기 (시작 시간 이전에 종료된 자원)
-            available = [res_id for res_id, end in resource_end_times.items() if end <= start_time]
-
-            if available:
-                # 가장 먼저 비는 자원 선택
-                selected = min(available, key=lambda x: resource_end_times[x])
-            else:
-                # 모든 자원이 사용 중이면 가장 빨리 끝나는 자원 선택 (에러 케이스)
-                selected = min(resource_end_times.keys(), key=lambda x: resource_end_times[x])
-                print(f'  경고: 자원 부족 - {date}, {equip_type}, {start_time}')
-
-            reservation.loc[idx, 'RESOURCE_ID'] = selected
-            resource_end_times[selected] = end_time
+resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+
+# 검사-자원 수행 가능 매트릭스 (RESOURCE_CAPABILITY.csv가 있을 때만, 없으면 장비유형 단위)
+capability = None
+if os.path.exists(data_path('RESOURCE_CAPABILITY')):
+    capability = CapabilityMatrix(resource_df, load_exam_master(), load_resource_capability())
+
+# 자원 캘린더 (RESOURCE_CALENDAR.csv가 있을 때만): 운영시간 외/점검 구간에는 배정하지 않음
+calendar = load_calendar(resource_df)
+if calendar is not None:
+    print('자원 캘린더 적용 (운영시간/점검/휴무)')
+
+if capability is None:
+    # (장비유형, 날짜) 그룹별 최소 힙 배정 → 한 번에 컬럼 대입
+    resource_ids, shortages = assign_resources(reservation, resource_lists, calendar)
+    for date, equip_type, start_time in shortages:
+        print(f'  경고: 자원 부족 - {date}, {equip_type}, {start_time}')
+else:
+    # 수행 가능 자원 제약 탐욕 배정 + 증가 경로 보정
+    resource_ids, shortages, repairs = assign_with_capabilities(reservation, capability, calendar=calendar)
+    for date, equip_type, start_time, exam_cd in shortages:
+        print(f'  경고: 수행 가능 자원 부족 - {date}, {equip_type}, {start_time}, {exam_cd}')
+    print(f'수행 가능 자원 제약 적용: 보정 배치 {repairs}건, 자원 부족 {len(shortages)}건 (RESOURCE_ID 미배정)')
+reservation['RESOURCE_ID'] = resource_ids
 
 print('자원 배정 완료')
 
@@ -107,11 +98,14 @@ columns = ['RESERVATION_ID', 'ORDER_ID', 'PATIENT_ID', 'ORDER_DATE', 'EXAM_CD',
            'EQUIPMENT_TYPE', 'RESOURCE_ID']
 
 # END_DATETIME 제거 후 저장
-reservation = reservation[columns]
-reservation.to_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESERVATION.csv', index=False, encoding='utf-8-sig')
+reservation[columns].to_csv(data_path('RESERVATION'), index=False, encoding='utf-8-sig')
 
 print(f'RESERVATION.csv 업데이트 완료: {len(reservation)}건')
 
+# 증분 배정용 날짜 파티션 재구축 (incremental_assigner.py)
+n_partitions = write_day_partitions(reservation, PARTITION_DIR)
+print(f'날짜 파티션 저장: {PARTITION_DIR} ({n_partitions}일)')
+
 # =============================================================================
 # 4. 자원 충돌 검증
 # =============================================================================
@@ -119,34 +113,28 @@ print('\n' + '='*70)
 print('3. 자원 충돌 검증')
 print('='*70)
 
-# 다시 로드하여 검증
-reservation = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESERVATION.csv')
-reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
-reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(reservation['DURATION_MIN'], unit='m')
-
-conflict_count = 0
-
-for resource_id in reservation['RESOURCE_ID'].unique():
-    res_data = reservation[reservation['RESOURCE_ID'] == resource_id].copy()
+# 같은 자원에서 시간이 겹치는 예약 쌍 전부
+conflicts = find_double_bookings(reservation)
 
-    for date in res_data['RESERVATION_DATE'].unique():
-        day_data = res_data[res_data['RESERVATION_DATE'] == date].sort_values('RESERVATION_DATETIME')
+for row in conflicts.head(5).itertuples(index=False):
+    print(f'  충돌: {row.RESOURCE_ID}, {row.START_1.strftime("%Y-%m-%d")}')
+    print(f'    {row.EXAM_CD_1} ({row.RESERVATION_ID_1}): {row.START_1.strftime("%H:%M")} ~ {row.END_1.strftime("%H:%M")}')
+    print(f'    {row.EXAM_CD_2} ({row.RESERVATION_ID_2}): {row.START_2.strftime("%H:%M")} ~ {row.END_2.strftime("%H:%M")}')
 
-        for i in range(len(day_data) - 1):
-            row1 = day_data.iloc[i]
-            row2 = day_data.iloc[i + 1]
-
-            if row1['END_DATETIME'] > row2['RESERVATION_DATETIME']:
-                conflict_count += 1
-                if conflict_count <= 5:
-                    print(f'  충돌: {resource_id}, {date}')
-                    print(f'    {row1["EXAM_CD"]}: {row1["RESERVATION_TIME"]} ~ {row1["END_DATETIME"].strftime("%H:%M")}')
-                    print(f'    {row2["EXAM_CD"]}: {row2["RESERVATION_TIME"]} ~ {row2["END_DATETIME"].strftime("%H:%M")}')
-
-if conflict_count == 0:
+if len(conflicts) == 0:
     print('자원 충돌 없음 ✓')
 else:
-    print(f'자원 충돌: {conflict_count}건')
+    print(f'자원 충돌: {len(conflicts)}건')
+
+# 수행할 수 없는 자원에 배정된 예약
+if capability is not None:
+    violations = capability_violations(reservation, capability)
+    for row in violations.head(5).itertuples(index=False):
+        print(f'  수행 불가: {row.RESOURCE_ID}, {row.RESERVATION_ID}, {row.EXAM_CD} {row.EXAM_NM}')
+    if len(violations) == 0:
+        print('수행 가능 자원 위반 없음 ✓')
+    else:
+        print(f'수행 가능 자원 위반: {len(violations)}건')
 
 # =============================================================================
 # 5. 자원 사용 통계
@@ -167,3 +155,12 @@ for equip_type in sorted(RESOURCE_COUNTS.keys()):
         pct = row['COUNT'] / total * 100
         bar = '█' * int(pct / 5)
         print(f"  {row['RESOURCE_ID']}: {row['COUNT']:4}건 ({pct:5.1f}%) {bar}")
+
+# 사용률 / 단편화 (운영시간 내 사용·유휴 시간, 유휴 구간 분포)
+analytics = analyze_utilization(reservation, resource_df['RESOURCE_ID'])
+analytics_paths = write_analytics(analytics, os.path.join(DATA_DIR, 'RESOURCE_UTILIZATION'))
+
+print('\n### 자원별 사용률 / 유휴 구간 ###')
+print(analytics['summary'][['RESOURCE_ID', 'BOOKINGS', 'UTILIZATION', 'IDLE_GAPS', 'SHORT_GAPS',
+                            'GAP_P50_MIN', 'GAP_P90_MIN']].to_string(index=False))
+print(f"\n분석 결과 저장: {', '.join(os.path.basename(p) for p in analytics_paths)}")
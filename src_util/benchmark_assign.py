@@ -0,0 +1,582 @@
+# -*- coding: utf-8 -*-
+"""
+자원 배정 벤치마크
+- 기존 방식: 장비유형 × 날짜마다 전체 마스크, 행마다 .loc 대입, dict 선형 min()
+- 힙 방식: resource_assigner.assign_resources (groupby 1회 + 최소 힙 + 컬럼 대입)
+- 두 방식의 배정 결과 일치 여부 확인
+- 이중 배정 검증: 자원/날짜별 iloc 인접 비교 vs find_double_bookings (임의 데이터, 행 수별)
+- 증분 배정: 예약 4건 추가 시 전체 재배정+전체 저장 vs IncrementalAssigner (upsert + 변경 파티션 저장)
+- 사용률/단편화 분석: analyze_utilization 행 수별 시간 (임의 데이터, 여러 해)
+- 수행 가능 자원 제약 배정: 힙 vs 제약 탐욕만 vs 탐욕+증가 경로 보정 (시간, 부족 건수, 위반/충돌 검증)
+  + 보정 범위 확인 (막는 예약 1건은 옮김, 2건이면 옮기지 않고 부족)
+- 자원 캘린더: 캘린더 미적용 vs 적용 배정 시간, 점검 구간 1건 추가(block) + 가용 구간 조회 비용
+- 슬롯 탐색: 날짜마다 예약 DataFrame 필터 + 자원별 빈 구간 계산 vs FreeIntervalIndex.earliest_fit (3개월 범위)
+- 점유 배열: OccupancyCube 구축 + 검사별 (검사 운영시간 안) 연속 빈 슬롯 전체 조회 vs 자원 · 날짜별 빈 구간 순회
+
+사용법:
+    python benchmark_assign.py [TARGET ...]
+    python benchmark_assign.py overlap
+    python benchmark_assign.py incremental [TARGET ...]
+    python benchmark_assign.py analytics
+    python benchmark_assign.py capability [TARGET ...]
+    python benchmark_assign.py calendar [TARGET ...]
+    python benchmark_assign.py slots [TARGET ...]
+    python benchmark_assign.py cube [TARGET ...]
+"""
+
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import generate_reservation as gen
+from data_loader import TABLE_SPECS, apply_types, load_resource_capability
+from free_interval_index import FreeIntervalIndex
+from incremental_assigner import RESERVATION_COLUMNS, IncrementalAssigner
+from occupancy import SLOT_MIN, OccupancyCube, slots_needed
+from resource_analytics import analyze_utilization
+from resource_assigner import assign_resources, find_double_bookings, resource_lists_from_counts
+from resource_calendar import ResourceCalendar, free_windows, load_calendar
+from resource_capability import CapabilityMatrix, _DaySchedule, assign_with_capabilities, capability_violations
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+ASSIGN_TARGETS = [10000, 100000]
+RESOURCE_COUNTS = {'CT': 4, 'MRI': 5, 'US': 4, 'NM': 4, 'ENDO': 5, 'FUNC': 8, 'XRAY': 3, 'FLUORO': 3}
+
+OVERLAP_SIZES = [12_000, 100_000, 1_000_000]
+OVERLAP_LEGACY_MAX = 100_000     # 기존 검증은 이 행 수까지만 측정
+
+INCREMENTAL_TARGETS = [10000, 100000]
+ANALYTICS_SIZES = [100_000, 1_000_000, 3_000_000]
+CAPABILITY_TARGETS = [10000, 100000, 1000000]
+CALENDAR_TARGETS = [10000, 100000]
+CALENDAR_BLOCKS = 10000           # 점검 구간 추가 횟수
+SLOT_TARGETS = [10000, 100000]
+SLOT_HORIZON_DAYS = 91            # 슬롯 탐색 범위 (첫 예약일부터)
+SLOT_DURATIONS = [20, 60, 240]    # 장비유형마다 이 소요시간으로 첫 슬롯 조회
+SLOT_REPEATS = 200                # 인덱스 조회 반복 (µs 측정)
+CUBE_TARGETS = [10000, 100000]
+CUBE_CHECKS = 10                  # 빈 구간 기준 결과와 대조할 검사 수 (앞에서부터)
+NEW_BOOKINGS = [      # scenario_new_patient.py P999999 처방 4건
+    ('R99990001', '2026-02-10 08:30', 30, 'ENDO', 'SC030010'),
+    ('R99990002', '2026-02-10 10:00', 20, 'CT', 'RC060003'),
+    ('R99990003', '2026-02-11 09:00', 45, 'MRI', 'RM010029'),
+    ('R99990004', '2026-02-11 10:00', 20, 'US', 'RU010003'),
+]
+
+
+def legacy_assign(reservation, resource_lists):
+    """기존 assign_resource.py 배정 루프 (결과를 RESOURCE_ID 컬럼에 기록)"""
+    reservation['RESOURCE_ID'] = ''
+    for equip_type in sorted(resource_lists.keys()):
+        equip_mask = reservation['EQUIPMENT_TYPE'] == equip_type
+        dates = reservation.loc[equip_mask, 'RESERVATION_DATE'].unique()
+
+        for date in dates:
+            date_mask = equip_mask & (reservation['RESERVATION_DATE'] == date)
+            day_data = reservation[date_mask].sort_values('RESERVATION_DATETIME')
+
+            resource_end_times = {res_id: pd.Timestamp.min for res_id in resource_lists[equip_type]}
+
+            for idx in day_data.index:
+                start_time = reservation.loc[idx, 'RESERVATION_DATETIME']
+                end_time = reservation.loc[idx, 'END_DATETIME']
+
+                available = [res_id for res_id, end in resource_end_times.items() if end <= start_time]
+                if available:
+                    selected = min(available, key=lambda x: resource_end_times[x])
+                else:
+                    selected = min(resource_end_times.keys(), key=lambda x: resource_end_times[x])
+
+                reservation.loc[idx, 'RESOURCE_ID'] = selected
+                resource_end_times[selected] = end_time
+    return reservation['RESOURCE_ID'].to_numpy()
+
+
+def legacy_double_bookings(reservation):
+    """기존 assign_resource.py 자원 충돌 검증 (자원/날짜별 인접 쌍) → 충돌 건수"""
+    conflict_count = 0
+    for resource_id in reservation['RESOURCE_ID'].unique():
+        res_data = reservation[reservation['RESOURCE_ID'] == resource_id].copy()
+        for date in res_data['RESERVATION_DATE'].unique():
+            day_data = res_data[res_data['RESERVATION_DATE'] == date].sort_values('RESERVATION_DATETIME')
+            for i in range(len(day_data) - 1):
+                row1 = day_data.iloc[i]
+                row2 = day_data.iloc[i + 1]
+                if row1['END_DATETIME'] > row2['RESERVATION_DATETIME']:
+                    conflict_count += 1
+    return conflict_count
+
+
+def make_random_assignment(n_rows, seed=0, overlap_rate=0.005):
+    """자원 36대에 이어 붙인 임의 배정 데이터 (검사 사이 0~30분 간격, overlap_rate 비율은 10분 당겨 겹침)"""
+    rng = np.random.default_rng(seed)
+    resource_ids = np.array([rid for ids in resource_lists_from_counts(RESOURCE_COUNTS).values() for rid in ids])
+    resource = rng.integers(0, len(resource_ids), n_rows)
+    duration = rng.choice([5, 10, 15, 20, 30, 40, 60, 120], n_rows)
+    gap = rng.integers(0, 4, n_rows) * 10
+    gap[rng.random(n_rows) < overlap_rate] = -10
+
+    # 자원별로 (앞 검사 종료 + 간격)에 다음 검사 시작
+    order = np.argsort(resource, kind='stable')
+    step = (duration + gap)[order]
+    offset = np.cumsum(step) - step
+    first = np.r_[True, resource[order][1:] != resource[order][:-1]]
+    offset -= np.maximum.accumulate(np.where(first, offset, 0))
+    start_min = np.empty(n_rows, dtype=np.int64)
+    start_min[order] = np.maximum(offset, 0)
+
+    start = pd.Timestamp('2026-01-01 08:00') + pd.to_timedelta(start_min, unit='m')
+    df = pd.DataFrame({
+        'RESERVATION_ID': [f'R{i:08d}' for i in range(n_rows)],
+        'EXAM_CD': rng.choice(['A', 'B', 'C'], n_rows),
+        'RESERVATION_DATETIME': start,
+        'RESERVATION_DATE': start.strftime('%Y-%m-%d'),
+        'RESOURCE_ID': resource_ids[resource],
+        'DURATION_MIN': duration,
+    })
+    df['END_DATETIME'] = df['RESERVATION_DATETIME'] + pd.to_timedelta(df['DURATION_MIN'], unit='m')
+    return df
+
+
+def brute_force_pairs(reservation):
+    """자원별 모든 쌍 비교 (정답 확인용) → {(RESERVATION_ID, RESERVATION_ID)}"""
+    pairs = set()
+    for _, group in reservation.groupby('RESOURCE_ID'):
+        rows = list(group[['RESERVATION_ID', 'RESERVATION_DATETIME', 'END_DATETIME']].itertuples(index=False))
+        for a in range(len(rows)):
+            for b in range(a + 1, len(rows)):
+                if rows[a][1] < rows[b][2] and rows[b][1] < rows[a][2]:
+                    pairs.add(tuple(sorted((rows[a][0], rows[b][0]))))
+    return pairs
+
+
+def bench_overlap():
+    print('='*70)
+    print('자원 이중 배정 검증 시간')
+    print('='*70)
+
+    # 정답 확인: 자원별 전체 쌍 비교와 같은 쌍 집합인지
+    small = make_random_assignment(3000, seed=1)
+    found = find_double_bookings(small)
+    found_pairs = {tuple(sorted(p)) for p in zip(found['RESERVATION_ID_1'], found['RESERVATION_ID_2'])}
+    print(f'정답 확인 (3,000행): 겹침 {len(found_pairs)}쌍, 전체 쌍 비교와 일치: {found_pairs == brute_force_pairs(small)}')
+
+    print(f"\n{'행 수':>10} {'기존(인접)':>12} {'벡터화':>10} {'겹침 쌍':>10} {'기존 건수':>10}")
+    for n_rows in OVERLAP_SIZES:
+        reservation = make_random_assignment(n_rows)
+
+        t0 = time.perf_counter()
+        conflicts = find_double_bookings(reservation)
+        vector_sec = time.perf_counter() - t0
+
+        if n_rows <= OVERLAP_LEGACY_MAX:
+            t0 = time.perf_counter()
+            legacy_count = legacy_double_bookings(reservation)
+            legacy_text = f'{time.perf_counter() - t0:.2f}s'
+        else:
+            legacy_count, legacy_text = '-', '-'
+
+        print(f'{n_rows:>10,} {legacy_text:>12} {vector_sec:>9.3f}s {len(conflicts):>10,} {legacy_count:>10}')
+
+
+def make_reservation(target_total):
+    """생성기로 예약 데이터 생성 → 로더와 같은 타입의 DataFrame (RESOURCE_ID 제외)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        rows, _ = gen.generate_reservations(target_total)
+    df = gen.build_reservation_frame(rows).drop(columns=['RESOURCE_ID'], errors='ignore')
+    return apply_types(df, TABLE_SPECS['RESERVATION'])
+
+
+def bench_assign(targets):
+    resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+
+    print('='*70)
+    print('자원 배정 시간')
+    print('='*70)
+    print(f"{'행 수':>10} {'기존':>10} {'힙':>10} {'배속':>8} {'부족':>6} {'결과 일치':>10}")
+
+    for target_total in targets:
+        reservation = make_reservation(target_total)
+
+        t0 = time.perf_counter()
+        heap_ids, shortages = assign_resources(reservation, resource_lists)
+        heap_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        legacy_ids = legacy_assign(reservation.copy(), resource_lists)
+        legacy_sec = time.perf_counter() - t0
+
+        same = (legacy_ids == heap_ids).all()
+        print(f'{len(reservation):>10,} {legacy_sec:>9.2f}s {heap_sec:>9.3f}s '
+              f'{legacy_sec / heap_sec:>7.0f}x {len(shortages):>6} {str(same):>10}')
+
+
+def new_booking_rows():
+    rows = []
+    for reservation_id, start, duration, equip_type, exam_cd in NEW_BOOKINGS:
+        rows.append({
+            'RESERVATION_ID': reservation_id, 'ORDER_ID': 'O' + reservation_id[1:], 'PATIENT_ID': 'P999999',
+            'ORDER_DATE': '2026-02-01', 'EXAM_CD': exam_cd, 'EXAM_NM': exam_cd,
+            'RESERVATION_DATETIME': start, 'RESERVATION_DATE': start[:10], 'RESERVATION_TIME': start[11:],
+            'DURATION_MIN': duration, 'EQUIPMENT_TYPE': equip_type,
+        })
+    return rows
+
+
+def bench_incremental(targets):
+    resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+
+    print('='*70)
+    print(f'예약 {len(NEW_BOOKINGS)}건 추가 시 배정 + 저장 시간')
+    print('='*70)
+    print(f"{'행 수':>10} {'전체 재배정':>12} {'증분':>10} {'배속':>8} {'저장 파일':>10}")
+
+    for target_total in targets:
+        reservation = make_reservation(target_total)
+        work_dir = tempfile.mkdtemp(prefix='assign_bench_')
+        try:
+            IncrementalAssigner.from_reservation(reservation, resource_lists, work_dir)
+            new_rows = new_booking_rows()
+
+            # 기존 방식: 추가 행 포함 전체 재배정 후 RESERVATION.csv 전체 저장
+            t0 = time.perf_counter()
+            full = pd.concat([reservation, apply_types(pd.DataFrame(new_rows), TABLE_SPECS['RESERVATION'])],
+                             ignore_index=True)
+            full['RESOURCE_ID'], _ = assign_resources(full, resource_lists)
+            full[RESERVATION_COLUMNS].to_csv(os.path.join(work_dir, 'RESERVATION.csv'), index=False, encoding='utf-8-sig')
+            full_sec = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            assigner = IncrementalAssigner(resource_lists, work_dir)
+            assigner.upsert(new_rows)
+            paths = assigner.flush()
+            incremental_sec = time.perf_counter() - t0
+
+            print(f'{len(reservation):>10,} {full_sec:>11.3f}s {incremental_sec:>9.3f}s '
+                  f'{full_sec / incremental_sec:>7.0f}x {len(paths):>10}')
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def bench_analytics():
+    resource_ids = [rid for ids in resource_lists_from_counts(RESOURCE_COUNTS).values() for rid in ids]
+
+    print('='*70)
+    print('자원 사용률/단편화 분석 시간')
+    print('='*70)
+    print(f"{'행 수':>10} {'기간(일)':>9} {'분석':>9} {'일별 행':>10} {'시간대 행':>10} {'유휴 구간':>10}")
+
+    for n_rows in ANALYTICS_SIZES:
+        reservation = make_random_assignment(n_rows)
+        t0 = time.perf_counter()
+        tables = analyze_utilization(reservation, resource_ids)
+        sec = time.perf_counter() - t0
+        n_days = reservation['RESERVATION_DATE'].nunique()
+        print(f"{n_rows:>10,} {n_days:>9,} {sec:>8.2f}s {len(tables['daily']):>10,} "
+              f"{len(tables['hourly']):>10,} {len(tables['gaps']):>10,}")
+
+
+def check_repair_scope():
+    """증가 경로 보정 범위 확인 → (막는 예약 1건: 옮겨서 배치, 막는 예약 2건: 옮기지 않음)
+
+    MR_3T: 3T 검사 가능, MR_GEN: 일반 검사만 / 일반 예약이 MR_3T를 막고 있을 때 3T 예약 배치 (분 단위 구간)
+    """
+    exam_master = pd.DataFrame({'EXAM_CD': ['GEN', 'T3'], 'EXAM_NM': ['MRI', '(3T) MRI'],
+                                'EQUIPMENT_TYPE': ['MRI', 'MRI'], 'CONTRAST_YN': ['N', 'N'], 'SEDATION_YN': ['N', 'N']})
+    resource_df = pd.DataFrame({'RESOURCE_ID': ['MR_3T', 'MR_GEN'], 'EQUIPMENT_TYPE': ['MRI', 'MRI']})
+    capability_df = pd.DataFrame({'RESOURCE_ID': ['MR_3T'], 'CAPABILITY_TYPE': ['TAG'], 'CAPABILITY_VALUE': ['3T']})
+    capability = CapabilityMatrix(resource_df, exam_master, capability_df)
+    exams = {0: 'GEN', 1: 'GEN', 2: 'T3'}
+
+    def allowed_of(pos):
+        return capability.allowed[exams[pos]]
+
+    # 막는 예약 1건 → MR_GEN으로 옮기고 3T 예약을 MR_3T에 배치
+    day = _DaySchedule(capability.resources_by_type['MRI'], capability)
+    day.insert('MR_3T', (0, 60, 0))
+    single = day.place((10, 20, 2), allowed_of(2), allowed_of, 1) and day.placed == {0: 'MR_GEN', 2: 'MR_3T'}
+
+    # 막는 예약 2건 → MR_GEN이 비어 있어도 옮기지 않음 (부족)
+    day = _DaySchedule(capability.resources_by_type['MRI'], capability)
+    day.insert('MR_3T', (0, 30, 0))
+    day.insert('MR_3T', (30, 60, 1))
+    double = not day.place((20, 40, 2), allowed_of(2), allowed_of, 1) and 2 not in day.placed
+    return single, double
+
+
+def bench_capability(targets):
+    resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+    resource_df = pd.DataFrame([{'RESOURCE_ID': rid, 'EQUIPMENT_TYPE': equip_type}
+                                for equip_type, ids in resource_lists.items() for rid in ids])
+    unrestricted = CapabilityMatrix(resource_df, gen.exam_master)
+    capability = CapabilityMatrix(resource_df, gen.exam_master, load_resource_capability())
+
+    single, double = check_repair_scope()
+    print('='*70)
+    print(f'보정 범위: 막는 예약 1건 옮김 {"✓" if single else "✗"}, 2건은 옮기지 않음 {"✓" if double else "✗"}')
+    print('수행 가능 자원 제약 배정 시간 / 자원 부족 건수')
+    print('='*70)
+    print(f"{'행 수':>10} {'힙':>9} {'제약(전체 허용)':>14} {'탐욕만':>9} {'부족':>6} "
+          f"{'탐욕+보정':>9} {'부족':>6} {'보정':>6} {'위반':>5} {'충돌':>5}")
+
+    for target_total in targets:
+        reservation = make_reservation(target_total)
+
+        t0 = time.perf_counter()
+        heap_ids, _ = assign_resources(reservation, resource_lists)
+        heap_sec = time.perf_counter() - t0
+
+        # 모든 자원 허용 → 힙 배정과 결과 일치해야 함 (부족 예약은 힙만 겹치는 자원으로 표시하므로 비교 제외)
+        t0 = time.perf_counter()
+        unrestricted_ids, _, _ = assign_with_capabilities(reservation, unrestricted)
+        unrestricted_sec = time.perf_counter() - t0
+        assigned = unrestricted_ids != ''
+        unrestricted_text = f'{unrestricted_sec:.3f}s ' + (
+            '=' if (unrestricted_ids[assigned] == heap_ids[assigned]).all() else '!=')
+
+        t0 = time.perf_counter()
+        _, greedy_shortages, _ = assign_with_capabilities(reservation, capability, repair_depth=0)
+        greedy_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        resource_ids, shortages, repairs = assign_with_capabilities(reservation, capability)
+        repair_sec = time.perf_counter() - t0
+
+        # 위반 0건, 충돌 0건 (부족 예약은 미배정)
+        reservation['RESOURCE_ID'] = resource_ids
+        violations = capability_violations(reservation, capability)
+        conflicts = len(find_double_bookings(reservation))
+
+        print(f'{len(reservation):>10,} {heap_sec:>8.3f}s {unrestricted_text:>14} {greedy_sec:>8.3f}s '
+              f'{len(greedy_shortages):>6} {repair_sec:>8.3f}s {len(shortages):>6} {repairs:>6} '
+              f'{len(violations):>5} {conflicts:>5}')
+
+
+def bench_calendar(targets):
+    resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+    resource_df = pd.DataFrame([{'RESOURCE_ID': rid, 'EQUIPMENT_TYPE': equip_type}
+                                for equip_type, ids in resource_lists.items() for rid in ids])
+
+    print('='*70)
+    print('자원 캘린더 적용 배정 시간')
+    print('='*70)
+    print(f"{'행 수':>10} {'미적용':>9} {'적용':>9} {'점검 후':>9} {'부족':>6} {'점검 자원 배정':>14}")
+
+    for target_total in targets:
+        reservation = make_reservation(target_total)
+        dates = sorted(reservation['RESERVATION_DATE'].unique())
+        calendar = load_calendar(resource_df) or ResourceCalendar(resource_df)
+
+        t0 = time.perf_counter()
+        assign_resources(reservation, resource_lists)
+        plain_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        assign_resources(reservation, resource_lists, calendar)
+        calendar_sec = time.perf_counter() - t0
+
+        # 날짜마다 CT_02 오전 점검 (구간 1개 추가)
+        for date in dates:
+            calendar.block('CT_02', date, 510, 750)
+
+        t0 = time.perf_counter()
+        resource_ids, shortages = assign_resources(reservation, resource_lists, calendar)
+        blocked_sec = time.perf_counter() - t0
+
+        start_min = reservation['RESERVATION_DATETIME'].dt.hour * 60 + reservation['RESERVATION_DATETIME'].dt.minute
+        in_block = int(((resource_ids == 'CT_02') & (start_min < 750).to_numpy()).sum())
+        print(f'{len(reservation):>10,} {plain_sec:>8.3f}s {calendar_sec:>8.3f}s {blocked_sec:>8.3f}s '
+              f'{len(shortages):>6} {in_block:>14}')
+
+    # 구간 추가 + 조회 비용 (매번 그날 캐시만 무효화)
+    t0 = time.perf_counter()
+    for k in range(CALENDAR_BLOCKS):
+        date = dates[k % len(dates)]
+        calendar.block('CT_02', date, 900 + k % 30, 910 + k % 30)
+        calendar.is_available('CT_02', date, 600, 620)
+    per_block_us = (time.perf_counter() - t0) / CALENDAR_BLOCKS * 1e6
+    print(f'\n점검 구간 추가 + 가용 조회: {per_block_us:.1f}µs/건 ({CALENDAR_BLOCKS:,}건)')
+
+
+def legacy_first_slot(equip_type, duration, dates, reservation, resource_ids, calendar):
+    """기존 scenario_new_patient.find_available_slot 방식 (날짜마다 DataFrame 필터 + 자원별 빈 구간)
+
+    그날 슬롯 중 가장 이른 시작 (같으면 자원 순) → (날짜, RESOURCE_ID, 시작 분, 종료 분) 또는 None
+    """
+    for target_date in dates:
+        day_reservations = reservation[(reservation['RESERVATION_DATE'] == target_date) &
+                                       (reservation['EQUIPMENT_TYPE'] == equip_type)]
+        midnight = pd.Timestamp(target_date)
+        busy_start = ((day_reservations['RESERVATION_DATETIME'] - midnight).dt.total_seconds() // 60).astype(int)
+        busy_end = ((day_reservations['END_DATETIME'] - midnight).dt.total_seconds() // 60).astype(int)
+
+        slots = []
+        for resource_id in resource_ids:
+            on_resource = (day_reservations['RESOURCE_ID'] == resource_id).to_numpy()
+            busy = list(zip(busy_start[on_resource], busy_end[on_resource]))
+            for start_min, _ in free_windows(calendar.availability(resource_id, target_date), busy, duration):
+                slots.append((start_min, resource_id))
+        if slots:
+            start_min, resource_id = min(slots, key=lambda slot: slot[0])
+            return target_date, resource_id, start_min, start_min + duration
+    return None
+
+
+def bench_slots(targets):
+    resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+    resource_df = pd.DataFrame([{'RESOURCE_ID': rid, 'EQUIPMENT_TYPE': equip_type}
+                                for equip_type, ids in resource_lists.items() for rid in ids])
+    queries = [(equip_type, duration) for equip_type in sorted(resource_lists) for duration in SLOT_DURATIONS]
+
+    print('='*70)
+    print(f'첫 가용 슬롯 탐색 ({SLOT_HORIZON_DAYS}일 범위, 장비유형 {len(resource_lists)} × 소요시간 {SLOT_DURATIONS})')
+    print('='*70)
+    print(f"{'행 수':>10} {'기존/건':>10} {'인덱스 구축':>11} {'첫 조회/건':>11} {'조회/건':>9} {'예약 반영':>10} {'일치':>6}")
+
+    for target_total in targets:
+        reservation = make_reservation(target_total)
+        calendar = load_calendar(resource_df) or ResourceCalendar(resource_df)
+        reservation['RESOURCE_ID'], _ = assign_resources(reservation, resource_lists, calendar)
+        first = pd.Timestamp(reservation['RESERVATION_DATE'].min())
+        dates = [(first + pd.Timedelta(days=k)).strftime('%Y-%m-%d') for k in range(SLOT_HORIZON_DAYS)]
+
+        t0 = time.perf_counter()
+        expected = [legacy_first_slot(equip_type, duration, dates, reservation, resource_lists[equip_type], calendar)
+                    for equip_type, duration in queries]
+        legacy_ms = (time.perf_counter() - t0) / len(queries) * 1000
+
+        t0 = time.perf_counter()
+        index = FreeIntervalIndex(calendar, reservation)
+        build_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        found = [index.earliest_fit(resource_lists[equip_type], dates, duration) for equip_type, duration in queries]
+        cold_us = (time.perf_counter() - t0) / len(queries) * 1e6
+
+        t0 = time.perf_counter()
+        for _ in range(SLOT_REPEATS):
+            for equip_type, duration in queries:
+                index.earliest_fit(resource_lists[equip_type], dates, duration)
+        warm_us = (time.perf_counter() - t0) / (SLOT_REPEATS * len(queries)) * 1e6
+
+        # 조회 → 예약 반영 순서로 처리 (그 날짜 빈 구간만 다시 계산), 반영 후 같은 조회는 다른 슬롯
+        book_sec, booked, moved = 0.0, 0, True
+        for equip_type, duration in queries:
+            slot = index.earliest_fit(resource_lists[equip_type], dates, duration)
+            if slot is None:
+                continue
+            t0 = time.perf_counter()
+            index.book(slot[1], slot[0], slot[2], slot[3])
+            book_sec += time.perf_counter() - t0
+            booked += 1
+            moved &= index.earliest_fit(resource_lists[equip_type], dates, duration) != slot
+        book_us = book_sec / max(booked, 1) * 1e6
+
+        print(f'{len(reservation):>10,} {legacy_ms:>8.1f}ms {build_sec:>10.3f}s {cold_us:>9.0f}µs '
+              f'{warm_us:>7.1f}µs {book_us:>8.1f}µs {str(found == expected and moved):>6}')
+
+
+def exam_slot_queries(resource_lists):
+    """자원이 있는 장비유형 검사의 (장비유형, 소요시간, 검사 운영시간) 중복 제거 목록"""
+    queries = set()
+    for info in gen.exam_info.values():
+        if info['equipment'] not in resource_lists:
+            continue
+        window = None
+        if info['avail_start_min'] is not None and info['avail_end_min'] is not None:
+            window = (info['avail_start_min'], info['avail_end_min'])
+        queries.add((info['equipment'], info['duration'], window))
+    return sorted(queries, key=lambda q: (q[0], q[1], q[2] or (0, 0)))
+
+
+def gap_slots(index, resource_ids, dates, duration, window):
+    """빈 구간 인덱스 기준 10분 정렬 시작 슬롯 집합 (점유 배열과 같은 슬롯 반올림: 빈 구간 안쪽으로)"""
+    n_slots = slots_needed(duration)
+    low, high = (0, 24 * 60) if window is None else window
+    if high <= low:
+        high += 24 * 60         # 야간 운영시간 (다음날 종료)
+    found = set()
+    for date in dates:
+        for resource_id in resource_ids:
+            for start, end in index.day(resource_id, date).gaps:
+                first = -(-max(start, low) // SLOT_MIN)
+                last = min(end, high, 24 * 60) // SLOT_MIN - n_slots
+                found.update((resource_id, date, k * SLOT_MIN) for k in range(first, last + 1))
+    return found
+
+
+def bench_cube(targets):
+    resource_lists = resource_lists_from_counts(RESOURCE_COUNTS)
+    resource_df = pd.DataFrame([{'RESOURCE_ID': rid, 'EQUIPMENT_TYPE': equip_type}
+                                for equip_type, ids in resource_lists.items() for rid in ids])
+    queries = exam_slot_queries(resource_lists)
+
+    print('='*70)
+    print(f'점유 배열 연속 빈 슬롯 조회 (자원 {len(resource_df)}대, 검사 조건 {len(queries)}종)')
+    print('='*70)
+    print(f"{'행 수':>10} {'일수':>5} {'배열':>8} {'구축':>8} {'조회/건':>9} {'빈 구간 순회/건':>14} "
+          f"{'첫 슬롯/건':>10} {'사용률':>8} {'일치':>6}")
+
+    for target_total in targets:
+        reservation = make_reservation(target_total)
+        calendar = load_calendar(resource_df) or ResourceCalendar(resource_df)
+        reservation['RESOURCE_ID'], _ = assign_resources(reservation, resource_lists, calendar)
+
+        t0 = time.perf_counter()
+        cube = OccupancyCube.from_reservation(resource_df, reservation, calendar=calendar)
+        build_sec = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        found = [cube.find_slots(equip_type, duration, window) for equip_type, duration, window in queries]
+        query_ms = (time.perf_counter() - t0) / len(queries) * 1000
+
+        t0 = time.perf_counter()
+        for equip_type, duration, window in queries:
+            cube.earliest_slot(equip_type, duration, window)
+        first_ms = (time.perf_counter() - t0) / len(queries) * 1000
+
+        t0 = time.perf_counter()
+        utilization = cube.utilization()
+        util_ms = (time.perf_counter() - t0) * 1000
+
+        # 빈 구간 인덱스로 같은 조회 (자원 · 날짜 · 빈 구간 순회), 앞 CUBE_CHECKS개는 결과 대조
+        index = FreeIntervalIndex(calendar, reservation)
+        checks = queries[:CUBE_CHECKS]
+        t0 = time.perf_counter()
+        expected = [gap_slots(index, resource_lists[equip_type], cube.dates, duration, window)
+                    for equip_type, duration, window in checks]
+        gap_ms = (time.perf_counter() - t0) / len(checks) * 1000
+        match = all(set(zip(slots['RESOURCE_ID'], slots['RESERVATION_DATE'], slots['START_MIN'].tolist())) == ref
+                    for slots, ref in zip(found, expected))
+
+        booked = utilization['BOOKED_MIN'].sum() / utilization['OPEN_MIN'].sum()
+        print(f'{len(reservation):>10,} {len(cube.dates):>5} {cube.grid.nbytes / 1e6:>6.2f}MB {build_sec:>7.3f}s '
+              f'{query_ms:>7.2f}ms {gap_ms:>12.1f}ms {first_ms:>8.2f}ms {util_ms:>6.0f}ms {str(match):>6}')
+        print(f'{"":>10} 예약 슬롯 비율 {booked:.1%}, 조회 결과 평균 {np.mean([len(f) for f in found]):,.0f}개')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['overlap']:
+        bench_overlap()
+    elif sys.argv[1:] == ['analytics']:
+        bench_analytics()
+    elif sys.argv[1:2] == ['calendar']:
+        bench_calendar([int(a) for a in sys.argv[2:]] or CALENDAR_TARGETS)
+    elif sys.argv[1:2] == ['capability']:
+        bench_capability([int(a) for a in sys.argv[2:]] or CAPABILITY_TARGETS)
+    elif sys.argv[1:2] == ['cube']:
+        bench_cube([int(a) for a in sys.argv[2:]] or CUBE_TARGETS)
+    elif sys.argv[1:2] == ['slots']:
+        bench_slots([int(a) for a in sys.argv[2:]] or SLOT_TARGETS)
+    elif sys.argv[1:2] == ['incremental']:
+        bench_incremental([int(a) for a in sys.argv[2:]] or INCREMENTAL_TARGETS)
+    else:
+        bench_assign([int(a) for a in sys.argv[1:]] or ASSIGN_TARGETS)
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+예약 생성기 벤치마크
+- 충돌 검사: 기존 DataFrame 마스크 방식 vs RuleIndex 방식
+- TARGET_TOTAL 10,000 / 100,000 건 기준 생성 시간 비교
+- PatientHistory: 이력 규모(행/환자 수)별 충돌 검사 1회 비용
+- 병렬 생성: 작업 프로세스 수별 생성 시간/배속
+- 검사 추첨: 호출마다 후보/가중치 재구성 vs Fenwick 추첨기 (검사 수별 1회 비용)
+
+사용법:
+    python benchmark_generate.py [TARGET ...]
+    python benchmark_generate.py history
+    python benchmark_generate.py parallel [TARGET]
+    python benchmark_generate.py sampler
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+from datetime import date, timedelta
+
+import generate_reservation as gen
+from exam_sampler import UsageBalancedSampler
+from patient_history import PatientHistory
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+BENCH_TARGETS = [10000, 100000]
+
+# (이력 행 수, 환자 수)
+HISTORY_SIZES = [(10_000, 3_000), (100_000, 10_000), (1_000_000, 30_000), (3_000_000, 50_000)]
+HISTORY_QUERIES = 50_000
+
+PARALLEL_WORKERS = [1, 2, 4, 8]
+PARALLEL_TARGET = 100000
+
+SAMPLER_SIZES = [67, 78, 1000, 10000]
+SAMPLER_DRAWS = 20000
+
+
+def legacy_check_patient_conflicts(patient_id, new_exams, new_date, patient_history):
+    """기존 방식: 검사 쌍마다 규칙 DataFrame 전체를 마스킹/순회
+
+    PatientHistory에는 규칙 관련 검사만 남아 있으므로 결과는 기존과 동일
+    """
+    if patient_id not in patient_history:
+        return True
+
+    same_day_not_allowed = gen.same_day_not_allowed
+    gap_rules = gen.gap_rules
+
+    for new_exam in new_exams:
+        for hist_exam, hist_date in patient_history.records(patient_id):
+            if new_date == hist_date:
+                conflict = same_day_not_allowed[
+                    ((same_day_not_allowed['EXAM_A'] == new_exam) & (same_day_not_allowed['EXAM_B'] == hist_exam)) |
+                    ((same_day_not_allowed['EXAM_A'] == hist_exam) & (same_day_not_allowed['EXAM_B'] == new_exam))
+                ]
+                if len(conflict) > 0:
+                    return False
+
+            for _, rule in gap_rules.iterrows():
+                if rule['EXAM_A'] == hist_exam and rule['EXAM_B'] == new_exam:
+                    if rule['GAP_UNIT'] == 'D':
+                        if abs((new_date - hist_date).days) < int(rule['GAP_VALUE']):
+                            return False
+
+    return True
+
+
+def run_generation(target_total, conflict_checker=None, n_workers=1):
+    """생성 1회 실행 → (소요 시간(초), 생성 건수)"""
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        reservations, _ = gen.generate_reservations(target_total, conflict_checker=conflict_checker,
+                                                    n_workers=n_workers)
+    return time.perf_counter() - started, len(reservations)
+
+
+def bench_history():
+    """이력 규모별 has_conflict 1회 평균 비용 (마이크로초)"""
+    print('\n' + '='*60)
+    print('PatientHistory 충돌 검사 비용 (이력 규모별)')
+    print('='*60)
+    print(f"{'이력 행':>12} {'환자':>8} {'적재(s)':>10} {'검사 1회(us)':>14}")
+
+    rng = random.Random(42)
+    exam_codes = list(gen.exam_info.keys())
+    days = [date(2026, 1, 1) + timedelta(days=i) for i in range(365)]
+
+    for n_rows, n_patients in HISTORY_SIZES:
+        patients = [f'P{i:06d}' for i in range(1, n_patients + 1)]
+        history = PatientHistory(gen.rule_index)
+
+        started = time.perf_counter()
+        for day in days:
+            for _ in range(n_rows // len(days)):
+                history.add(rng.choice(patients), rng.choice(exam_codes), day)
+        load_sec = time.perf_counter() - started
+
+        queries = [(rng.choice(patients), rng.sample(exam_codes, 3), rng.choice(days))
+                   for _ in range(HISTORY_QUERIES)]
+        started = time.perf_counter()
+        for patient_id, new_exams, new_date in queries:
+            history.has_conflict(patient_id, new_exams, new_date)
+        per_query_us = (time.perf_counter() - started) / HISTORY_QUERIES * 1e6
+
+        print(f'{n_rows:>12,} {n_patients:>8,} {load_sec:>10.1f} {per_query_us:>14.2f}')
+
+
+def bench_generation(targets):
+    """TARGET_TOTAL별 생성 시간 (기존 검사 함수 vs 인덱스)"""
+    print('\n' + '='*60)
+    print('생성 시간 비교 (기존 DataFrame 방식 vs 인덱스)')
+    print('='*60)
+    print(f"{'TARGET':>10} {'건수':>10} {'기존(s)':>10} {'인덱스(s)':>10} {'배속':>8}")
+
+    for target in targets:
+        legacy_sec, legacy_rows = run_generation(target, legacy_check_patient_conflicts)
+        index_sec, index_rows = run_generation(target, gen.check_patient_conflicts)
+        if legacy_rows != index_rows:
+            print(f'  경고: 생성 건수 불일치 ({legacy_rows} vs {index_rows})')
+        print(f'{target:>10,} {index_rows:>10,} {legacy_sec:>10.1f} {index_sec:>10.1f} {legacy_sec / index_sec:>7.1f}x')
+
+
+def bench_parallel(target_total):
+    """작업 프로세스 수별 생성 시간 (샤드 병합/조정 포함)"""
+    print('\n' + '='*60)
+    print(f'병렬 생성 시간 (TARGET {target_total:,}, CPU {os.cpu_count()}개)')
+    print('='*60)
+    print(f"{'작업 수':>8} {'건수':>10} {'시간(s)':>10} {'배속':>8}")
+
+    base_sec = None
+    for n_workers in PARALLEL_WORKERS:
+        sec, rows = run_generation(target_total, n_workers=n_workers)
+        base_sec = base_sec or sec
+        print(f'{n_workers:>8} {rows:>10,} {sec:>10.1f} {base_sec / sec:>7.2f}x')
+
+
+def bench_sampler():
+    """검사 수별 추첨+사용 반영 1회 비용 (기존 재구성 방식 vs Fenwick), 결과 일치 확인"""
+    print('\n' + '='*60)
+    print('검사 추첨 비용 (추첨 + 사용 반영 1회)')
+    print('='*60)
+    print(f"{'검사 수':>8} {'방식':>10} {'기존(us)':>10} {'Fenwick(us)':>12} {'일치':>6}")
+
+    for n_exams in SAMPLER_SIZES:
+        exams = [f'E{i:05d}' for i in range(n_exams)]
+
+        for mode in ('weighted', 'least'):
+            # 기존: 호출마다 후보 목록/가중치 재구성
+            usage = dict.fromkeys(exams, 0)
+            rng = random.Random(42)
+            legacy_picks = []
+            started = time.perf_counter()
+            for _ in range(SAMPLER_DRAWS):
+                if mode == 'weighted':
+                    max_count = max(usage[e] for e in exams) + 1
+                    weights = [max_count - usage[e] + 1 for e in exams]
+                    exam_cd = rng.choices(exams, weights=weights, k=1)[0]
+                else:
+                    min_count = min(usage[e] for e in exams)
+                    exam_cd = rng.choice([e for e in exams if usage[e] <= min_count + 2])
+                usage[exam_cd] += 1
+                legacy_picks.append(exam_cd)
+            legacy_us = (time.perf_counter() - started) / SAMPLER_DRAWS * 1e6
+
+            sampler = UsageBalancedSampler(exams)
+            rng = random.Random(42)
+            picks = []
+            started = time.perf_counter()
+            for _ in range(SAMPLER_DRAWS):
+                if mode == 'weighted':
+                    exam_cd = sampler.sample_weighted(rng)
+                else:
+                    exam_cd = sampler.sample_least_used(rng)
+                sampler.increment(exam_cd)
+                picks.append(exam_cd)
+            fenwick_us = (time.perf_counter() - started) / SAMPLER_DRAWS * 1e6
+
+            same = 'O' if picks == legacy_picks else 'X'
+            print(f'{n_exams:>8,} {mode:>10} {legacy_us:>10.2f} {fenwick_us:>12.2f} {same:>6}')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['history']:
+        bench_history()
+    elif sys.argv[1:] == ['sampler']:
+        bench_sampler()
+    elif sys.argv[1:2] == ['parallel']:
+        bench_parallel(int(sys.argv[2]) if len(sys.argv) > 2 else PARALLEL_TARGET)
+    else:
+        bench_generation([int(t) for t in sys.argv[1:]] or BENCH_TARGETS)
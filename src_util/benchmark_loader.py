@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+데이터 로더 벤치마크
+- RESERVATION CSV를 배수로 복제해 행 수별 로드 시간 측정
+- 기존 방식 (read_csv + to_datetime + END_DATETIME) vs load_reservation
+  (캐시 없음 첫 로드 / 캐시 적중 / 수정시각만 바뀐 경우 해시 확인 후 적중)
+
+사용법:
+    python benchmark_loader.py [RESERVATION.csv 경로]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from data_loader import CACHE_SUFFIX, data_path, load_reservation
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+LOADER_REPEATS = [1, 100]      # 원본 약 1.2만 행 → 1.2만 / 120만 행
+LOADER_RUNS = 3
+
+
+def legacy_load(path):
+    reservation = pd.read_csv(path)
+    reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
+    reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(reservation['DURATION_MIN'], unit='m')
+    return reservation
+
+
+def best_of(func, runs=LOADER_RUNS, setup=None):
+    """runs회 중 최소 시간 (초)"""
+    best = float('inf')
+    for _ in range(runs):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_dataset(source_path, repeats, work_dir):
+    """원본 CSV를 repeats배 이어붙인 파일 생성 → 경로"""
+    path = os.path.join(work_dir, f'RESERVATION_x{repeats}.csv')
+    with open(source_path, 'rb') as src:
+        header = src.readline()
+        body = src.read()
+    if not body.endswith(b'\n'):
+        body += b'\n'
+    with open(path, 'wb') as f:
+        f.write(header)
+        for _ in range(repeats):
+            f.write(body)
+    return path
+
+
+def bench_loader(source_path):
+    print('='*70)
+    print('RESERVATION 로드 시간 (최소값)')
+    print('='*70)
+    print(f"{'행 수':>10} {'크기(MB)':>9} {'기존':>9} {'첫 로드':>9} {'캐시':>9} {'해시 확인':>9} {'배속':>8}")
+
+    work_dir = tempfile.mkdtemp(prefix='loader_bench_')
+    try:
+        for repeats in LOADER_REPEATS:
+            path = make_dataset(source_path, repeats, work_dir)
+            cache_path = path + CACHE_SUFFIX
+
+            def drop_cache():
+                if os.path.exists(cache_path):
+                    os.remove(cache_path)
+
+            def touch():
+                os.utime(path)
+
+            legacy_sec = best_of(lambda: legacy_load(path))
+            cold_sec = best_of(lambda: load_reservation(path), setup=drop_cache)
+            warm_sec = best_of(lambda: load_reservation(path))
+            rehash_sec = best_of(lambda: load_reservation(path), setup=touch)
+
+            n_rows = len(load_reservation(path))
+            size_mb = os.path.getsize(path) / 1024 / 1024
+            print(f'{n_rows:>10,} {size_mb:>9.1f} {legacy_sec:>8.3f}s {cold_sec:>8.3f}s '
+                  f'{warm_sec:>8.3f}s {rehash_sec:>8.3f}s {legacy_sec / warm_sec:>7.1f}x')
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    bench_loader(sys.argv[1] if len(sys.argv) > 1 else data_path('RESERVATION'))
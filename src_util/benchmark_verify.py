@@ -0,0 +1,498 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 검증 벤치마크
+- 검증 데이터: RESERVATION을 환자 ID만 바꿔 복제해 행 수를 늘리고, 일부 행의 검사 코드를 규칙 검사로 바꿔 위반 주입
+- 당일 시행 불가: 환자 → 날짜 → 검사 쌍 루프 + 규칙 DataFrame 마스크 vs same_day_violations (자기 조인 + merge)
+  (same_day_violations는 compile_l1_rules().evaluate()의 당일 불가 검사가 그대로 호출하는 함수)
+- 검사 간 간격: 환자별 iterrows 이중 루프 vs gap_violations (순위 구간 searchsorted)
+  기존 방식은 GAP만 (규칙 첫 행) 보므로 GAP 위반 건수와 비교, REV_GAP까지는 환자별 전수 비교(reference)로 확인
+- L1 전체: 예약일 일부를 토/일로 옮겨 위반 주입 (검사 코드만 바뀐 행은 소요시간/운영시간 위반으로도 잡힘)
+  기존 검사(일요일, 토요일 NOWEEKEND, 당일 불가, 순서) 루프 + 간격 전수 비교 vs compile_l1_rules().evaluate()
+  유형별 건수를 기존 방식과 비교 (기존에 없던 규칙은 건수만 표시)
+- 증분 검증: 기존 예약 인덱스 구축 1회 후 새 예약 묶음(DELTA_BATCH행)만 check()
+  vs 전체 예약 + 새 예약 evaluate() (새 예약이 포함된 위반 집합이 같은지 확인)
+  + 인덱스 save()/load() 후 같은 묶음 check() 결과가 같은지 확인
+- 병렬 검증: 작업자 수별 evaluate_parallel() 시간과 직렬 evaluate() 결과와의 바이트 일치
+- 스트리밍 검증: 복제본을 해마다 뒤로 옮긴 날짜순 파일로 메모리 적재 vs 청크 스트리밍의 행/초 · 최대 RSS
+- 위반 레코드 저장: JSONL/Parquet 각각 위반 0건 · 전체 위반을 쓰고 다시 읽어 파일 존재 · 컬럼 · 건수 확인
+- 두 방식의 위반 건수 일치 여부 확인
+
+사용법:
+    python benchmark_verify.py [ROWS ...]          # 당일 시행 불가
+    python benchmark_verify.py gap [ROWS ...]      # 검사 간 간격
+    python benchmark_verify.py l1 [ROWS ...]       # L1 전체 (컴파일된 규칙 일괄 검증)
+    python benchmark_verify.py delta [ROWS ...]    # 증분 검증 (기존 예약 ROWS행 + 새 예약 묶음)
+    python benchmark_verify.py parallel [ROWS ...] # 환자 분할 병렬 검증 (작업자 1, 2, 4, 8)
+    python benchmark_verify.py stream [ROWS ...]   # 스트리밍 검증 (행 수별 최대 RSS)
+    python benchmark_verify.py output              # 위반 레코드 저장/읽기 확인 (0건 포함)
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_condition_rules, load_exam_master, load_relation_rules, load_reservation
+from rule_checks import gap_constraints, gap_violations, same_day_violations
+from incremental_verifier import VerificationIndex
+from parallel_verifier import evaluate_parallel
+from streaming_verifier import StreamingVerifier, iter_violations, peak_rss_mb
+from rule_engine import VIOLATION_COLUMNS, compile_l1_rules
+from violation_writer import ViolationWriter, read_violations
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+VERIFY_SIZES = [12_000, 100_000, 1_000_000]
+LEGACY_MAX = 100_000            # 기존 방식은 이 행 수까지만 측정
+GAP_SIZES = [12_000, 50_000, 1_000_000]
+GAP_LEGACY_MAX = 12_000         # 간격 검사 기존 방식 (iterrows 이중 루프)은 이 행 수까지만
+GAP_NOISE_RATE = 0.5            # 간격 규칙은 같은 환자의 규칙 검사 쌍이 있어야 걸리므로 더 많이 주입
+L1_SIZES = [12_000, 100_000, 1_000_000]
+L1_LEGACY_MAX = 12_000
+WEEKEND_SHIFT_RATE = 0.01       # 예약일을 토/일로 옮길 행 비율 (일요일, NOWEEKEND, 시간대 규칙 위반 주입)
+DELTA_SIZES = [12_000, 1_000_000]
+DELTA_BATCH = 5                 # 승인 검사 1회당 새 예약 수
+DELTA_ROUNDS = 50
+PARALLEL_SIZES = [100_000, 1_000_000]
+PARALLEL_WORKERS = [1, 2, 4, 8]
+STREAM_SIZES = [100_000, 1_000_000, 2_000_000]     # 복제본 1개 = 1년, ns 시각 상한(2262년) 안
+STREAM_COMPARE_MAX = 1_000_000  # 메모리 적재 검증과 위반 집합 비교는 이 행 수까지
+NOISE_RATE = 0.05               # 검사 코드를 규칙 검사로 바꿀 행 비율
+
+
+def make_verify_data(base, relation_rules, n_rows, seed=0, noise_rate=NOISE_RATE):
+    """base를 환자 ID 접미사로 복제해 n_rows행 + 위반 주입 → DataFrame"""
+    copies = -(-n_rows // len(base))
+    frames = []
+    for k in range(copies):
+        frame = base.copy()
+        frame['PATIENT_ID'] = frame['PATIENT_ID'].astype(str) + f'_{k:03d}'
+        frames.append(frame)
+    data = pd.concat(frames, ignore_index=True).iloc[:n_rows].copy()
+
+    rng = np.random.default_rng(seed)
+    rule_exams = np.array(sorted(set(relation_rules['EXAM_A']) | set(relation_rules['EXAM_B'])), dtype=object)
+    noisy = rng.random(len(data)) < noise_rate
+    exam_codes = data['EXAM_CD'].astype(object).to_numpy().copy()
+    exam_codes[noisy] = rng.choice(rule_exams, noisy.sum())
+    data['EXAM_CD'] = exam_codes
+    return data
+
+
+def legacy_same_day_count(reservation, relation_rules):
+    """기존 방식 (verify_reservation.py 3번): 환자/날짜별 검사 쌍마다 규칙 테이블 마스크"""
+    same_day_not_allowed = relation_rules[relation_rules['SAME_DAY_CD'] == 'N'].copy()
+    count = 0
+    for patient_id, patient_reservations in reservation.groupby('PATIENT_ID'):
+        for date, date_reservations in patient_reservations.groupby('RESERVATION_DATE'):
+            if len(date_reservations) < 2:
+                continue
+            exam_codes = date_reservations['EXAM_CD'].tolist()
+            for i, exam_a in enumerate(exam_codes):
+                for exam_b in exam_codes[i+1:]:
+                    rule = same_day_not_allowed[
+                        ((same_day_not_allowed['EXAM_A'] == exam_a) & (same_day_not_allowed['EXAM_B'] == exam_b)) |
+                        ((same_day_not_allowed['EXAM_A'] == exam_b) & (same_day_not_allowed['EXAM_B'] == exam_a))
+                    ]
+                    if len(rule) > 0:
+                        count += 1
+    return count
+
+
+def bench_same_day(sizes, base, relation_rules):
+    print('='*70)
+    print('당일 시행 불가 검증 시간')
+    print('='*70)
+    print(f"{'행 수':>10} {'기존':>10} {'merge':>9} {'위반':>8} {'기존 위반':>10}")
+
+    for n_rows in sizes:
+        data = make_verify_data(base, relation_rules, n_rows)
+
+        t0 = time.perf_counter()
+        violations = same_day_violations(data, relation_rules)
+        vector_sec = time.perf_counter() - t0
+
+        if n_rows <= LEGACY_MAX:
+            t0 = time.perf_counter()
+            legacy_count = legacy_same_day_count(data, relation_rules)
+            legacy_text = f'{time.perf_counter() - t0:.2f}s'
+        else:
+            legacy_count, legacy_text = '-', '-'
+
+        print(f'{n_rows:>10,} {legacy_text:>10} {vector_sec:>8.3f}s {len(violations):>8,} {legacy_count:>10}')
+
+
+def legacy_gap_count(reservation, relation_rules):
+    """기존 방식 (verify_reservation.py 4번): 환자별 iterrows 이중 루프 + 규칙 DataFrame 마스크"""
+    gap_rules = relation_rules[relation_rules['GAP_VALUE'].notna()].copy()
+    gap_rules['GAP_VALUE'] = gap_rules['GAP_VALUE'].astype(int)
+    units = {'D': 'days', 'H': 'hours', 'M': 'minutes'}
+    count = 0
+    for patient_id, patient_reservations in reservation.groupby('PATIENT_ID'):
+        patient_reservations = patient_reservations.sort_values('RESERVATION_DATETIME')
+        for i, row1 in patient_reservations.iterrows():
+            for j, row2 in patient_reservations.iterrows():
+                if i >= j:
+                    continue
+                rule = gap_rules[(gap_rules['EXAM_A'] == row1['EXAM_CD']) & (gap_rules['EXAM_B'] == row2['EXAM_CD'])]
+                if len(rule) == 0 or rule.iloc[0]['GAP_UNIT'] not in units:
+                    continue
+                rule = rule.iloc[0]
+                required_gap = timedelta(**{units[rule['GAP_UNIT']]: int(rule['GAP_VALUE'])})
+                if row2['RESERVATION_DATETIME'] - row1['RESERVATION_DATETIME'] < required_gap:
+                    count += 1
+    return count
+
+
+def reference_gap_counts(reservation, relation_rules):
+    """gap_violations와 같은 정의의 환자별 전수 비교 → {'GAP': 건수, 'REV_GAP': 건수}"""
+    constraints = {(c.FIRST, c.SECOND): (c.KIND, c.REQUIRED_MIN) for c in gap_constraints(relation_rules).itertuples()}
+    exams = {exam for pair in constraints for exam in pair}
+    counts = {'GAP': 0, 'REV_GAP': 0}
+    data = reservation.assign(POS=np.arange(len(reservation)))
+    data = data[data['EXAM_CD'].astype(object).isin(exams)]
+    for _, patient_reservations in data.groupby('PATIENT_ID'):
+        rows = sorted(zip(patient_reservations['RESERVATION_DATETIME'], patient_reservations['POS'],
+                          patient_reservations['EXAM_CD']))
+        for i, (time_1, _, exam_1) in enumerate(rows):
+            for time_2, _, exam_2 in rows[i+1:]:
+                constraint = constraints.get((exam_1, exam_2))
+                if constraint and time_2 - time_1 < timedelta(minutes=constraint[1]):
+                    counts[constraint[0]] += 1
+    return counts
+
+
+def bench_gap(sizes, base, relation_rules):
+    print('='*70)
+    print('검사 간 간격 검증 시간')
+    print('='*70)
+    print(f"{'행 수':>10} {'기존':>9} {'window':>9} {'GAP':>7} {'기존 GAP':>9} {'REV_GAP':>8} {'전수 일치':>9}")
+
+    for n_rows in sizes:
+        data = make_verify_data(base, relation_rules, n_rows, noise_rate=GAP_NOISE_RATE)
+
+        t0 = time.perf_counter()
+        violations = gap_violations(data, relation_rules)
+        window_sec = time.perf_counter() - t0
+        counts = violations['KIND'].value_counts()
+        gap_count, reverse_count = int(counts.get('GAP', 0)), int(counts.get('REV_GAP', 0))
+
+        if n_rows <= GAP_LEGACY_MAX:
+            t0 = time.perf_counter()
+            legacy_count = legacy_gap_count(data, relation_rules)
+            legacy_text = f'{time.perf_counter() - t0:.1f}s'
+        else:
+            legacy_count, legacy_text = '-', '-'
+        reference = reference_gap_counts(data, relation_rules)
+        matched = reference == {'GAP': gap_count, 'REV_GAP': reverse_count}
+
+        print(f'{n_rows:>10,} {legacy_text:>9} {window_sec:>8.3f}s {gap_count:>7,} {legacy_count:>9} '
+              f'{reverse_count:>8,} {str(matched):>9}')
+
+
+def shift_to_weekend(data, seed=0, rate=WEEKEND_SHIFT_RATE):
+    """일부 예약을 같은 주 토/일의 같은 시각으로 옮김"""
+    rng = np.random.default_rng(seed)
+    data = data.copy()
+    moved = rng.random(len(data)) < rate
+    dates = pd.to_datetime(data['RESERVATION_DATE'].astype(object))
+    offsets = pd.to_timedelta(5 + rng.integers(0, 2, len(data)) - dates.dt.weekday.to_numpy(), unit='D')
+    offsets = offsets.where(moved, pd.Timedelta(0))
+    data['RESERVATION_DATE'] = (dates + offsets).dt.strftime('%Y-%m-%d')
+    data['RESERVATION_DATETIME'] = data['RESERVATION_DATETIME'] + offsets
+    data['END_DATETIME'] = data['END_DATETIME'] + offsets
+    return data
+
+
+def legacy_sequence_count(reservation, relation_rules):
+    """기존 방식 (verify_reservation.py 5번): 환자/날짜별 시각 순 쌍마다 순서 규칙 마스크"""
+    seq_required = relation_rules[relation_rules['SEQ_REQ_YN'] == 'Y'].copy()
+    count = 0
+    for patient_id, patient_reservations in reservation.groupby('PATIENT_ID'):
+        for date, date_reservations in patient_reservations.groupby('RESERVATION_DATE'):
+            if len(date_reservations) < 2:
+                continue
+            date_reservations = date_reservations.sort_values('RESERVATION_DATETIME', kind='stable')
+            exams_in_order = list(date_reservations['EXAM_CD'])
+            for i, exam_a in enumerate(exams_in_order):
+                for exam_b in exams_in_order[i+1:]:
+                    rule = seq_required[(seq_required['EXAM_A'] == exam_b) & (seq_required['EXAM_B'] == exam_a)]
+                    if len(rule) > 0:
+                        count += 1
+    return count
+
+
+def legacy_l1_counts(reservation, relation_rules, condition_rules):
+    """기존 verify_reservation.py 검사 (일요일, 토요일 NOWEEKEND, 당일 불가, 순서) → {유형: 건수}"""
+    weekday = pd.to_datetime(reservation['RESERVATION_DATE'].astype(object)).dt.weekday
+    noweekend_exams = condition_rules[condition_rules['ACTION_CD'] == 'NOWEEKEND']['EXAM_CD'].unique()
+    return {
+        'SUNDAY': int((weekday == 6).sum()),
+        'NOWEEKEND': int(((weekday == 5) & reservation['EXAM_CD'].isin(noweekend_exams)).sum()),
+        'SAME_DAY_NOT_ALLOWED': legacy_same_day_count(reservation, relation_rules),
+        'SEQ_ORDER': legacy_sequence_count(reservation, relation_rules),
+    }
+
+
+def bench_l1(sizes, base, relation_rules):
+    exam_master = load_exam_master()
+    condition_rules = load_condition_rules()
+
+    t0 = time.perf_counter()
+    rules = compile_l1_rules(exam_master, relation_rules, condition_rules)
+    compile_sec = time.perf_counter() - t0
+
+    print('='*70)
+    print(f'L1 전체 검증 시간 (규칙 컴파일 {compile_sec*1000:.1f}ms)')
+    print('='*70)
+
+    for n_rows in sizes:
+        data = shift_to_weekend(make_verify_data(base, relation_rules, n_rows, noise_rate=GAP_NOISE_RATE))
+        # 복제본은 원본과 같은 자원·시각이므로 자원은 첫 복제본에만 남김
+        first_copy = data['PATIENT_ID'].str.endswith('_000').to_numpy()
+        data['RESOURCE_ID'] = np.where(first_copy, data['RESOURCE_ID'].astype(object), '')
+
+        t0 = time.perf_counter()
+        violations = rules.evaluate(data)
+        engine_sec = time.perf_counter() - t0
+        counts = violations['RULE_TYPE'].value_counts().to_dict()
+
+        legacy = {}
+        legacy_text = '-'
+        if n_rows <= L1_LEGACY_MAX:
+            t0 = time.perf_counter()
+            legacy = legacy_l1_counts(data, relation_rules, condition_rules)
+            legacy_text = f'{time.perf_counter() - t0:.1f}s'
+            # 기존 NOWEEKEND는 토요일만 봄, 간격은 전수 비교(reference)와 비교
+            saturday = pd.to_datetime(data['RESERVATION_DATE'].astype(object)).dt.weekday.to_numpy()[
+                violations.loc[violations['RULE_TYPE'] == 'NOWEEKEND', 'POS'].to_numpy()] == 5
+            counts['NOWEEKEND (토)'] = int(saturday.sum())
+            legacy['NOWEEKEND (토)'] = legacy.pop('NOWEEKEND')
+            legacy['GAP_INTERVAL'] = sum(reference_gap_counts(data, relation_rules).values())
+
+        print(f'\n{n_rows:,}행: 기존 {legacy_text}, 컴파일 규칙 {engine_sec:.3f}s, 위반 {len(violations):,}건')
+        for rule_type in sorted(set(counts) | set(legacy)):
+            print(f"  {rule_type:<24} {counts.get(rule_type, 0):>8,} {str(legacy.get(rule_type, '-')):>8}")
+
+
+def make_delta(data, rng, batch=DELTA_BATCH):
+    """기존 예약에서 뽑은 행을 0~3일, 10분 단위로 옮긴 새 예약 묶음 (같은 환자/자원과 충돌 가능)"""
+    delta = data.iloc[rng.choice(len(data), batch, replace=False)].copy().reset_index(drop=True)
+    shift = pd.to_timedelta(rng.integers(0, 4, batch) * 1440 + rng.integers(-6, 7, batch) * 10, unit='m')
+    delta['RESERVATION_ID'] = [f'N{i:08d}' for i in rng.integers(0, 10**8, batch)]
+    delta['RESERVATION_DATETIME'] = delta['RESERVATION_DATETIME'] + shift
+    delta['END_DATETIME'] = delta['END_DATETIME'] + shift
+    delta['RESERVATION_DATE'] = delta['RESERVATION_DATETIME'].dt.strftime('%Y-%m-%d')
+    return delta
+
+
+def violation_keys(violations, source_of):
+    """위반 → {(RULE_ID, (출처, 행), (출처, 행))} (전체 재검증과 증분 결과 비교용)"""
+    return {(r.RULE_ID, source_of(r.SOURCE, r.POS), source_of(r.OTHER_SOURCE, r.OTHER_POS))
+            for r in violations.itertuples(index=False)}
+
+
+def bench_delta(sizes, base, relation_rules):
+    rules = compile_l1_rules(load_exam_master(), relation_rules, load_condition_rules())
+
+    print('='*70)
+    print(f'증분 검증 시간 (새 예약 {DELTA_BATCH}행 × {DELTA_ROUNDS}회)')
+    print('='*70)
+    print(f"{'기존 행 수':>10} {'인덱스':>9} {'check':>10} {'전체 재검증':>11} {'위반':>6} {'일치':>6} "
+          f"{'저장':>8} {'로드':>8} {'로드 후 일치':>10}")
+
+    for n_rows in sizes:
+        data = make_verify_data(base, relation_rules, n_rows, noise_rate=NOISE_RATE)
+        first_copy = data['PATIENT_ID'].str.endswith('_000').to_numpy()
+        data['RESOURCE_ID'] = np.where(first_copy, data['RESOURCE_ID'].astype(object), '')
+
+        t0 = time.perf_counter()
+        index = VerificationIndex(rules, data)
+        build_sec = time.perf_counter() - t0
+
+        rng = np.random.default_rng(0)
+        deltas = [make_delta(data, rng) for _ in range(DELTA_ROUNDS)]
+        t0 = time.perf_counter()
+        results = [index.check(delta) for delta in deltas]
+        check_ms = (time.perf_counter() - t0) / DELTA_ROUNDS * 1000
+
+        # 전체 재검증 (처음 3묶음): 새 예약을 뒤에 붙여 evaluate 후 새 예약이 포함된 위반만 비교
+        matched = True
+        full_sec = 0.0
+        for delta, result in list(zip(deltas, results))[:3]:
+            t0 = time.perf_counter()
+            full = rules.evaluate(pd.concat([index.base, delta], ignore_index=True))
+            full_sec += (time.perf_counter() - t0) / 3
+            n_base = len(index.base)
+            full = full[(full['POS'] >= n_base) | (full['OTHER_POS'] >= n_base)].assign(
+                SOURCE=lambda v: np.where(v['POS'] >= n_base, 'DELTA', 'BASELINE'),
+                OTHER_SOURCE=lambda v: np.where(v['OTHER_POS'] < 0, None,
+                                                np.where(v['OTHER_POS'] >= n_base, 'DELTA', 'BASELINE')))
+            expected = violation_keys(full, lambda source, pos: (source, pos - n_base if source == 'DELTA' else pos))
+            matched &= expected == violation_keys(result, lambda source, pos: (source, pos))
+
+        # 저장 → 다시 읽은 인덱스로 같은 묶음 check()
+        with tempfile.TemporaryDirectory() as tmp:
+            t0 = time.perf_counter()
+            index.save(tmp)
+            save_sec = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            loaded = VerificationIndex.load(tmp, rules)
+            load_sec = time.perf_counter() - t0
+        reloaded = all(violation_keys(loaded.check(delta), lambda source, pos: (source, pos))
+                       == violation_keys(result, lambda source, pos: (source, pos))
+                       for delta, result in zip(deltas, results))
+
+        n_violations = sum(len(result) for result in results)
+        print(f'{n_rows:>10,} {build_sec:>8.2f}s {check_ms:>8.1f}ms {full_sec:>10.3f}s {n_violations:>6,} {str(matched):>6} '
+              f'{save_sec:>7.2f}s {load_sec:>7.2f}s {str(reloaded):>10}')
+
+
+def bench_parallel(sizes, base, relation_rules):
+    rules = compile_l1_rules(load_exam_master(), relation_rules, load_condition_rules())
+
+    print('='*70)
+    print(f'환자 분할 병렬 검증 (CPU {os.cpu_count()}개, 일치: 직렬 결과 CSV 바이트 비교)')
+    print('='*70)
+    print(f"{'행 수':>10} {'작업자':>6} {'시간':>9} {'배율':>6} {'위반':>10} {'일치':>6}")
+
+    for n_rows in sizes:
+        data = shift_to_weekend(make_verify_data(base, relation_rules, n_rows, noise_rate=GAP_NOISE_RATE))
+        first_copy = data['PATIENT_ID'].str.endswith('_000').to_numpy()
+        data['RESOURCE_ID'] = np.where(first_copy, data['RESOURCE_ID'].astype(object), '')
+
+        t0 = time.perf_counter()
+        serial = rules.evaluate(data)
+        serial_sec = time.perf_counter() - t0
+        expected = serial.to_csv(index=False)
+        print(f"{n_rows:>10,} {'직렬':>6} {serial_sec:>8.2f}s {1:>6.2f} {len(serial):>10,} {'-':>6}")
+
+        for n_workers in PARALLEL_WORKERS:
+            t0 = time.perf_counter()
+            violations = evaluate_parallel(rules, data, n_workers)
+            sec = time.perf_counter() - t0
+            matched = violations.to_csv(index=False) == expected
+            print(f'{n_rows:>10,} {n_workers:>6} {sec:>8.2f}s {serial_sec / sec:>6.2f} {len(violations):>10,} {str(matched):>6}')
+
+
+def make_archive_data(base, relation_rules, n_rows):
+    """여러 해 보관 파일 모사: k번째 복제본을 52주 × k 뒤로 옮겨 날짜순 정렬 → DataFrame"""
+    data = shift_to_weekend(make_verify_data(base, relation_rules, n_rows, noise_rate=GAP_NOISE_RATE))
+    copy = data['PATIENT_ID'].str.slice(-3).astype(int).to_numpy()
+    offsets = pd.to_timedelta(copy * 52 * 7, unit='D')
+    dates = pd.to_datetime(data['RESERVATION_DATE'].astype(object)) + offsets
+    data['RESERVATION_DATE'] = dates.dt.strftime('%Y-%m-%d')
+    data['RESERVATION_DATETIME'] = data['RESERVATION_DATETIME'] + offsets
+    data = data.assign(_DATE=dates).sort_values(['_DATE', 'RESERVATION_DATETIME'], kind='stable')
+    return data.drop(columns=['_DATE', 'END_DATETIME']).reset_index(drop=True)
+
+
+def run_child(mode, path):
+    """새 프로세스에서 검증 1회 → {'rows', 'sec', 'rss_mb', ...} (최대 RSS를 실행별로 따로 재기 위함)"""
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), mode, path],
+                            capture_output=True, text=True, encoding='utf-8', check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def stream_child(mode, path):
+    """run_child()의 자식 프로세스 쪽: 스트리밍 또는 메모리 적재 검증 후 결과 JSON 한 줄 출력"""
+    rules = compile_l1_rules(load_exam_master(), load_relation_rules(), load_condition_rules())
+    t0 = time.perf_counter()
+    if mode == 'stream-run':
+        verifier = StreamingVerifier(rules)
+        n_violations = sum(len(v) for v in iter_violations(rules, path, verifier=verifier))
+        rows, carry = verifier.rows_read, verifier.max_carry
+    else:
+        reservation = load_reservation(path, use_cache=False)
+        n_violations = len(rules.evaluate(reservation))
+        rows, carry = len(reservation), len(reservation)
+    print(json.dumps({'rows': rows, 'sec': time.perf_counter() - t0, 'rss_mb': peak_rss_mb(),
+                      'violations': n_violations, 'carry': carry}))
+
+
+def bench_stream(sizes, base, relation_rules):
+    rules = compile_l1_rules(load_exam_master(), relation_rules, load_condition_rules())
+
+    print('='*70)
+    print('스트리밍 검증 (여러 해 보관 파일 모사, 실행마다 새 프로세스에서 최대 RSS 측정)')
+    print('='*70)
+    print(f"{'행 수':>10} {'방식':>6} {'시간':>8} {'행/초':>10} {'최대 RSS':>10} {'상태 행':>10} {'위반':>9} {'일치':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            path = os.path.join(tmp, f'RESERVATION_{n_rows}.csv')
+            data = make_archive_data(base, relation_rules, n_rows)
+            data.to_csv(path, index=False)
+            del data
+
+            # 위반 집합 비교: 메모리 적재 evaluate() vs 스트리밍 (POS/OTHER_POS는 파일 행 번호)
+            matched = '-'
+            if n_rows <= STREAM_COMPARE_MAX:
+                key = ['RULE_ID', 'POS', 'OTHER_POS', 'DETAIL']
+                full = rules.evaluate(load_reservation(path, use_cache=False))
+                streamed = pd.concat(list(iter_violations(rules, path)), ignore_index=True)
+                matched = str(set(map(tuple, full[key].to_numpy().tolist()))
+                              == set(map(tuple, streamed[key].to_numpy().tolist())) and len(full) == len(streamed))
+
+            for mode, label in (('memory-run', '적재'), ('stream-run', '스트림')):
+                result = run_child(mode, path)
+                print(f"{n_rows:>10,} {label:>6} {result['sec']:>7.1f}s {result['rows'] / result['sec']:>10,.0f} "
+                      f"{result['rss_mb']:>8,.0f}MB {result['carry']:>10,} {result['violations']:>9,} {matched:>6}")
+
+
+def check_output(base, relation_rules):
+    """위반 0건 / 전체 위반을 JSONL · Parquet로 저장 후 다시 읽어 확인"""
+    rules = compile_l1_rules(load_exam_master(), relation_rules, load_condition_rules())
+    violations = rules.evaluate(base)
+    batches = {'0건': [], '전체': [violations]}
+
+    print('='*70)
+    print('위반 레코드 저장 / 읽기 (close 후 파일 존재, 컬럼, 건수)')
+    print('='*70)
+    print(f"{'묶음':>6} {'형식':>8} {'기록':>9} {'읽음':>9} {'파일':>6} {'컬럼':>6} {'일치':>6}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, parts in batches.items():
+            for file_format in ('jsonl', 'parquet'):
+                path = os.path.join(tmp, f'violations.{file_format}')
+                with ViolationWriter(path) as writer:
+                    for part in parts:
+                        writer.write(part)
+                exists = os.path.exists(path)
+                loaded = read_violations(path) if exists else pd.DataFrame()
+                columns = list(loaded.columns) == VIOLATION_COLUMNS
+                matched = (exists and columns and len(loaded) == writer.records
+                           and set(loaded['RESERVATION_ID'].dropna()) == set(
+                               sum((part['RESERVATION_ID'].dropna().tolist() for part in parts), [])))
+                print(f'{label:>6} {file_format:>8} {writer.records:>9,} {len(loaded):>9,} '
+                      f'{str(exists):>6} {str(columns):>6} {str(matched):>6}')
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args and args[0] in ('stream-run', 'memory-run'):
+        stream_child(args[0], args[1])
+        sys.exit(0)
+
+    base = load_reservation()
+    relation_rules = load_relation_rules()
+    if args and args[0] == 'gap':
+        bench_gap([int(a) for a in args[1:]] or GAP_SIZES, base, relation_rules)
+    elif args and args[0] == 'delta':
+        bench_delta([int(a) for a in args[1:]] or DELTA_SIZES, base, relation_rules)
+    elif args and args[0] == 'parallel':
+        bench_parallel([int(a) for a in args[1:]] or PARALLEL_SIZES, base, relation_rules)
+    elif args and args[0] == 'stream':
+        bench_stream([int(a) for a in args[1:]] or STREAM_SIZES, base, relation_rules)
+    elif args and args[0] == 'output':
+        check_output(base, relation_rules)
+    elif args and args[0] == 'l1':
+        bench_l1([int(a) for a in args[1:]] or L1_SIZES, base, relation_rules)
+    else:
+        bench_same_day([int(a) for a in args] or VERIFY_SIZES, base, relation_rules)
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""
+장비 최소 필요 대수 계산 (동시 진행 검사 수 기반)
+- (장비유형, 예약일)별 시작(+1)/종료(-1) 이벤트를 정렬해 누적합 = 동시 진행 검사 수
+  같은 시각이면 종료를 먼저 처리 (종료 시각 = 다음 검사 시작 가능 시각, 배정 규칙과 동일)
+- 일별 최대 동시 검사 수 = 그날 필요한 최소 대수 (구간 분할 최적해)
+- 장비유형별 필요 대수: 일별 최대값의 max / p95 / p99, 최대치를 만든 날짜·시간대
+- 권장 대수로 RESOURCE CSV 생성 (RESOURCE_ID, EQUIPMENT_TYPE, RESOURCE_NAME)
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+from data_loader import data_path, load_reservation
+from resource_assigner import assign_resources, resource_lists_from_counts
+
+QUANTILES = [0.95, 0.99]
+RECOMMEND_BASIS = 'MAX'          # 권장 대수 기준: 'MAX' / 'P95' / 'P99'
+TOP_PEAK_DAYS = 3                # 장비유형별 출력할 최대치 날짜 수
+RECOMMEND_OUTPUT = data_path('RESOURCE_RECOMMENDED')
+
+
+def daily_peak_concurrency(reservation):
+    """(EQUIPMENT_TYPE, RESERVATION_DATE)별 최대 동시 검사 수와 그 구간 → DataFrame
+
+    컬럼: EQUIPMENT_TYPE, RESERVATION_DATE, RESERVATIONS, PEAK, PEAK_START, PEAK_END
+    PEAK_START ~ PEAK_END: 최대치가 처음 나타난 구간
+    """
+    columns = ['EQUIPMENT_TYPE', 'RESERVATION_DATE', 'RESERVATIONS', 'PEAK', 'PEAK_START', 'PEAK_END']
+    if len(reservation) == 0:
+        return pd.DataFrame(columns=columns)
+
+    keys = reservation[['EQUIPMENT_TYPE', 'RESERVATION_DATE']].astype(object)
+    group_codes, group_keys = pd.factorize(pd.MultiIndex.from_frame(keys))
+    starts = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    ends = reservation['END_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+    n = len(reservation)
+    event_group = np.concatenate([group_codes, group_codes])
+    event_time = np.concatenate([starts, ends])
+    event_delta = np.concatenate([np.ones(n, dtype=np.int64), -np.ones(n, dtype=np.int64)])
+
+    # (그룹, 시각, 종료 먼저) 정렬 → 그룹마다 합이 0이므로 전체 누적합이 곧 그룹 내 동시 검사 수
+    order = np.lexsort((event_delta, event_time, event_group))
+    event_group = event_group[order]
+    event_time = event_time[order]
+    running = np.cumsum(event_delta[order])
+
+    events = pd.DataFrame({'GROUP': event_group, 'RUNNING': running})
+    peak_idx = events.groupby('GROUP', sort=True)['RUNNING'].idxmax().to_numpy()
+
+    group_ids = np.arange(len(group_keys))
+    return pd.DataFrame({
+        'EQUIPMENT_TYPE': group_keys.get_level_values(0)[group_ids],
+        'RESERVATION_DATE': group_keys.get_level_values(1)[group_ids],
+        'RESERVATIONS': np.bincount(group_codes, minlength=len(group_keys)),
+        'PEAK': running[peak_idx],
+        'PEAK_START': pd.to_datetime(event_time[peak_idx]),
+        'PEAK_END': pd.to_datetime(event_time[peak_idx + 1]),
+    }).sort_values(['EQUIPMENT_TYPE', 'RESERVATION_DATE']).reset_index(drop=True)
+
+
+def required_capacity(daily_peaks, quantiles=QUANTILES):
+    """장비유형별 필요 대수 (일별 최대 동시 검사 수의 max / 분위수, 올림) → DataFrame"""
+    rows = []
+    for equip_type, group in daily_peaks.groupby('EQUIPMENT_TYPE', sort=True):
+        peaks = group['PEAK'].to_numpy()
+        row = {
+            'EQUIPMENT_TYPE': equip_type,
+            'DAYS': len(group),
+            'MAX': int(peaks.max()),
+            'MAX_DAYS': int((peaks == peaks.max()).sum()),
+        }
+        for q in quantiles:
+            row[f'P{round(q * 100)}'] = int(np.ceil(np.quantile(peaks, q)))
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def peak_windows(daily_peaks, top=TOP_PEAK_DAYS):
+    """장비유형별 최대치 상위 날짜/시간대 (PEAK 내림차순, 날짜 오름차순) → DataFrame"""
+    ordered = daily_peaks.sort_values(['EQUIPMENT_TYPE', 'PEAK', 'RESERVATION_DATE'],
+                                      ascending=[True, False, True])
+    return ordered.groupby('EQUIPMENT_TYPE', sort=True).head(top).reset_index(drop=True)
+
+
+def recommend_resources(capacity, basis=RECOMMEND_BASIS):
+    """필요 대수 표 → RESOURCE DataFrame (assign_resource.py와 같은 ID/이름 규칙)"""
+    resource_counts = dict(zip(capacity['EQUIPMENT_TYPE'], capacity[basis].astype(int)))
+    resources = []
+    for equip_type in sorted(resource_counts.keys()):
+        for i in range(1, resource_counts[equip_type] + 1):
+            resources.append({
+                'RESOURCE_ID': f'{equip_type}_{i:02d}',
+                'EQUIPMENT_TYPE': equip_type,
+                'RESOURCE_NAME': f'{equip_type} {i}호기'
+            })
+    return pd.DataFrame(resources), resource_counts
+
+
+if __name__ == '__main__':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+    reservation = load_reservation()
+
+    print('='*70)
+    print('장비 최소 필요 대수 (일별 최대 동시 검사 수)')
+    print('='*70)
+    print(f'예약 건수: {len(reservation)}건')
+
+    daily_peaks = daily_peak_concurrency(reservation)
+    capacity = required_capacity(daily_peaks)
+
+    print(f'\n### 장비유형별 필요 대수 ###')
+    print(capacity.to_string(index=False))
+
+    print(f'\n### 최대치 발생 날짜/시간대 (장비유형별 상위 {TOP_PEAK_DAYS}일) ###')
+    for row in peak_windows(daily_peaks).itertuples(index=False):
+        print(f'  {row.EQUIPMENT_TYPE}: {row.RESERVATION_DATE} {row.PEAK_START.strftime("%H:%M")}'
+              f'~{row.PEAK_END.strftime("%H:%M")} 동시 {row.PEAK}건 (당일 {row.RESERVATIONS}건)')
+
+    resource_df, resource_counts = recommend_resources(capacity)
+    resource_df.to_csv(RECOMMEND_OUTPUT, index=False, encoding='utf-8-sig')
+
+    print(f'\n### 권장 대수 ({RECOMMEND_BASIS} 기준) ###')
+    print(f'RESOURCE_COUNTS = {resource_counts}')
+    print(f'저장 완료: {RECOMMEND_OUTPUT} ({len(resource_df)}대)')
+
+    # 권장 대수로 실제 배정 시 자원 부족 건수 확인
+    _, shortages = assign_resources(reservation, resource_lists_from_counts(resource_counts))
+    print(f'검증: 권장 대수로 배정 시 자원 부족 {len(shortages)}건')
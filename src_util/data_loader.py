@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+공용 데이터 로더 (타입 지정 + 바이너리 캐시)
+- 데이터 폴더: 환경변수 RESERVATION_DATA_DIR (없으면 DEFAULT_DATA_DIR = 원작성자 로컬 경로, 다른 환경에서는 환경변수 지정)
+- RESERVATION: 코드/장비 컬럼 category, RESERVATION_DATETIME 파싱, END_DATETIME 미리 계산
+- 파싱 결과를 <csv>.cache.arrow 사이드카(Arrow IPC 파일)에 저장, 다음 실행부터 CSV 파싱 생략
+  캐시는 컬럼 데이터 + JSON 메타데이터만 담음 (pickle이 아니라 읽을 때 코드 실행 없음)
+  읽을 수 없거나 형식이 다른 사이드카는 무시하고 CSV에서 다시 만듦, pyarrow가 없으면 캐시 없이 CSV 파싱
+- 캐시 무효화: 파일 크기/수정시각이 같으면 바로 사용, 다르면 내용 해시 비교
+- 청크 읽기 (iter_reservation_chunks): 캐시 없이 CHUNK_ROWS행씩 타입 지정해 순차 반환 (대용량 파일 스트리밍)
+"""
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+DEFAULT_DATA_DIR = r'c:\Users\user\Desktop\검사규칙 합성데이터\data'
+DATA_DIR = os.environ.get('RESERVATION_DATA_DIR', DEFAULT_DATA_DIR)
+
+CACHE_SUFFIX = '.cache.arrow'
+CACHE_VERSION = 2
+CACHE_META_KEY = b'reservation_loader_cache'
+HASH_CHUNK_BYTES = 1 << 20
+CHUNK_ROWS = 200_000
+
+# 테이블별 타입 지정
+TABLE_SPECS = {
+    'RESERVATION': {
+        'category': ['EXAM_CD', 'EXAM_NM', 'EQUIPMENT_TYPE', 'RESOURCE_ID'],
+        'datetime': ['RESERVATION_DATETIME'],
+        'end_datetime': True,
+    },
+    'RESOURCE': {},
+    'RESOURCE_CAPABILITY': {},
+    'RESOURCE_CALENDAR': {},
+    'EXAM_MASTER': {},
+    'EXAM_RELATION_RULES': {},
+    'EXAM_CONDITION_RULES': {},
+}
+
+
+def data_path(name, data_dir=None):
+    """테이블 이름 → CSV 경로 (예: 'RESERVATION' → <DATA_DIR>/RESERVATION.csv)"""
+    return os.path.join(data_dir or DATA_DIR, f'{name}.csv')
+
+
+def file_hash(path):
+    """파일 내용 해시 (blake2b)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def apply_types(df, spec):
+    """타입 지정 적용 (category / datetime / END_DATETIME)"""
+    for col in spec.get('category', []):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+    for col in spec.get('datetime', []):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col])
+    if spec.get('end_datetime') and 'RESERVATION_DATETIME' in df.columns:
+        df['END_DATETIME'] = df['RESERVATION_DATETIME'] + pd.to_timedelta(df['DURATION_MIN'], unit='m')
+    return df
+
+
+def _read_cache(cache_path):
+    """사이드카 → (메타데이터 dict, Arrow Table) 또는 None (없음/손상/pyarrow 없음)"""
+    try:
+        import pyarrow as pa
+        with pa.OSFile(cache_path, 'rb') as source:
+            table = pa.ipc.open_file(source).read_all()
+        return json.loads(table.schema.metadata[CACHE_META_KEY]), table
+    except (ImportError, OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(cache_path, meta, df):
+    """임시 파일에 쓴 뒤 교체 (쓰기 실패 시 캐시 없이 진행)"""
+    try:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (ImportError, ValueError, TypeError):
+        return
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), CACHE_META_KEY: json.dumps(meta)})
+
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def load_csv(path, spec=None, use_cache=True):
+    """CSV → 타입 지정 DataFrame (사이드카 캐시 사용)"""
+    spec = spec or {}
+    if not use_cache:
+        return apply_types(pd.read_csv(path), spec)
+
+    stat = os.stat(path)
+    cache_path = path + CACHE_SUFFIX
+    cached = _read_cache(cache_path)
+    meta = cached[0] if cached is not None else {}
+
+    if meta.get('version') == CACHE_VERSION and meta.get('spec') == spec:
+        table = cached[1]
+        if (meta['size'], meta['mtime_ns']) == (stat.st_size, stat.st_mtime_ns):
+            return table.to_pandas()
+
+        # 크기/수정시각이 다르면 내용 해시로 확인 (복사·touch 등으로 시각만 바뀐 경우 재사용)
+        content_hash = file_hash(path)
+        if meta['size'] == stat.st_size and meta['hash'] == content_hash:
+            df = table.to_pandas()
+            _write_cache(cache_path, {**meta, 'mtime_ns': stat.st_mtime_ns}, df)
+            return df
+    else:
+        content_hash = file_hash(path)
+
+    df = apply_types(pd.read_csv(path), spec)
+    _write_cache(cache_path, {
+        'version': CACHE_VERSION,
+        'spec': spec,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': content_hash,
+    }, df)
+    return df
+
+
+def iter_csv_chunks(path, spec=None, chunk_rows=CHUNK_ROWS):
+    """CSV → 타입 지정 DataFrame 청크 순차 반환 (전체를 메모리에 올리지 않음, 캐시 미사용)"""
+    with pd.read_csv(path, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            yield apply_types(chunk, spec or {})
+
+
+def load_table(name, data_dir=None, use_cache=True):
+    """데이터 폴더의 테이블 로드 (TABLE_SPECS 타입 적용)"""
+    return load_csv(data_path(name, data_dir), TABLE_SPECS.get(name), use_cache)
+
+
+def load_reservation(path=None, use_cache=True):
+    """RESERVATION 로드 (RESERVATION_DATETIME/END_DATETIME datetime, 코드 컬럼 category)"""
+    return load_csv(path or data_path('RESERVATION'), TABLE_SPECS['RESERVATION'], use_cache)
+
+
+def iter_reservation_chunks(path=None, chunk_rows=CHUNK_ROWS):
+    """RESERVATION 청크 순차 반환 (load_reservation과 같은 타입 지정)"""
+    return iter_csv_chunks(path or data_path('RESERVATION'), TABLE_SPECS['RESERVATION'], chunk_rows)
+
+
+def load_resource(data_dir=None, use_cache=True):
+    return load_table('RESOURCE', data_dir, use_cache)
+
+
+def load_resource_capability(data_dir=None, use_cache=True):
+    return load_table('RESOURCE_CAPABILITY', data_dir, use_cache)
+
+
+def load_resource_calendar(data_dir=None, use_cache=True):
+    return load_table('RESOURCE_CALENDAR', data_dir, use_cache)
+
+
+def load_exam_master(data_dir=None, use_cache=True):
+    return load_table('EXAM_MASTER', data_dir, use_cache)
+
+
+def load_relation_rules(data_dir=None, use_cache=True):
+    return load_table('EXAM_RELATION_RULES', data_dir, use_cache)
+
+
+def load_condition_rules(data_dir=None, use_cache=True):
+    return load_table('EXAM_CONDITION_RULES', data_dir, use_cache)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+장비유형별 검사 추첨기 (사용 횟수 기반 균등 분배)
+- Fenwick 트리에 검사별 사용 횟수를 누적, 사용 1회 반영과 추첨 모두 O(log n)
+- 가중 추첨: 가중치 = (최대 사용 횟수 + 2) - 사용 횟수
+  → random.choices(candidates, weights)와 같은 난수 소비 · 같은 결과
+- 최소 사용 추첨: 사용 횟수 <= 최소 + 2 인 검사 중 균등 추첨
+  → random.choice(least_used)와 같은 난수 소비 · 같은 결과
+"""
+
+import random as _random
+
+
+class FenwickTree:
+    """1-based 누적합 트리 (정수 값)"""
+
+    def __init__(self, n):
+        self.n = n
+        self.tree = [0] * (n + 1)
+        self.top_bit = 1 << (n.bit_length() - 1) if n else 0
+
+    def add(self, index, delta):
+        """0-based index 위치에 delta 더하기"""
+        i = index + 1
+        while i <= self.n:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count):
+        """앞에서 count개 원소의 합"""
+        total = 0
+        i = count
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def find_kth(self, k):
+        """누적합이 k 이상이 되는 첫 0-based 위치 (값이 0/1인 지시 트리용)"""
+        pos = 0
+        step = self.top_bit
+        while step:
+            nxt = pos + step
+            if nxt <= self.n and self.tree[nxt] < k:
+                pos = nxt
+                k -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class UsageBalancedSampler:
+    """검사 목록 1개(장비유형 1개)의 사용 횟수 기반 추첨기"""
+
+    def __init__(self, exams):
+        self.exams = list(exams)
+        self.position = {exam_cd: i for i, exam_cd in enumerate(self.exams)}
+        self.reset()
+
+    def reset(self):
+        """사용 횟수 0으로 초기화"""
+        n = len(self.exams)
+        self.counts = [0] * n
+        self.total_count = 0
+        self.max_count = 0
+        self.min_count = 0
+
+        self._usage = FenwickTree(n)            # 검사별 사용 횟수
+        self._eligible = FenwickTree(n)         # 사용 횟수 <= min + 2 여부 (0/1)
+        self._by_count = {0: set(range(n))}     # 사용 횟수 -> 검사 위치 집합
+        for i in range(n):
+            self._eligible.add(i, 1)
+
+    def __len__(self):
+        return len(self.exams)
+
+    def increment(self, exam_cd):
+        """검사 1회 사용 반영 (O(log n), 최소값 갱신 시 분할상환 O(log n))"""
+        i = self.position[exam_cd]
+        old = self.counts[i]
+        new = old + 1
+        self.counts[i] = new
+        self.total_count += 1
+        self.max_count = max(self.max_count, new)
+        self._usage.add(i, 1)
+
+        self._by_count[old].discard(i)
+        self._by_count.setdefault(new, set()).add(i)
+        if old <= self.min_count + 2 < new:
+            self._eligible.add(i, -1)
+
+        if old == self.min_count and not self._by_count[old]:
+            del self._by_count[old]
+            self.min_count += 1
+            for j in self._by_count.get(self.min_count + 2, ()):
+                self._eligible.add(j, 1)
+
+    def _candidates(self, exclude_exams):
+        return [e for e in self.exams if e not in exclude_exams]
+
+    def sample_weighted(self, rng=_random, exclude_exams=None):
+        """사용 횟수에 반비례하는 가중 추첨 (O(log n))"""
+        if exclude_exams:
+            # 제외 검사가 있으면 후보별 가중치를 직접 계산
+            candidates = self._candidates(exclude_exams)
+            if not candidates:
+                return None
+            max_count = max(self.counts[self.position[e]] for e in candidates) + 1
+            weights = [max_count - self.counts[self.position[e]] + 1 for e in candidates]
+            return rng.choices(candidates, weights=weights, k=1)[0]
+
+        n = len(self.exams)
+        if n == 0:
+            return None
+
+        # i번째 가중치 = base - counts[i] → 앞 j개 합 = j * base - (사용 횟수 누적합)
+        base = self.max_count + 2
+        target = rng.random() * float(n * base - self.total_count)
+
+        pos = 0
+        acc = 0
+        step = self._usage.top_bit
+        tree = self._usage.tree
+        while step:
+            nxt = pos + step
+            if nxt <= n:
+                block = step * base - tree[nxt]
+                if acc + block <= target:
+                    pos = nxt
+                    acc += block
+            step >>= 1
+        return self.exams[min(pos, n - 1)]
+
+    def sample_least_used(self, rng=_random, exclude_exams=None):
+        """사용 횟수가 (최소 + 2) 이하인 검사 중 균등 추첨 (O(log n))"""
+        if exclude_exams:
+            candidates = self._candidates(exclude_exams)
+            if not candidates:
+                return None
+            min_count = min(self.counts[self.position[e]] for e in candidates)
+            least_used = [e for e in candidates if self.counts[self.position[e]] <= min_count + 2]
+            return rng.choice(least_used)
+
+        n_eligible = self._eligible.prefix(len(self.exams))
+        if n_eligible == 0:
+            return None
+        k = rng.randrange(n_eligible)
+        return self.exams[self._eligible.find_kth(k + 1)]
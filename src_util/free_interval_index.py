@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+자원 빈 구간 인덱스 (슬롯 탐색)
+- (자원, 날짜)마다 빈 구간 = 캘린더 가용 구간 - 예약 구간 (00:00 기준 분, 시작 순)
+  기존 예약은 생성 시 groupby 1회로 (자원, 날짜)별 사용 구간으로 묶고,
+  빈 구간은 처음 조회하는 (자원, 날짜)에서 한 번 계산해 보관
+- 이분 탐색용 보조 배열 (DayGaps)
+  prefix_max: 앞에서부터 누적 최대 길이 (비감소) → 길이 d 이상인 첫 빈 구간 = bisect_left(prefix_max, d)
+  by_length:  (길이, 시작, 종료) 정렬 → 길이 d 이상인 빈 구간 전부 = bisect_left 위치부터 끝까지
+- book(): 예약 1건을 해당 (자원, 날짜) 빈 구간에서 잘라냄 (그 날짜 보조 배열만 다시 계산)
+- earliest_fit(): 날짜 순으로 자원별 첫 빈 구간을 이분 탐색, 가장 이른 시작 (같으면 자원 목록 순)
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+
+import pandas as pd
+
+from resource_calendar import date_key, normalize_intervals, subtract_intervals
+
+
+class DayGaps:
+    """(자원, 날짜) 1개의 빈 구간 [(시작, 종료), ...] (시작 순) + 이분 탐색용 보조 배열"""
+
+    __slots__ = ('gaps', 'prefix_max', 'by_length')
+
+    def __init__(self, gaps):
+        self.gaps = gaps
+        self.prefix_max = list(accumulate((end - start for start, end in gaps), max))
+        self.by_length = sorted((end - start, start, end) for start, end in gaps)
+
+    def earliest_fit(self, duration):
+        """길이 duration 이상인 첫 빈 구간 (시작, 종료) 또는 None"""
+        i = bisect_left(self.prefix_max, duration)
+        return self.gaps[i] if i < len(self.gaps) else None
+
+    def all_fits(self, duration):
+        """길이 duration 이상인 빈 구간 전부 (시작 순)"""
+        i = bisect_left(self.by_length, (duration,))
+        return sorted((start, end) for _, start, end in self.by_length[i:])
+
+    def without(self, start_min, end_min):
+        """[start_min, end_min)을 뺀 DayGaps (빈 구간 1개 안에 들어가지 않으면 ValueError)"""
+        i = bisect_right(self.gaps, (start_min, float('inf'))) - 1
+        if i < 0 or self.gaps[i][1] < end_min:
+            raise ValueError(f'빈 구간이 아님: {start_min}~{end_min}')
+        gap_start, gap_end = self.gaps[i]
+        pieces = [(s, e) for s, e in ((gap_start, start_min), (end_min, gap_end)) if e > s]
+        return DayGaps(self.gaps[:i] + pieces + self.gaps[i + 1:])
+
+
+class FreeIntervalIndex:
+    """자원별 · 날짜별 빈 구간 인덱스
+
+    calendar: ResourceCalendar (가용 구간)
+    reservation: RESOURCE_ID가 배정된 기존 예약 (RESERVATION_DATE 'YYYY-MM-DD', RESERVATION_DATETIME, END_DATETIME)
+    """
+
+    def __init__(self, calendar, reservation=None):
+        self.calendar = calendar
+        self.busy = {}              # (RESOURCE_ID, 날짜) -> [사용 구간] (정렬·병합)
+        self.days = {}              # (RESOURCE_ID, 날짜) -> DayGaps (조회 시 계산)
+        if reservation is not None:
+            self._add_reservation(reservation)
+
+    def _add_reservation(self, reservation):
+        resource_ids = reservation['RESOURCE_ID'].astype(object)
+        assigned = (resource_ids.notna() & (resource_ids != '')).to_numpy()
+        frame = reservation[assigned]
+        days = frame['RESERVATION_DATE'].astype(str).str.slice(0, 10)
+        midnight = pd.to_datetime(days)
+        starts = ((frame['RESERVATION_DATETIME'] - midnight) // pd.Timedelta(minutes=1)).to_numpy()
+        ends = ((frame['END_DATETIME'] - midnight) // pd.Timedelta(minutes=1)).to_numpy()
+
+        groups = pd.Series(starts).groupby([resource_ids[assigned].to_numpy(), days.to_numpy()], sort=False)
+        for key, idx in groups.indices.items():
+            intervals = list(zip(starts[idx].tolist(), ends[idx].tolist()))
+            self.busy[key] = normalize_intervals(self.busy.get(key, []) + intervals)
+            self.days.pop(key, None)
+
+    def day(self, resource_id, date):
+        """(자원, 날짜) 빈 구간 DayGaps"""
+        key = (resource_id, date_key(date))
+        gaps = self.days.get(key)
+        if gaps is None:
+            available = self.calendar.availability(resource_id, key[1])
+            gaps = self.days[key] = DayGaps(subtract_intervals(available, self.busy.get(key, [])))
+        return gaps
+
+    def all_fits(self, resource_id, date, duration):
+        """그날 길이 duration 이상인 빈 구간 전부"""
+        return self.day(resource_id, date).all_fits(duration)
+
+    def earliest_fit(self, resource_ids, dates, duration):
+        """dates 순으로 첫 가용 슬롯 → (날짜, RESOURCE_ID, 시작 분, 종료 분) 또는 None
+
+        같은 날짜 안에서는 가장 이른 시작, 같으면 resource_ids 순
+        """
+        for date in dates:
+            best = None
+            for resource_id in resource_ids:
+                gap = self.day(resource_id, date).earliest_fit(duration)
+                if gap is not None and (best is None or gap[0] < best[2]):
+                    best = (date_key(date), resource_id, gap[0], gap[0] + duration)
+            if best is not None:
+                return best
+        return None
+
+    def book(self, resource_id, date, start_min, end_min):
+        """예약 1건 반영 (빈 구간에서 잘라냄, 비어 있지 않은 구간이면 ValueError)"""
+        key = (resource_id, date_key(date))
+        self.days[key] = self.day(resource_id, date).without(start_min, end_min)
+        self.busy[key] = normalize_intervals(self.busy.get(key, []) + [(start_min, end_min)])
@@ -9,24 +9,66 @@ RESERVATION 합성 데이터 생성기 v2
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import contextlib
+import io
+import os
 import random
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+from data_loader import (DATA_DIR, data_path, load_condition_rules, load_csv, load_exam_master, load_relation_rules,
+                         load_resource_capability)
+from exam_sampler import UsageBalancedSampler
+from generation_stats import ACCEPTED, GenerationStats
+from occupancy import DayOccupancy, SLOT_MIN, SLOTS_PER_DAY, resources_by_type, slots_needed
+from patient_history import PatientHistory
+from reservation_writer import MonthlyPartitionWriter
+from resource_calendar import load_calendar
+from resource_capability import CapabilityMatrix
+from rule_index import RuleIndex
+from time_model import format_reservation_times, parse_hhmm
 
 sys.stdout.reconfigure(encoding='utf-8')
-random.seed(42)
-np.random.seed(42)
 
 # ============================================================================
 # 데이터 로드
 # ============================================================================
-exam_master = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_MASTER.csv')
-relation_rules = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_RELATION_RULES.csv')
-condition_rules = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_CONDITION_RULES.csv')
+exam_master = load_exam_master()
+relation_rules = load_relation_rules()
+condition_rules = load_condition_rules()
 
 print(f"EXAM_MASTER: {len(exam_master)}개 검사")
 print(f"RELATION_RULES: {len(relation_rules)}개 규칙")
 print(f"CONDITION_RULES: {len(condition_rules)}개 규칙")
 
+# 용량 고려 생성: RESOURCE.csv 장비 대수 안에서만 배치 (자원 배정 가능한 데이터 보장)
+CAPACITY_AWARE = True
+RESOURCE_PATH = data_path('RESOURCE')
+
+# 자원 캘린더(RESOURCE_CALENDAR.csv): 병원 운영시간 + 자원별 사용 불가 구간을 점유 비트맵에서 차감
+# 수행 가능 자원(RESOURCE_CAPABILITY.csv): 검사마다 수행 가능한 자원 행만 보고 배치 (assign_with_capabilities와 같은 제약)
+resource_ids_by_type = None
+calendar = None
+exam_resources = {}             # EXAM_CD -> 수행 가능 자원 tuple (수행 가능 검사 수가 적은 자원부터), 없으면 장비유형 전체
+if CAPACITY_AWARE:
+    if os.path.exists(RESOURCE_PATH):
+        resource_df = load_csv(RESOURCE_PATH)
+        resource_ids_by_type = resources_by_type(resource_df)
+        calendar = load_calendar(resource_df)
+        print(f"RESOURCE: {sum(len(v) for v in resource_ids_by_type.values())}대 (용량 고려 생성)")
+        if calendar is not None:
+            print("RESOURCE_CALENDAR: 자원별 가용시간 적용")
+        if os.path.exists(data_path('RESOURCE_CAPABILITY')):
+            capability = CapabilityMatrix(resource_df, exam_master, load_resource_capability())
+            order = {rid: i for i, rid in enumerate(capability.resource_order)}
+            exam_resources = {exam_cd: tuple(sorted(resources, key=lambda r: (capability.versatility[r], order[r])))
+                              for exam_cd, resources in capability.allowed.items()}
+            print("RESOURCE_CAPABILITY: 검사별 수행 가능 자원 적용")
+    else:
+        print(f"RESOURCE 파일 없음 → 용량 미고려 생성: {RESOURCE_PATH}")
+
 # ============================================================================
 # 규칙 사전 구성
 # ============================================================================
@@ -41,6 +83,9 @@ same_day_not_allowed = relation_rules[relation_rules['SAME_DAY_CD'] == 'N'].copy
 # GAP 규칙
 gap_rules = relation_rules[relation_rules['GAP_VALUE'].notna()].copy()
 
+# 검사 쌍 규칙 인덱스 (당일불가 쌍 집합, (A, B) → 간격/순서 레코드)
+rule_index = RuleIndex(relation_rules)
+
 # 검사 정보 딕셔너리
 exam_info = {}
 for _, row in exam_master.iterrows():
@@ -50,7 +95,10 @@ for _, row in exam_master.iterrows():
         'equipment': row['EQUIPMENT_TYPE'],
         'fasting': row['FASTING_HRS'] if pd.notna(row['FASTING_HRS']) else 0,
         'avail_start': row['AVAIL_START_TIME'] if pd.notna(row['AVAIL_START_TIME']) else None,
-        'avail_end': row['AVAIL_END_TIME'] if pd.notna(row['AVAIL_END_TIME']) else None
+        'avail_end': row['AVAIL_END_TIME'] if pd.notna(row['AVAIL_END_TIME']) else None,
+        # 운영시간 (00:00 기준 분, 로드 시 1회 파싱)
+        'avail_start_min': parse_hhmm(row['AVAIL_START_TIME']),
+        'avail_end_min': parse_hhmm(row['AVAIL_END_TIME'])
     }
 
 # ============================================================================
@@ -72,34 +120,38 @@ for eq_type, exams in exams_by_type.items():
 # ============================================================================
 exam_usage_count = {exam_cd: 0 for exam_cd in exam_info.keys()}
 
+# 장비유형별 추첨기 (사용 횟수 Fenwick 트리, exam_usage_count와 함께 갱신)
+exam_samplers = {eq_type: UsageBalancedSampler(exams) for eq_type, exams in exams_by_type.items()}
+
+def record_exam_usage(exam_cd):
+    """검사 사용 1회 반영"""
+    exam_usage_count[exam_cd] += 1
+    exam_samplers[exam_info[exam_cd]['equipment']].increment(exam_cd)
+
+def reset_exam_usage():
+    """사용 카운터/추첨기 초기화"""
+    for exam_cd in exam_usage_count:
+        exam_usage_count[exam_cd] = 0
+    for sampler in exam_samplers.values():
+        sampler.reset()
+
 def get_least_used_exam(equipment_type, exclude_exams=None):
     """해당 장비 유형에서 가장 적게 사용된 검사 반환"""
-    if exclude_exams is None:
-        exclude_exams = set()
-
-    candidates = [e for e in exams_by_type.get(equipment_type, []) if e not in exclude_exams]
-    if not candidates:
+    sampler = exam_samplers.get(equipment_type)
+    if sampler is None:
         return None
 
     # 사용 횟수가 가장 적은 검사 선택 (약간의 랜덤성 추가)
-    min_count = min(exam_usage_count[e] for e in candidates)
-    least_used = [e for e in candidates if exam_usage_count[e] <= min_count + 2]
-    return random.choice(least_used)
+    return sampler.sample_least_used(random, exclude_exams)
 
 def get_random_exam(equipment_type, exclude_exams=None):
     """해당 장비 유형에서 랜덤 검사 반환 (사용 빈도 고려)"""
-    if exclude_exams is None:
-        exclude_exams = set()
-
-    candidates = [e for e in exams_by_type.get(equipment_type, []) if e not in exclude_exams]
-    if not candidates:
+    sampler = exam_samplers.get(equipment_type)
+    if sampler is None:
         return None
 
     # 사용 횟수에 반비례하는 가중치
-    max_count = max(exam_usage_count[e] for e in candidates) + 1
-    weights = [max_count - exam_usage_count[e] + 1 for e in candidates]
-
-    return random.choices(candidates, weights=weights, k=1)[0]
+    return sampler.sample_weighted(random, exclude_exams)
 
 # ============================================================================
 # 검사 조합 정의 (현실적인 시나리오 + 다양성)
@@ -304,101 +356,128 @@ def is_weekend_allowed(exam_cd, date):
         return False
     return True
 
-def generate_time_slots(exams, date):
-    """검사 목록에 대해 순차적 시간 슬롯 생성 (10분 단위)"""
-    slots = []
-
-    weekday = date.weekday()
-    if weekday == 5:  # 토요일
-        current_time = datetime.combine(date, datetime.strptime('08:30', '%H:%M').time())
-        end_time = datetime.combine(date, datetime.strptime('12:30', '%H:%M').time())
-    else:
-        current_time = datetime.combine(date, datetime.strptime('08:30', '%H:%M').time())
-        end_time = datetime.combine(date, datetime.strptime('17:30', '%H:%M').time())
-
-    # 시작 시간을 랜덤하게 조정 (10분 단위로)
-    total_duration = sum(exam_info.get(e, {}).get('duration', 20) for e in exams)
-    available_minutes = (end_time - current_time).seconds // 60 - total_duration - 30
+# 운영 시간 (00:00 기준 분) - 자원 캘린더가 없을 때 사용
+DAY_START_MIN = parse_hhmm('08:30')
+WEEKDAY_END_MIN = parse_hhmm('17:30')
+SATURDAY_END_MIN = parse_hhmm('12:30')
+
+def day_hours(date):
+    """그날 병원 운영시간 (시작 분, 종료 분) - 휴무일이면 None"""
+    if calendar is None:
+        return DAY_START_MIN, SATURDAY_END_MIN if date.weekday() == 5 else WEEKDAY_END_MIN
+    hours = calendar.facility_hours(date)
+    if not hours:
+        return None
+    return hours[0][0], hours[-1][1]
 
-    if available_minutes > 0:
-        # 10분 단위로 조정 (0, 10, 20, 30, ...)
-        max_slots = min(available_minutes, 360) // 10
-        offset_slots = random.randint(0, max_slots)
-        current_time += timedelta(minutes=offset_slots * 10)
+def day_occupancy(date):
+    """그날 자원 점유 비트맵 (캘린더 사용 불가 구간을 미리 채움, 용량 미고려면 None)"""
+    if not resource_ids_by_type:
+        return None
+    return DayOccupancy(resource_ids_by_type, calendar.day_unavailable(date) if calendar is not None else None)
+
+def _feasible_offsets(layout, end_min, max_slots, occupancy):
+    """시작 오프셋(분) 후보 중 종료시간·자원 여유를 모두 만족하는 값 배열"""
+    offset_slots = np.arange(max_slots + 1)
+    ok = np.ones(max_slots + 1, dtype=bool)
+
+    for exam_cd, start_min, duration, shifts, has_avail in layout:
+        equipment = exam_info[exam_cd]['equipment']
+        resources = exam_resources.get(exam_cd)
+        n_slots = slots_needed(duration)
+
+        if shifts:
+            if not has_avail:
+                ok &= start_min + offset_slots * SLOT_MIN + duration <= end_min
+            start_slots = start_min // SLOT_MIN + offset_slots
+            in_day = start_slots < SLOTS_PER_DAY
+            fits = occupancy.fit_starts(equipment, n_slots, resources)
+            ok &= in_day & fits[np.minimum(start_slots, SLOTS_PER_DAY - 1)]
+        else:
+            # 야간 검사 이후는 오프셋과 무관한 고정 시각
+            if not has_avail and start_min + duration > end_min:
+                return offset_slots[:0]
+            if not occupancy.fits(equipment, start_min // SLOT_MIN, n_slots, resources):
+                return offset_slots[:0]
+
+    return offset_slots[ok] * SLOT_MIN
+
+def generate_time_slots(exams, date, occupancy=None, hours=None):
+    """검사 목록에 대해 순차적 시간 슬롯 생성 (10분 단위, 시각은 00:00 기준 분)
+
+    occupancy(DayOccupancy)를 주면 자원 비트맵상 배치 가능한 시작 시각 중에서만 무작위 선택
+    hours: (운영 시작 분, 운영 종료 분) - 생략 시 day_hours(date), 휴무일이면 None 반환
+    """
+    hours = hours or day_hours(date)
+    if hours is None:
+        return None
+    day_start_min, end_min = hours
 
+    # 오프셋 0 기준 배치: (검사, 시작 분, 소요, 오프셋 적용 여부, 운영시간 지정 여부)
+    layout = []
+    current_min = day_start_min
+    shifts = True
     for exam_cd in exams:
         info = exam_info.get(exam_cd, {})
         duration = info.get('duration', 20)
 
         # 검사별 운영시간 체크 (PSG, MSLT 등)
         if info.get('avail_start'):
-            exam_start = datetime.strptime(info['avail_start'], '%H:%M').time()
-            exam_end = datetime.strptime(info['avail_end'], '%H:%M').time()
             # 야간 검사 (PSG)
-            if exam_start > exam_end:
-                current_time = datetime.combine(date, exam_start)
+            if info['avail_start_min'] > info['avail_end_min']:
+                current_min = info['avail_start_min']
+                shifts = False
+
+        layout.append((exam_cd, current_min, duration, shifts, bool(info.get('avail_start'))))
+
+        # 다음 검사 시작 시간도 10분 단위로 올림
+        next_start = duration + 5
+        next_start = ((next_start + 9) // 10) * 10  # 10분 단위로 올림
+        current_min += next_start
+
+    # 시작 시간을 랜덤하게 조정 (10분 단위로)
+    total_duration = sum(exam_info.get(e, {}).get('duration', 20) for e in exams)
+    available_minutes = end_min - day_start_min - total_duration - 30
+    max_slots = min(available_minutes, 360) // 10 if available_minutes > 0 else 0
+
+    offset_min = 0
+    if occupancy is not None:
+        candidates = _feasible_offsets(layout, end_min, max_slots, occupancy)
+        if len(candidates) == 0:
+            return None
+        offset_min = int(candidates[random.randrange(len(candidates))])
+    elif available_minutes > 0:
+        # 10분 단위로 조정 (0, 10, 20, 30, ...)
+        offset_min = random.randint(0, max_slots) * 10
+
+    slots = []
+    for exam_cd, start_min, duration, shifts, has_avail in layout:
+        if shifts:
+            start_min += offset_min
 
-        # 종료시간 초과 체크
-        if current_time + timedelta(minutes=duration) > end_time:
-            # PSG/MSLT 같은 야간 검사는 예외
-            if not info.get('avail_start'):
-                return None
+        # 종료시간 초과 체크 (PSG/MSLT 같은 야간 검사는 예외)
+        if start_min + duration > end_min and not has_avail:
+            return None
 
         slots.append({
             'exam_cd': exam_cd,
-            'start_time': current_time,
+            'start_min': start_min,
             'duration': duration
         })
 
-        # 다음 검사 시작 시간도 10분 단위로 올림
-        next_start = duration + 5
-        next_start = ((next_start + 9) // 10) * 10  # 10분 단위로 올림
-        current_time += timedelta(minutes=next_start)
-
     return slots
 
 def check_patient_conflicts(patient_id, new_exams, new_date, patient_history):
-    """환자의 기존 예약과 충돌 검사"""
+    """환자의 기존 예약과 충돌 검사 (patient_history: PatientHistory)"""
     if patient_id not in patient_history:
         return True
 
-    history = patient_history[patient_id]
-
-    for new_exam in new_exams:
-        for hist in history:
-            hist_exam = hist['exam_cd']
-            hist_date = hist['date']
-
-            # SAME_DAY_CD = 'N' 체크
-            if new_date == hist_date:
-                conflict = same_day_not_allowed[
-                    ((same_day_not_allowed['EXAM_A'] == new_exam) & (same_day_not_allowed['EXAM_B'] == hist_exam)) |
-                    ((same_day_not_allowed['EXAM_A'] == hist_exam) & (same_day_not_allowed['EXAM_B'] == new_exam))
-                ]
-                if len(conflict) > 0:
-                    return False
-
-            # GAP 규칙 체크
-            for _, rule in gap_rules.iterrows():
-                if rule['EXAM_A'] == hist_exam and rule['EXAM_B'] == new_exam:
-                    gap_value = int(rule['GAP_VALUE'])
-                    gap_unit = rule['GAP_UNIT']
-
-                    if gap_unit == 'D':
-                        actual_gap = abs((new_date - hist_date).days)
-                        if actual_gap < gap_value:
-                            return False
-
-    return True
+    return not patient_history.has_conflict(patient_id, new_exams, new_date)
 
 # ============================================================================
 # 메인 생성 로직
 # ============================================================================
 
-print("\n" + "="*60)
-print("예약 데이터 생성 시작 (v2 - 골고루 분배)")
-print("="*60)
-
 # 2026년 날짜 목록 (일요일 제외)
 start_date = datetime(2026, 1, 1)
 end_date = datetime(2026, 12, 31)
@@ -409,168 +488,382 @@ while current <= end_date:
         all_dates.append(current.date())
     current += timedelta(days=1)
 
-print(f"운영일: {len(all_dates)}일")
-
 # 목표: 약 10,000건
 TARGET_TOTAL = 10000
-daily_target = TARGET_TOTAL // len(all_dates)
 
-print(f"일일 목표: {daily_target}건")
+# 출력 모드
+# - 'batch': 전체를 메모리에 모은 뒤 RESERVATION.csv 1개로 저장
+# - 'stream': 하루 단위로 월별 파티션(RESERVATION_YYYY-MM.csv/.parquet)에 이어 쓰기
+OUTPUT_MODE = 'batch'
+STREAM_FORMAT = 'csv'           # 'csv' | 'parquet'
+STREAM_CHUNK_ROWS = 50000
+STREAM_OUTPUT_DIR = os.path.join(DATA_DIR, 'RESERVATION')
+
+# 병렬 생성: 1년을 N_WORKERS개 날짜 구간(샤드)으로 나눠 프로세스 풀에서 생성
+# (샤드별 시드는 seed에서 파생 → 같은 N_WORKERS면 결과 재현)
+N_WORKERS = 1
 
 # 환자 ID 풀
 patient_pool = [f"P{str(i).zfill(6)}" for i in range(1, 3001)]
 
-# 예약 데이터 저장
-reservations = []
-patient_history = {}
-reservation_id = 1
-
-# 날짜별 생성
-for date in all_dates:
-    weekday = date.weekday()
-
-    if weekday == 5:  # 토요일
-        day_target = daily_target // 3
-    else:
-        day_target = daily_target + random.randint(-5, 5)
-
-    day_count = 0
-    attempts = 0
-    max_attempts = day_target * 5
-
-    while day_count < day_target and attempts < max_attempts:
-        attempts += 1
-
-        # 검사 조합 생성
-        generator = random.choices(generators, weights=generator_weights)[0]
-        exams = generator()
-
-        if exams is None or not exams:
-            continue
-
-        # None 값 필터링
-        exams = [e for e in exams if e is not None]
-        if not exams:
-            continue
+def iter_daily_reservations(target_total=TARGET_TOTAL, conflict_checker=None, seed=42,
+                            patient_history=None, dates=None, stats=None):
+    """날짜 순서대로 하루치 예약 생성 → yield (date, rows)
+
+    rows는 (START_MIN, PATIENT_ID) 순으로 정렬된 예약 dict 목록
+    (시각은 START_MIN 정수로만 보관, 문자열 포맷은 build_reservation_frame에서 일괄 처리)
+    conflict_checker: 충돌 검사 함수 (기본 check_patient_conflicts, 벤치마크용 교체 가능)
+    patient_history: 호출자가 이력을 넘겨받을 PatientHistory (생략 시 내부 생성)
+    dates: 생성할 날짜 구간 (생략 시 all_dates, 일일 목표는 항상 all_dates 기준)
+    stats: 시도/거절 사유/단계 시간을 기록할 GenerationStats (생략 시 내부 생성)
+    """
+    if stats is None:
+        stats = GenerationStats()
+    clock = time.perf_counter
+    if dates is None:
+        dates = all_dates
+    if patient_history is None:
+        patient_history = PatientHistory(rule_index)
+    if conflict_checker is None:
+        conflict_checker = check_patient_conflicts
+
+    random.seed(seed)
+    np.random.seed(seed)
+    reset_exam_usage()
+
+    print("\n" + "="*60)
+    print("예약 데이터 생성 시작 (v2 - 골고루 분배)")
+    print("="*60)
+
+    print(f"운영일: {len(all_dates)}일")
+
+    daily_target = target_total // len(all_dates)
+
+    print(f"일일 목표: {daily_target}건")
+
+    total_count = 0
+    reservation_id = 1
+
+    # 날짜별 생성
+    for date in dates:
+        weekday = date.weekday()
+        date_str = date.strftime('%Y-%m-%d')
+        day_rows = []
+        occupancy = day_occupancy(date)
+        hours = day_hours(date)
+
+        if weekday == 5:  # 토요일
+            day_target = daily_target // 3
+        else:
+            day_target = daily_target + random.randint(-5, 5)
+        if hours is None:  # 캘린더 휴무일
+            day_target = 0
+
+        day_count = 0
+        attempts = 0
+        max_attempts = day_target * 5
+        stats.start_day(date, day_target, max_attempts)
+
+        while day_count < day_target and attempts < max_attempts:
+            attempts += 1
+
+            # 검사 조합 생성
+            t0 = clock()
+            generator = random.choices(generators, weights=generator_weights)[0]
+            exams = generator()
+            t1 = clock()
+            stats.add_time('exam_pick', t1 - t0)
+
+            if exams is None or not exams:
+                stats.record(date, generator.__name__, 'empty_exams')
+                continue
 
-        # 주말 검사 가능 여부 체크
-        if weekday == 5:
-            exams = [e for e in exams if is_weekend_allowed(e, date)]
+            # None 값 필터링
+            exams = [e for e in exams if e is not None]
             if not exams:
+                stats.record(date, generator.__name__, 'empty_exams')
                 continue
 
-        # 시간 슬롯 생성
-        slots = generate_time_slots(exams, datetime.combine(date, datetime.min.time()))
-        if slots is None:
-            continue
-
-        # 환자 선택
-        if random.random() < 0.3 and patient_history:
-            patient_id = random.choice(list(patient_history.keys()))
-        else:
-            patient_id = random.choice(patient_pool)
-
-        # 충돌 체크
-        if not check_patient_conflicts(patient_id, exams, date, patient_history):
-            continue
-
-        # 예약 생성
-        order_id = f"O{str(reservation_id).zfill(8)}"
-        order_date = date - timedelta(days=random.randint(1, 14))
-
-        for slot in slots:
-            exam_cd = slot['exam_cd']
-            info = exam_info.get(exam_cd, {})
-
-            reservations.append({
-                'RESERVATION_ID': f"R{str(reservation_id).zfill(8)}",
-                'ORDER_ID': order_id,
-                'PATIENT_ID': patient_id,
-                'ORDER_DATE': order_date.strftime('%Y-%m-%d'),
-                'EXAM_CD': exam_cd,
-                'EXAM_NM': info.get('name', ''),
-                'RESERVATION_DATETIME': slot['start_time'].strftime('%Y-%m-%d %H:%M'),
-                'RESERVATION_DATE': date.strftime('%Y-%m-%d'),
-                'RESERVATION_TIME': slot['start_time'].strftime('%H:%M'),
-                'DURATION_MIN': slot['duration'],
-                'EQUIPMENT_TYPE': info.get('equipment', '')
-            })
-
-            # 사용 카운터 업데이트
-            exam_usage_count[exam_cd] += 1
-
-            # 환자 이력 업데이트
-            if patient_id not in patient_history:
-                patient_history[patient_id] = []
-            patient_history[patient_id].append({
-                'exam_cd': exam_cd,
-                'date': date
-            })
-
-            reservation_id += 1
-
-        day_count += 1
-
-    # 진행 상황 출력
-    if date.day == 1:
-        print(f"  {date.strftime('%Y-%m')}: 누적 {len(reservations)}건")
-
-print(f"\n총 생성: {len(reservations)}건")
-print(f"환자 수: {len(patient_history)}명")
-
-# ============================================================================
-# DataFrame 생성 및 저장
-# ============================================================================
-
-df = pd.DataFrame(reservations)
-df = df.sort_values(['RESERVATION_DATE', 'RESERVATION_TIME', 'PATIENT_ID'])
-df = df.reset_index(drop=True)
-
-output_path = r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESERVATION.csv'
-df.to_csv(output_path, index=False, encoding='utf-8-sig')
-
-print(f"\n저장 완료: {output_path}")
+            # 주말 검사 가능 여부 체크
+            if weekday == 5:
+                exams = [e for e in exams if is_weekend_allowed(e, date)]
+                t0, t1 = t1, clock()
+                stats.add_time('weekend_filter', t1 - t0)
+                if not exams:
+                    stats.record(date, generator.__name__, 'weekend')
+                    continue
+
+            # 시간 슬롯 생성
+            slots = generate_time_slots(exams, date, occupancy, hours)
+            t0, t1 = t1, clock()
+            stats.add_time('time_slots', t1 - t0)
+            if slots is None:
+                stats.record(date, generator.__name__, 'no_slot')
+                continue
 
-# ============================================================================
-# 통계 출력
-# ============================================================================
+            # 환자 선택
+            if random.random() < 0.3 and patient_history:
+                patient_id = random.choice(patient_history.patient_ids)
+            else:
+                patient_id = random.choice(patient_pool)
+            t0, t1 = t1, clock()
+            stats.add_time('patient_pick', t1 - t0)
+
+            # 충돌 체크
+            accepted = conflict_checker(patient_id, exams, date, patient_history)
+            t0, t1 = t1, clock()
+            stats.add_time('conflict_check', t1 - t0)
+            if not accepted:
+                stats.record(date, generator.__name__, 'patient_conflict')
+                continue
 
-print("\n" + "="*60)
-print("생성 데이터 통계")
-print("="*60)
-
-print(f"\n### 기본 통계 ###")
-print(f"총 예약 건수: {len(df)}건")
-print(f"예약 기간: {df['RESERVATION_DATE'].min()} ~ {df['RESERVATION_DATE'].max()}")
-print(f"고유 환자 수: {df['PATIENT_ID'].nunique()}명")
-print(f"고유 검사 종류: {df['EXAM_CD'].nunique()}개 / {len(exam_info)}개")
-
-print(f"\n### 장비별 분포 ###")
-print(df['EQUIPMENT_TYPE'].value_counts().to_string())
-
-print(f"\n### 장비별 검사 사용률 ###")
-for eq_type in sorted(exams_by_type.keys()):
-    total_exams = len(exams_by_type[eq_type])
-    used_exams = df[df['EQUIPMENT_TYPE'] == eq_type]['EXAM_CD'].nunique()
-    print(f"  {eq_type}: {used_exams}/{total_exams}개 ({used_exams/total_exams*100:.0f}%)")
-
-print(f"\n### 요일별 분포 ###")
-df['WEEKDAY'] = pd.to_datetime(df['RESERVATION_DATE']).dt.day_name()
-print(df['WEEKDAY'].value_counts().to_string())
-
-print(f"\n### 상위 15개 검사 ###")
-print(df['EXAM_CD'].value_counts().head(15).to_string())
-
-print(f"\n### 하위 15개 검사 (사용됨) ###")
-print(df['EXAM_CD'].value_counts().tail(15).to_string())
-
-# 미사용 검사 확인
-used_exams = set(df['EXAM_CD'].unique())
-all_exams = set(exam_info.keys())
-unused = all_exams - used_exams
-print(f"\n### 미사용 검사: {len(unused)}개 ###")
-if unused:
+            # 자원 점유 기록
+            if occupancy is not None:
+                for slot in slots:
+                    occupancy.reserve(exam_info[slot['exam_cd']]['equipment'],
+                                      slot['start_min'] // SLOT_MIN, slots_needed(slot['duration']),
+                                      exam_resources.get(slot['exam_cd']))
+
+            # 예약 생성
+            order_id = f"O{str(reservation_id).zfill(8)}"
+            order_date = date - timedelta(days=random.randint(1, 14))
+
+            for slot in slots:
+                exam_cd = slot['exam_cd']
+                info = exam_info.get(exam_cd, {})
+
+                day_rows.append({
+                    'RESERVATION_ID': f"R{str(reservation_id).zfill(8)}",
+                    'ORDER_ID': order_id,
+                    'PATIENT_ID': patient_id,
+                    'ORDER_DATE': order_date.strftime('%Y-%m-%d'),
+                    'EXAM_CD': exam_cd,
+                    'EXAM_NM': info.get('name', ''),
+                    'RESERVATION_DATE': date_str,
+                    'START_MIN': slot['start_min'],
+                    'DURATION_MIN': slot['duration'],
+                    'EQUIPMENT_TYPE': info.get('equipment', '')
+                })
+
+                # 사용 카운터 업데이트
+                record_exam_usage(exam_cd)
+
+                # 환자 이력 업데이트
+                patient_history.add(patient_id, exam_cd, date)
+
+                reservation_id += 1
+
+            day_count += 1
+            stats.record(date, generator.__name__, ACCEPTED, order_id, len(slots))
+            stats.add_time('emit', clock() - t1)
+
+        day_rows.sort(key=itemgetter('START_MIN', 'PATIENT_ID'))
+        yield date, day_rows
+        total_count += len(day_rows)
+
+        # 진행 상황 출력
+        if date.day == 1:
+            print(f"  {date.strftime('%Y-%m')}: 누적 {total_count}건")
+
+    print(f"\n총 생성: {total_count}건")
+    print(f"환자 수: {len(patient_history)}명")
+
+# 출력 컬럼 순서
+RESERVATION_COLUMNS = ['RESERVATION_ID', 'ORDER_ID', 'PATIENT_ID', 'ORDER_DATE', 'EXAM_CD', 'EXAM_NM',
+                       'RESERVATION_DATETIME', 'RESERVATION_DATE', 'RESERVATION_TIME', 'DURATION_MIN',
+                       'EQUIPMENT_TYPE']
+
+def build_reservation_frame(rows):
+    """예약 행(dict) → 출력용 DataFrame (START_MIN → 시간 문자열 일괄 변환)"""
+    df = pd.DataFrame(rows)
+    df['RESERVATION_TIME'], df['RESERVATION_DATETIME'] = format_reservation_times(
+        df['RESERVATION_DATE'].to_numpy(), df['START_MIN'].to_numpy())
+    return df[RESERVATION_COLUMNS]
+
+def shard_seeds(seed, n_shards):
+    """기준 시드에서 샤드별 독립 시드 파생"""
+    return [int(child.generate_state(1)[0]) for child in np.random.SeedSequence(seed).spawn(n_shards)]
+
+def _generate_shard(args):
+    """프로세스 풀 작업: 날짜 구간 1개 생성 → ([(date, rows), ...], GenerationStats)"""
+    target_total, shard_dates, shard_seed = args
+    stats = GenerationStats(track_orders=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        days = list(iter_daily_reservations(target_total, seed=shard_seed, dates=shard_dates, stats=stats))
+    return days, stats
+
+def iter_parallel_reservations(target_total=TARGET_TOTAL, n_workers=N_WORKERS, seed=42,
+                               patient_history=None, stats=None):
+    """날짜 샤드를 프로세스 풀에서 생성 후 날짜 순으로 병합 → yield (date, rows)
+
+    병합(조정) 단계:
+    - 샤드 내 로컬 ID에 앞 샤드 생성 건수를 더해 RESERVATION_ID/ORDER_ID 재부여
+    - 전체 이력 기준으로 주문을 다시 검사, 샤드 경계를 넘는 GAP 충돌 주문은 제거
+      (stats에는 채택 → shard_conflict로 다시 기록, 채택 행 수 = 실제 반환 행 수)
+    """
+    if patient_history is None:
+        patient_history = PatientHistory(rule_index)
+
+    shards = [list(d) for d in np.array_split(np.array(all_dates, dtype=object), n_workers)]
+    seeds = shard_seeds(seed, n_workers)
+
+    print(f"\n병렬 생성: {n_workers}개 샤드")
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        shard_results = list(pool.map(_generate_shard, [(target_total, d, s) for d, s in zip(shards, seeds)]))
+
+    id_offset = 0
+    dropped_orders = 0
+    total_count = 0
+    for shard_days, shard_stats in shard_results:
+        if stats is not None:
+            stats.merge(shard_stats)
+        shard_rows = 0
+        for date, day_rows in shard_days:
+            orders = {}
+            for row in day_rows:
+                orders.setdefault(row['ORDER_ID'], []).append(row)
+
+            kept_rows = []
+            for order_id in sorted(orders):     # 샤드 내 생성 순서
+                rows = orders[order_id]
+                shard_rows += len(rows)
+                patient_id = rows[0]['PATIENT_ID']
+                if patient_history.has_conflict(patient_id, [r['EXAM_CD'] for r in rows], date):
+                    dropped_orders += 1
+                    if stats is not None:
+                        stats.reject_accepted(date, shard_stats.order_generators[order_id], 'shard_conflict',
+                                              len(rows))
+                    continue
+
+                for row in rows:
+                    row['RESERVATION_ID'] = f"R{str(int(row['RESERVATION_ID'][1:]) + id_offset).zfill(8)}"
+                    row['ORDER_ID'] = f"O{str(int(row['ORDER_ID'][1:]) + id_offset).zfill(8)}"
+                    patient_history.add(patient_id, row['EXAM_CD'], date)
+                kept_rows.extend(rows)
+
+            kept_rows.sort(key=itemgetter('START_MIN', 'PATIENT_ID'))
+            yield date, kept_rows
+            total_count += len(kept_rows)
+        id_offset += shard_rows
+
+    print(f"\n총 생성: {total_count}건")
+    print(f"샤드 경계 충돌로 제거된 주문: {dropped_orders}건")
+    print(f"환자 수: {len(patient_history)}명")
+
+def _iter_days(target_total, conflict_checker, seed, n_workers, patient_history, stats=None):
+    if n_workers > 1:
+        return iter_parallel_reservations(target_total, n_workers, seed, patient_history, stats)
+    return iter_daily_reservations(target_total, conflict_checker, seed, patient_history, stats=stats)
+
+def generate_reservations(target_total=TARGET_TOTAL, conflict_checker=None, seed=42,
+                          n_workers=N_WORKERS, stats=None):
+    """전체 예약을 메모리에 생성 → (reservations, patient_history)"""
+    patient_history = PatientHistory(rule_index)
+    reservations = []
+    for _, day_rows in _iter_days(target_total, conflict_checker, seed, n_workers, patient_history, stats):
+        reservations.extend(day_rows)
+    return reservations, patient_history
+
+def stream_reservations(output_dir=STREAM_OUTPUT_DIR, target_total=TARGET_TOTAL,
+                        file_format=STREAM_FORMAT, chunk_rows=STREAM_CHUNK_ROWS, seed=42,
+                        n_workers=N_WORKERS, stats=None):
+    """하루 단위로 생성하며 월별 파티션에 저장 → {파티션 경로: 건수}"""
+    with MonthlyPartitionWriter(output_dir, file_format, chunk_rows, to_frame=build_reservation_frame) as writer:
+        for _, day_rows in _iter_days(target_total, None, seed, n_workers, PatientHistory(rule_index), stats):
+            writer.write_rows(day_rows)
+    return writer.partition_rows
+
+def print_generation_stats(stats, path_prefix):
+    """생성 루프 계측 요약 출력 + 보고서 저장"""
+    weights_by_name = {g.__name__: w for g, w in EXAM_GENERATORS}
+    paths = stats.write_report(path_prefix, weights_by_name)
+    summary = stats.summary()
+
+    print("\n" + "="*60)
+    print("생성 루프 계측")
+    print("="*60)
+    print(f"시도: {summary['attempts']}회 / 채택: {summary['accepted']}회 ({summary['accepted_rows']}행) "
+          f"/ 목표 미달 일수: {summary['days_target_missed']}일 / {summary['days']}일")
+    print("\n### 거절 사유 ###")
+    for reason, count in summary['rejected'].items():
+        print(f"  {reason}: {count}회")
+    print("\n### 단계별 소요 시간 ###")
+    for stage, seconds in summary['stage_seconds'].items():
+        print(f"  {stage}: {seconds:.2f}초")
+    print("\n### 생성기별 낭비율 (거절/시도) ###")
+    print(stats.generator_frame(weights_by_name)[['GENERATOR', 'WEIGHT', 'ATTEMPTS', 'WASTE_RATIO']]
+          .to_string(index=False))
+    print(f"\n계측 보고서: {', '.join(paths)}")
+
+if __name__ == '__main__' and OUTPUT_MODE == 'stream':
+    generation_stats = GenerationStats()
+    partition_rows = stream_reservations(stats=generation_stats)
+
+    print(f"\n저장 완료: {STREAM_OUTPUT_DIR} ({len(partition_rows)}개 파티션)")
+    for path, count in partition_rows.items():
+        print(f"  {os.path.basename(path)}: {count}건")
+
+    print_generation_stats(generation_stats, os.path.join(STREAM_OUTPUT_DIR, 'RESERVATION_gen_stats'))
+
+elif __name__ == '__main__':
+    generation_stats = GenerationStats()
+    reservations, patient_history = generate_reservations(stats=generation_stats)
+
+    # ============================================================================
+    # DataFrame 생성 및 저장
+    # ============================================================================
+
+    df = build_reservation_frame(reservations)
+    df = df.sort_values(['RESERVATION_DATE', 'RESERVATION_TIME', 'PATIENT_ID'])
+    df = df.reset_index(drop=True)
+
+    output_path = data_path('RESERVATION')
+    df.to_csv(output_path, index=False, encoding='utf-8-sig')
+
+    print(f"\n저장 완료: {output_path}")
+
+    # ============================================================================
+    # 통계 출력
+    # ============================================================================
+
+    print("\n" + "="*60)
+    print("생성 데이터 통계")
+    print("="*60)
+
+    print(f"\n### 기본 통계 ###")
+    print(f"총 예약 건수: {len(df)}건")
+    print(f"예약 기간: {df['RESERVATION_DATE'].min()} ~ {df['RESERVATION_DATE'].max()}")
+    print(f"고유 환자 수: {df['PATIENT_ID'].nunique()}명")
+    print(f"고유 검사 종류: {df['EXAM_CD'].nunique()}개 / {len(exam_info)}개")
+
+    print(f"\n### 장비별 분포 ###")
+    print(df['EQUIPMENT_TYPE'].value_counts().to_string())
+
+    print(f"\n### 장비별 검사 사용률 ###")
     for eq_type in sorted(exams_by_type.keys()):
-        unused_in_type = [e for e in unused if exam_info[e]['equipment'] == eq_type]
-        if unused_in_type:
-            print(f"  {eq_type}: {len(unused_in_type)}개")
+        total_exams = len(exams_by_type[eq_type])
+        used_exams = df[df['EQUIPMENT_TYPE'] == eq_type]['EXAM_CD'].nunique()
+        print(f"  {eq_type}: {used_exams}/{total_exams}개 ({used_exams/total_exams*100:.0f}%)")
+
+    print(f"\n### 요일별 분포 ###")
+    df['WEEKDAY'] = pd.to_datetime(df['RESERVATION_DATE']).dt.day_name()
+    print(df['WEEKDAY'].value_counts().to_string())
+
+    print(f"\n### 상위 15개 검사 ###")
+    print(df['EXAM_CD'].value_counts().head(15).to_string())
+
+    print(f"\n### 하위 15개 검사 (사용됨) ###")
+    print(df['EXAM_CD'].value_counts().tail(15).to_string())
+
+    # 미사용 검사 확인
+    used_exams = set(df['EXAM_CD'].unique())
+    all_exams = set(exam_info.keys())
+    unused = all_exams - used_exams
+    print(f"\n### 미사용 검사: {len(unused)}개 ###")
+    if unused:
+        for eq_type in sorted(exams_by_type.keys()):
+            unused_in_type = [e for e in unused if exam_info[e]['equipment'] == eq_type]
+            if unused_in_type:
+                print(f"  {eq_type}: {len(unused_in_type)}개")
+
+    print_generation_stats(generation_stats, os.path.join(DATA_DIR, 'RESERVATION_gen_stats'))
@@ -6,21 +6,17 @@
 - 마우스 호버 시 예약 정보 표시
 """
 
-import pandas as pd
-from datetime import datetime, timedelta
-import os
 import sys
 import json
 
+from data_loader import load_reservation, load_resource
+from resource_calendar import ResourceCalendar, load_calendar
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # 데이터 로드
-base_path = r'c:\Users\user\Desktop\검사규칙 합성데이터\data'
-reservation = pd.read_csv(os.path.join(base_path, 'RESERVATION.csv'))
-resource = pd.read_csv(os.path.join(base_path, 'RESOURCE.csv'))
-
-reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
-reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(reservation['DURATION_MIN'], unit='m')
+reservation = load_reservation()
+resource = load_resource()
 
 # 모든 날짜 목록
 all_dates = sorted(reservation['RESERVATION_DATE'].unique())
@@ -46,6 +42,19 @@ resources_json = {}
 for equip_type in resource['EQUIPMENT_TYPE'].unique():
     resources_json[equip_type] = resource[resource['EQUIPMENT_TYPE'] == equip_type]['RESOURCE_ID'].tolist()
 
+# 시간표 표시 범위 (시): 자원 캘린더 가용 구간을 모두 포함 (전체 보기는 병원 운영시간)
+calendar = load_calendar(resource) or ResourceCalendar(resource)
+
+def grid_hours(intervals):
+    if not intervals:
+        return [8, 16]
+    return [min(start for start, _ in intervals) // 60, min(24, -(-max(end for _, end in intervals) // 60))]
+
+grid_hours_json = {'ALL': grid_hours([iv for date in all_dates for iv in calendar.facility_hours(date)])}
+for equip_type, resource_ids in resources_json.items():
+    grid_hours_json[equip_type] = grid_hours([iv for date in all_dates for rid in resource_ids
+                                              for iv in calendar.availability(rid, date)])
+
 print(f'HTML 생성 중...')
 
 html_content = '''<!DOCTYPE html>
@@ -500,6 +509,7 @@ html_content = '''<!DOCTYPE html>
 html_content += f'        const reservations = {json.dumps(reservations_json, ensure_ascii=False)};\n'
 html_content += f'        const resources = {json.dumps(resources_json, ensure_ascii=False)};\n'
 html_content += f'        const allDates = {json.dumps(all_dates)};\n'
+html_content += f'        const gridHours = {json.dumps(grid_hours_json)};\n'
 
 html_content += '''
         const equipColors = {
@@ -572,11 +582,11 @@ html_content += '''
                 grid.innerHTML += `<div class="day-header${res.isFirst ? ' equip-start' : ''}">${resNum}</div>`;
             });
 
-            // 시간 슬롯: FUNC 장비만 선택 시 22시까지, 그 외 16시까지
-            const endHour = (selectedEquip === 'FUNC') ? 22 : 16;
+            // 시간 슬롯: 자원 캘린더 가용 시간 범위 (gridHours)
+            const [startHour, endHour] = gridHours[selectedEquip] || gridHours['ALL'];
             const slotDuration = 10 * 60000;
 
-            for (let h = 8; h < endHour; h++) {
+            for (let h = startHour; h < endHour; h++) {
                 // 정각에 시간 셀 추가 (6행 병합)
                 const timeStr = `${h.toString().padStart(2,'0')}:00`;
                 const timeCell = document.createElement('div');
@@ -614,8 +624,8 @@ html_content += '''
                             const color = equipColors[res.equipType];
                             const blockId = `${r.resource_id}_${r.start}`.replace(/[: ]/g, '_');
 
-                            // 그리드 종료 시간(22:00)을 넘어가면 잘라서 표시
-                            const gridEnd = new Date(`${selectedDate} ${endHour.toString().padStart(2,'0')}:00`);
+                            // 그리드 종료 시간을 넘어가면 잘라서 표시
+                            const gridEnd = new Date(new Date(`${selectedDate} 00:00`).getTime() + endHour * 3600000);
                             if (rEnd > gridEnd) rEnd = gridEnd;
 
                             const topPercent = ((rStart.getTime() - slotStart.getTime()) / slotDuration) * 100;
@@ -808,9 +818,9 @@ html_content += '''
                     grid.innerHTML += resHeaderHtml;
                 });
 
-                // 시간 슬롯: FUNC 장비 선택 시 22시까지, 그 외 16시까지 (30분 단위)
-                const weekEndHour = (equipType === 'FUNC') ? 22 : 16;
-                for (let h = 8; h < weekEndHour; h++) {
+                // 시간 슬롯: 자원 캘린더 가용 시간 범위 (30분 단위)
+                const [weekStartHour, weekEndHour] = gridHours[equipType] || gridHours['ALL'];
+                for (let h = weekStartHour; h < weekEndHour; h++) {
                     // 정각에 시간 셀 추가 (2행 병합: 30분 x 2 = 1시간)
                     const timeStr = `${h.toString().padStart(2,'0')}:00`;
                     const timeCell = document.createElement('div');
@@ -847,7 +857,7 @@ html_content += '''
                                     let rEnd = new Date(r.end);
 
                                     // 그리드 종료 시간을 넘어가면 잘라서 표시
-                                    const gridEnd = new Date(`${date} ${weekEndHour.toString().padStart(2,'0')}:00`);
+                                    const gridEnd = new Date(new Date(`${date} 00:00`).getTime() + weekEndHour * 3600000);
                                     if (rEnd > gridEnd) rEnd = gridEnd;
 
                                     // 이 슬롯이 예약의 시작 슬롯인지 확인
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""
+예약 생성 루프 계측
+- 시도(attempt)별 결과: 채택 또는 거절 사유 (채택은 주문 수 + 행 수)
+- 병렬 생성: 샤드에서 채택됐다가 병합 단계에서 제거된 주문은 shard_conflict로 다시 분류
+- 날짜별 / 검사 조합 생성기별 사유 카운터
+- 단계별 소요 시간 (검사 조합, 주말 필터, 시간 슬롯, 환자 선택, 충돌 검사, 행 생성)
+- CSV(날짜별, 생성기별) + JSON(요약) 보고서 저장
+"""
+
+import json
+from collections import Counter
+
+import pandas as pd
+
+ACCEPTED = 'accepted'
+
+# 거절 사유
+REJECT_REASONS = [
+    'empty_exams',          # 조합 생성기가 검사를 만들지 못함
+    'weekend',              # 토요일 NOWEEKEND 필터로 검사가 모두 제거됨
+    'no_slot',              # generate_time_slots → None (운영시간/자원 여유 없음)
+    'patient_conflict',     # check_patient_conflicts 실패 (당일불가/간격)
+    'shard_conflict',       # 병렬 샤드에서 채택 후 병합 단계 전체 이력 검사로 제거 (샤드 경계 간격 충돌)
+]
+
+STAGES = ['exam_pick', 'weekend_filter', 'time_slots', 'patient_pick', 'conflict_check', 'emit']
+
+
+class GenerationStats:
+    """생성 루프 시도/거절/단계 시간 집계"""
+
+    def __init__(self, track_orders=False):
+        self.daily = {}                 # date -> Counter(사유)
+        self.by_generator = {}          # 생성기 이름 -> Counter(사유)
+        self.day_targets = {}           # date -> (목표, 최대 시도)
+        self.accepted_rows = Counter()  # date -> 채택 행 수
+        self.stage_seconds = Counter()
+        self.order_generators = {} if track_orders else None    # ORDER_ID -> 생성기 이름 (병렬 샤드용)
+
+    def start_day(self, date, day_target, max_attempts):
+        self.day_targets[date] = (day_target, max_attempts)
+        self.daily.setdefault(date, Counter())
+
+    def record(self, date, generator_name, outcome, order_id=None, rows=0):
+        """시도 1회 결과 기록 (outcome: 'accepted' 또는 거절 사유, 채택이면 주문 ID와 행 수)"""
+        self.daily[date][outcome] += 1
+        self.by_generator.setdefault(generator_name, Counter())[outcome] += 1
+        self.accepted_rows[date] += rows
+        if self.order_generators is not None and order_id is not None:
+            self.order_generators[order_id] = generator_name
+
+    def reject_accepted(self, date, generator_name, reason, rows):
+        """채택으로 기록된 주문 1건을 거절 사유로 옮김 (병렬 병합 단계에서 제거된 주문)"""
+        for counts in (self.daily[date], self.by_generator[generator_name]):
+            counts[ACCEPTED] -= 1
+            counts[reason] += 1
+        self.accepted_rows[date] -= rows
+
+    def add_time(self, stage, seconds):
+        self.stage_seconds[stage] += seconds
+
+    def merge(self, other):
+        """다른 집계(병렬 샤드) 합치기"""
+        for date, counts in other.daily.items():
+            self.daily.setdefault(date, Counter()).update(counts)
+        for name, counts in other.by_generator.items():
+            self.by_generator.setdefault(name, Counter()).update(counts)
+        self.day_targets.update(other.day_targets)
+        self.accepted_rows.update(other.accepted_rows)
+        self.stage_seconds.update(other.stage_seconds)
+
+    def daily_frame(self):
+        """날짜별 시도/채택/거절 사유 DataFrame"""
+        rows = []
+        for date in sorted(self.daily):
+            counts = self.daily[date]
+            day_target, max_attempts = self.day_targets.get(date, (None, None))
+            attempts = sum(counts.values())
+            row = {
+                'DATE': date.strftime('%Y-%m-%d'),
+                'DAY_TARGET': day_target,
+                'MAX_ATTEMPTS': max_attempts,
+                'ATTEMPTS': attempts,
+                'ACCEPTED': counts[ACCEPTED],
+                'ACCEPTED_ROWS': self.accepted_rows[date],
+                'TARGET_MISSED': day_target is not None and counts[ACCEPTED] < day_target,
+            }
+            for reason in REJECT_REASONS:
+                row[reason.upper()] = counts[reason]
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def generator_frame(self, generator_weights=None):
+        """생성기별 시도/채택/거절 사유 DataFrame (WASTE_RATIO = 거절 / 시도)"""
+        generator_weights = generator_weights or {}
+        rows = []
+        for name in sorted(self.by_generator):
+            counts = self.by_generator[name]
+            attempts = sum(counts.values())
+            row = {
+                'GENERATOR': name,
+                'WEIGHT': generator_weights.get(name),
+                'ATTEMPTS': attempts,
+                'ACCEPTED': counts[ACCEPTED],
+            }
+            for reason in REJECT_REASONS:
+                row[reason.upper()] = counts[reason]
+            row['WASTE_RATIO'] = round(1 - counts[ACCEPTED] / attempts, 4) if attempts else 0.0
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def summary(self):
+        """전체 합계 + 단계별 시간 (JSON 직렬화 가능 dict)"""
+        totals = Counter()
+        for counts in self.daily.values():
+            totals.update(counts)
+        attempts = sum(totals.values())
+        return {
+            'days': len(self.daily),
+            'days_target_missed': int(self.daily_frame()['TARGET_MISSED'].sum()) if self.daily else 0,
+            'attempts': attempts,
+            'accepted': totals[ACCEPTED],
+            'accepted_rows': sum(self.accepted_rows.values()),
+            'rejected': {reason: totals[reason] for reason in REJECT_REASONS},
+            'stage_seconds': {stage: round(self.stage_seconds[stage], 4) for stage in STAGES},
+        }
+
+    def write_report(self, path_prefix, generator_weights=None):
+        """<prefix>_daily.csv, <prefix>_generator.csv, <prefix>.json 저장 → 경로 목록"""
+        daily_path = f'{path_prefix}_daily.csv'
+        generator_path = f'{path_prefix}_generator.csv'
+        summary_path = f'{path_prefix}.json'
+
+        self.daily_frame().to_csv(daily_path, index=False, encoding='utf-8-sig')
+        generator_df = self.generator_frame(generator_weights)
+        generator_df.to_csv(generator_path, index=False, encoding='utf-8-sig')
+
+        summary = self.summary()
+        summary['generators'] = generator_df.to_dict(orient='records')
+        with open(summary_path, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+
+        return [daily_path, generator_path, summary_path]
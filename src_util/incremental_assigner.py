@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+증분 자원 배정 (일자 파티션 단위)
+- 배정 결과를 예약일별 파일 RESERVATION_DAYS/RESERVATION_YYYY-MM-DD.csv 로 보관
+- 새 예약/변경 예약만 해당 날짜의 자원 타임라인에 배치, 기존 배정은 그대로 유지
+- 배치 규칙: 시작~종료 동안 비어 있는 자원 중 직전 예약이 가장 먼저 끝난 자원 (동률이면 앞 번호)
+  → 하루 마지막에 이어 붙이는 경우 assign_resources(최소 힙)와 같은 선택
+- 저장은 변경된 날짜 파티션만 다시 씀 → 예약 1건 추가 비용 = 그날 예약 수에 비례
+- 다른 날짜로 옮기는 변경은 remove(이전 날짜) 후 upsert
+- calendar(ResourceCalendar)를 주면 가용 구간 밖인 자원은 후보에서 제외
+- capability(CapabilityMatrix)를 주면 검사를 수행할 수 없는 자원도 후보에서 제외 (assign_with_capabilities와 같은 제약)
+- 기준 데이터: 증분 배정 이후 최신 배정은 날짜 파티션(RESERVATION_DAYS)에만 있음
+  RESERVATION.csv는 assign_resource.py 일괄 배정 시점의 스냅샷 (flush()는 갱신하지 않음)
+  → RESERVATION.csv를 읽는 검증/조회 전에 export()로 파티션을 합쳐 다시 씀
+"""
+
+import os
+from bisect import bisect_left, insort
+
+import pandas as pd
+
+from data_loader import DATA_DIR, data_path
+from resource_assigner import FREE_AT_START, NS_PER_MINUTE, assign_resources
+from resource_capability import assign_with_capabilities
+
+PARTITION_DIR = os.path.join(DATA_DIR, 'RESERVATION_DAYS')
+PARTITION_PREFIX = 'RESERVATION_'
+
+RESERVATION_COLUMNS = ['RESERVATION_ID', 'ORDER_ID', 'PATIENT_ID', 'ORDER_DATE', 'EXAM_CD', 'EXAM_NM',
+                       'RESERVATION_DATETIME', 'RESERVATION_DATE', 'RESERVATION_TIME', 'DURATION_MIN',
+                       'EQUIPMENT_TYPE', 'RESOURCE_ID']
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def partition_path(partition_dir, date):
+    return os.path.join(partition_dir, f'{PARTITION_PREFIX}{date}.csv')
+
+
+def _interval(row):
+    """예약 행 → (시작 ns, 종료 ns)"""
+    start = pd.Timestamp(row['RESERVATION_DATETIME'])
+    end = start + pd.Timedelta(minutes=int(row['DURATION_MIN']))
+    return start.value, end.value
+
+
+def write_day_partitions(reservation, partition_dir=PARTITION_DIR):
+    """배정 완료된 전체 예약 → 날짜별 파티션 파일 (기존 파티션 파일은 교체) → 파일 수"""
+    os.makedirs(partition_dir, exist_ok=True)
+    for name in os.listdir(partition_dir):
+        if name.startswith(PARTITION_PREFIX) and name.endswith('.csv'):
+            os.remove(os.path.join(partition_dir, name))
+
+    frame = reservation[RESERVATION_COLUMNS]
+    count = 0
+    for date, day in frame.groupby('RESERVATION_DATE', sort=True, observed=True):
+        day.to_csv(partition_path(partition_dir, date), index=False, encoding='utf-8-sig',
+                   date_format=DATETIME_FORMAT)
+        count += 1
+    return count
+
+
+class DayPartition:
+    """예약일 1일치 예약 행 + 자원별 타임라인"""
+
+    def __init__(self, date, rows):
+        self.date = date
+        self.rows = {}              # RESERVATION_ID -> 행(dict)
+        self.timelines = {}         # RESOURCE_ID -> [(시작 ns, 종료 ns, RESERVATION_ID), ...] 시작순
+        for row in rows:
+            self._insert(row)
+
+    def _insert(self, row):
+        self.rows[row['RESERVATION_ID']] = row
+        resource_id = row.get('RESOURCE_ID')
+        if isinstance(resource_id, str) and resource_id:
+            start, end = _interval(row)
+            insort(self.timelines.setdefault(resource_id, []), (start, end, row['RESERVATION_ID']))
+
+    def remove(self, reservation_id):
+        row = self.rows.pop(reservation_id, None)
+        if row is None:
+            return None
+        timeline = self.timelines.get(row.get('RESOURCE_ID'))
+        if timeline:
+            start, end = _interval(row)
+            timeline.remove((start, end, reservation_id))
+        return row
+
+    def choose_resource(self, resources, start, end):
+        """[start, end) 동안 빈 자원 중 직전 예약이 가장 먼저 끝난 자원 (없으면 None)"""
+        best = None
+        best_prev_end = None
+        for resource_id in resources:
+            timeline = self.timelines.get(resource_id, [])
+            k = bisect_left(timeline, (end,))                   # end 이전에 시작한 예약들
+            prev_end = max((t[1] for t in timeline[:k]), default=FREE_AT_START)
+            if prev_end > start:
+                continue                                        # 겹침
+            if best is None or prev_end < best_prev_end:
+                best, best_prev_end = resource_id, prev_end
+        return best
+
+    def place(self, row, resources):
+        """행에 RESOURCE_ID 배정 후 추가 → 배정 성공 여부 (빈 자원이 없으면 RESOURCE_ID '')"""
+        start, end = _interval(row)
+        resource_id = self.choose_resource(resources, start, end) if resources else None
+        row['RESOURCE_ID'] = resource_id or ''
+        self._insert(row)
+        return resource_id is not None
+
+    def frame(self):
+        df = pd.DataFrame(list(self.rows.values()), columns=RESERVATION_COLUMNS)
+        return df.sort_values(['RESERVATION_DATETIME', 'RESERVATION_ID']).reset_index(drop=True)
+
+
+class IncrementalAssigner:
+    """날짜 파티션을 필요할 때만 읽어 새/변경 예약만 배정"""
+
+    def __init__(self, resource_lists, partition_dir=PARTITION_DIR, calendar=None, capability=None):
+        self.resource_lists = resource_lists
+        self.partition_dir = partition_dir
+        self.calendar = calendar
+        self.capability = capability
+        self.days = {}              # 예약일 -> DayPartition (읽은 날짜만)
+        self.touched = set()        # 저장이 필요한 날짜
+
+    @classmethod
+    def from_reservation(cls, reservation, resource_lists, partition_dir=PARTITION_DIR, calendar=None,
+                         capability=None):
+        """전체 예약을 한 번 배정해 날짜 파티션 생성 (초기 구축, capability가 있으면 제약 배정)"""
+        reservation = reservation.copy()
+        if capability is None:
+            reservation['RESOURCE_ID'], _ = assign_resources(reservation, resource_lists, calendar)
+        else:
+            reservation['RESOURCE_ID'], _, _ = assign_with_capabilities(reservation, capability, calendar=calendar)
+        write_day_partitions(reservation, partition_dir)
+        return cls(resource_lists, partition_dir, calendar, capability)
+
+    def day(self, date):
+        """예약일 파티션 (처음 접근 시 파일에서 읽음)"""
+        partition = self.days.get(date)
+        if partition is None:
+            path = partition_path(self.partition_dir, date)
+            rows = []
+            if os.path.exists(path):
+                df = pd.read_csv(path, dtype={'RESOURCE_ID': str}, keep_default_na=False)
+                rows = df.to_dict('records')
+            partition = self.days[date] = DayPartition(date, rows)
+        return partition
+
+    def upsert(self, rows):
+        """새 예약 또는 같은 날짜 안에서 바뀐 예약 배치 → (배정된 행 DataFrame, 자원 부족 행 목록)
+
+        RESERVATION_ID가 그날 파티션에 있고 시각/소요시간/장비/검사가 같으면 건너뜀
+        """
+        placed = []
+        shortages = []
+        for row in rows:
+            row = {col: row.get(col, '') for col in RESERVATION_COLUMNS}
+            row['RESERVATION_DATETIME'] = pd.Timestamp(row['RESERVATION_DATETIME']).strftime(DATETIME_FORMAT)
+            partition = self.day(row['RESERVATION_DATE'])
+
+            existing = partition.rows.get(row['RESERVATION_ID'])
+            if existing is not None:
+                if all(existing[col] == row[col] for col in ('RESERVATION_DATETIME', 'DURATION_MIN', 'EQUIPMENT_TYPE',
+                                                            'EXAM_CD')):
+                    continue
+                partition.remove(row['RESERVATION_ID'])
+
+            if not partition.place(row, self.candidates(row)):
+                shortages.append(row)
+            placed.append(row)
+            self.touched.add(partition.date)
+
+        return pd.DataFrame(placed, columns=RESERVATION_COLUMNS), shortages
+
+    def candidates(self, row):
+        """행의 장비유형 자원 중 검사 수행 가능하고 캘린더상 [시작, 종료) 동안 가용한 자원"""
+        resources = self.resource_lists.get(row['EQUIPMENT_TYPE'])
+        if resources and self.capability is not None:
+            allowed = set(self.capability.resources_for(row['EXAM_CD'], row['EQUIPMENT_TYPE']))
+            resources = [rid for rid in resources if rid in allowed]
+        if not resources or self.calendar is None:
+            return resources
+        start, end = _interval(row)
+        midnight = pd.Timestamp(row['RESERVATION_DATE']).value
+        start_min, end_min = (start - midnight) // NS_PER_MINUTE, (end - midnight) // NS_PER_MINUTE
+        return [rid for rid in resources
+                if self.calendar.is_available(rid, row['RESERVATION_DATE'], start_min, end_min)]
+
+    def remove(self, reservation_ids, date):
+        """해당 날짜 파티션에서 예약 삭제 → 삭제 건수"""
+        partition = self.day(date)
+        removed = sum(partition.remove(rid) is not None for rid in reservation_ids)
+        if removed:
+            self.touched.add(date)
+        return removed
+
+    def flush(self):
+        """변경된 날짜 파티션만 저장 → 저장한 파일 경로 목록 (RESERVATION.csv는 그대로, export() 참고)"""
+        os.makedirs(self.partition_dir, exist_ok=True)
+        paths = []
+        for date in sorted(self.touched):
+            path = partition_path(self.partition_dir, date)
+            self.days[date].frame().to_csv(path, index=False, encoding='utf-8-sig')
+            paths.append(path)
+        self.touched = set()
+        return paths
+
+    def export(self, path=None):
+        """저장된 날짜 파티션 전체를 RESERVATION.csv로 다시 씀 (미저장 변경은 flush() 먼저) → 행 수"""
+        reservation = self.load_all()
+        reservation.to_csv(path or data_path('RESERVATION'), index=False, encoding='utf-8-sig')
+        return len(reservation)
+
+    def load_all(self):
+        """전체 날짜 파티션을 합친 RESERVATION DataFrame (내보내기용)"""
+        frames = [pd.read_csv(os.path.join(self.partition_dir, name), dtype={'RESOURCE_ID': str},
+                              keep_default_na=False)
+                  for name in sorted(os.listdir(self.partition_dir))
+                  if name.startswith(PARTITION_PREFIX) and name.endswith('.csv')]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESERVATION_COLUMNS)
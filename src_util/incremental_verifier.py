@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+"""
+증분 규칙 검증 (예약 확정 전 승인 검사)
+- 기존 예약으로 인덱스를 한 번 구축: 환자별 시작 시각 정렬 타임라인, 자원별 (시작, 종료) 구간 목록
+- check(delta): 새 예약 묶음에 대해 인덱스에서 관련 기존 예약만 뽑아 작은 검증 프레임 구성
+  환자: 새 예약 시작 ± 검사 범위(최대 간격 규칙, 최소 2일) 안의 같은 환자 예약
+  자원: 같은 자원에서 새 예약 구간과 겹치는 예약
+  → compile_l1_rules()의 evaluate()를 그 프레임에만 적용하고 새 예약이 포함된 위반만 반환
+  (행 규칙은 행 단위, 쌍 규칙은 환자/자원 단위이므로 전체 재검증 결과 중 새 예약 관련 위반과 같음)
+- commit(delta): 승인된 예약을 인덱스에 추가 (정렬 목록에 insort, 전체 재구축 없음)
+- save()/load(): 인덱스를 폴더에 보관해 다음 실행에서 재사용 (규칙은 load 시 다시 컴파일해 전달)
+  예약 행은 Arrow IPC 파일(INDEX_FRAME), 환자 타임라인 · 자원 구간은 NumPy 배열(INDEX_ARRAYS, 키별 오프셋 + 값)
+  pickle을 쓰지 않으므로 읽을 때 코드 실행 없음 (data_loader 캐시와 같음), pyarrow 필요
+"""
+
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+
+import numpy as np
+import pandas as pd
+
+from resource_assigner import NS_PER_MINUTE
+from rule_engine import VIOLATION_COLUMNS
+
+MIN_HORIZON_MIN = 2 * 24 * 60       # 같은 날 규칙 (야간 검사는 다음날 새벽까지) 을 덮는 최소 범위
+
+DELTA_COLUMNS = VIOLATION_COLUMNS + ['SOURCE', 'OTHER_SOURCE']
+
+INDEX_FRAME = 'reservation.arrow'       # save() 폴더 안 파일 이름
+INDEX_ARRAYS = 'timelines.npz'
+INDEX_META_KEY = b'verification_index'
+
+
+def prepare_reservation(reservation):
+    """검증에 필요한 타입 맞춤 (RESERVATION_DATETIME datetime, END_DATETIME 계산)"""
+    reservation = reservation.reset_index(drop=True)
+    if not pd.api.types.is_datetime64_any_dtype(reservation['RESERVATION_DATETIME']):
+        reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
+    if 'END_DATETIME' not in reservation.columns:
+        reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(
+            pd.to_numeric(reservation['DURATION_MIN']), unit='m')
+    return reservation
+
+
+def _resource_ids(reservation):
+    if 'RESOURCE_ID' not in reservation.columns:
+        return np.full(len(reservation), '', dtype=object)
+    return reservation['RESOURCE_ID'].astype(object).fillna('').to_numpy()
+
+
+class VerificationIndex:
+    """기존 예약 인덱스 + 새 예약 묶음 검증"""
+
+    def __init__(self, rules, reservation):
+        self.rules = rules
+        max_gap = rules.gap_constraints['REQUIRED_MIN'].max()
+        self.horizon = int(max(max_gap if pd.notna(max_gap) else 0, MIN_HORIZON_MIN)) * NS_PER_MINUTE
+
+        self.base = prepare_reservation(reservation)
+        self.added = []             # commit()으로 추가된 예약 DataFrame 목록
+        self._added_frame = None
+        self.size = len(self.base)
+
+        self.patients = {}          # PATIENT_ID -> [(시작 ns, 행 번호), ...] 시작 순
+        self.resources = {}         # RESOURCE_ID -> [(시작 ns, 종료 ns, 행 번호), ...] 시작 순
+        self.max_duration = {}      # RESOURCE_ID -> 가장 긴 예약 길이 ns (겹침 탐색 하한)
+        self._index(self.base, 0)
+
+    def _index(self, reservation, offset):
+        starts = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        ends = reservation['END_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+        rows = np.arange(offset, offset + len(reservation))
+        patients = reservation['PATIENT_ID'].astype(object).to_numpy()
+        resources = _resource_ids(reservation)
+
+        if offset == 0:
+            # 초기 구축: 그룹별로 한 번에 정렬
+            for patient_id, idx in pd.Series(patients).groupby(patients, sort=False).indices.items():
+                idx = idx[np.argsort(starts[idx], kind='stable')]
+                self.patients[patient_id] = list(zip(starts[idx].tolist(), rows[idx].tolist()))
+            for resource_id, idx in pd.Series(resources).groupby(resources, sort=False).indices.items():
+                if resource_id == '':
+                    continue
+                idx = idx[np.argsort(starts[idx], kind='stable')]
+                self.resources[resource_id] = list(zip(starts[idx].tolist(), ends[idx].tolist(), rows[idx].tolist()))
+                self.max_duration[resource_id] = int((ends[idx] - starts[idx]).max())
+            return
+
+        for patient_id, start, row in zip(patients, starts.tolist(), rows.tolist()):
+            insort(self.patients.setdefault(patient_id, []), (start, row))
+        for resource_id, start, end, row in zip(resources, starts.tolist(), ends.tolist(), rows.tolist()):
+            if resource_id == '':
+                continue
+            insort(self.resources.setdefault(resource_id, []), (start, end, row))
+            self.max_duration[resource_id] = max(self.max_duration.get(resource_id, 0), end - start)
+
+    def related_rows(self, delta):
+        """새 예약과 같은 규칙 검사 범위에 드는 기존 예약 행 번호 (정렬)"""
+        starts = delta['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64).tolist()
+        ends = delta['END_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64).tolist()
+        found = set()
+
+        for patient_id, start in zip(delta['PATIENT_ID'].astype(object), starts):
+            timeline = self.patients.get(patient_id)
+            if timeline:
+                lo = bisect_left(timeline, (start - self.horizon,))
+                hi = bisect_right(timeline, (start + self.horizon, self.size))
+                found.update(row for _, row in timeline[lo:hi])
+
+        for resource_id, start, end in zip(_resource_ids(delta), starts, ends):
+            intervals = self.resources.get(resource_id)
+            if not intervals:
+                continue
+            i = bisect_left(intervals, (start - self.max_duration[resource_id],))
+            while i < len(intervals) and intervals[i][0] < end:
+                if intervals[i][1] > start:
+                    found.add(intervals[i][2])
+                i += 1
+        return np.array(sorted(found), dtype=np.int64)
+
+    def rows(self, row_numbers):
+        """행 번호 → 기존 예약 DataFrame"""
+        base_part = row_numbers[row_numbers < len(self.base)]
+        frames = [self.base.iloc[base_part]]
+        if self.added:
+            if self._added_frame is None:
+                self._added_frame = pd.concat(self.added, ignore_index=True)
+            frames.append(self._added_frame.iloc[row_numbers[row_numbers >= len(self.base)] - len(self.base)])
+        return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].reset_index(drop=True)
+
+    def check(self, delta):
+        """새 예약 묶음 검증 → 새 예약이 포함된 위반 DataFrame (DELTA_COLUMNS)
+
+        SOURCE/OTHER_SOURCE: 'DELTA'(POS = delta 행 위치) / 'BASELINE'(POS = 인덱스 행 번호)
+        """
+        delta = prepare_reservation(delta)
+        related = self.related_rows(delta)
+        # 기존 예약(행 번호 순) 뒤에 새 예약: 전체 프레임 끝에 붙인 것과 같은 상대 순서 (같은 시각 쌍의 앞/뒤 판정)
+        context = pd.concat([self.rows(related), delta], ignore_index=True) if len(related) else delta
+
+        violations = self.rules.evaluate(context)
+        n_related = len(related)
+        pos = violations['POS'].to_numpy(dtype=np.int64)
+        other = violations['OTHER_POS'].to_numpy(dtype=np.int64)
+        involved = (pos >= n_related) | (other >= n_related)
+        violations = violations[involved].reset_index(drop=True)
+        pos, other = pos[involved], other[involved]
+
+        def source_rows(positions):
+            return (np.where(positions < 0, None, np.where(positions >= n_related, 'DELTA', 'BASELINE')),
+                    np.where(positions >= n_related, positions - n_related,
+                             related[np.clip(positions, 0, max(n_related - 1, 0))] if n_related else positions))
+
+        violations['SOURCE'], violations['POS'] = source_rows(pos)
+        violations['OTHER_SOURCE'], other_rows = source_rows(other)
+        violations['OTHER_POS'] = np.where(other < 0, -1, other_rows)
+        return violations[DELTA_COLUMNS]
+
+    def commit(self, delta):
+        """승인된 새 예약을 인덱스에 추가 → 부여된 행 번호 배열"""
+        delta = prepare_reservation(delta)
+        offset = self.size
+        self.added.append(delta)
+        self._added_frame = None
+        self.size += len(delta)
+        self._index(delta, offset)
+        return np.arange(offset, self.size)
+
+    def save(self, path):
+        """인덱스를 path 폴더에 저장 (컴파일된 규칙은 함수 객체라 제외, load 시 다시 전달)"""
+        import pyarrow as pa
+
+        os.makedirs(path, exist_ok=True)
+        frame = self.rows(np.arange(self.size))
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        meta = json.dumps({'horizon': self.horizon, 'size': self.size})
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), INDEX_META_KEY: meta})
+        with pa.OSFile(os.path.join(path, INDEX_FRAME), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        patient_keys, patient_offsets, (patient_starts, patient_rows) = _flatten(self.patients, 2)
+        resource_keys, resource_offsets, (resource_starts, resource_ends, resource_rows) = _flatten(self.resources, 3)
+        np.savez(os.path.join(path, INDEX_ARRAYS),
+                 patient_keys=patient_keys, patient_offsets=patient_offsets,
+                 patient_starts=patient_starts, patient_rows=patient_rows,
+                 resource_keys=resource_keys, resource_offsets=resource_offsets,
+                 resource_starts=resource_starts, resource_ends=resource_ends, resource_rows=resource_rows,
+                 resource_max_duration=np.array([self.max_duration[k] for k in resource_keys], dtype=np.int64))
+
+    @classmethod
+    def load(cls, path, rules):
+        import pyarrow as pa
+
+        with pa.OSFile(os.path.join(path, INDEX_FRAME), 'rb') as source:
+            table = pa.ipc.open_file(source).read_all()
+        meta = json.loads(table.schema.metadata[INDEX_META_KEY])
+
+        index = cls.__new__(cls)
+        index.rules = rules
+        index.horizon = meta['horizon']
+        index.base = table.to_pandas()
+        index.added = []
+        index._added_frame = None
+        index.size = meta['size']
+        with np.load(os.path.join(path, INDEX_ARRAYS), allow_pickle=False) as arrays:
+            index.patients = _unflatten(arrays['patient_keys'], arrays['patient_offsets'],
+                                        arrays['patient_starts'], arrays['patient_rows'])
+            index.resources = _unflatten(arrays['resource_keys'], arrays['resource_offsets'],
+                                         arrays['resource_starts'], arrays['resource_ends'], arrays['resource_rows'])
+            index.max_duration = dict(zip(arrays['resource_keys'].tolist(),
+                                          arrays['resource_max_duration'].tolist()))
+        return index
+
+
+def _flatten(timelines, width):
+    """{키: [(값, ...), ...]} → (키 배열, 키별 시작 오프셋 배열, 값 열 배열 width개)"""
+    keys = list(timelines)
+    offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(timelines[k]) for k in keys])
+    values = np.array([item for k in keys for item in timelines[k]], dtype=np.int64).reshape(-1, width)
+    return np.array(keys, dtype=str), offsets, tuple(values.T)
+
+
+def _unflatten(keys, offsets, *columns):
+    """_flatten 역변환 → {키: [(값, ...), ...]}"""
+    columns = [column.tolist() for column in columns]
+    offsets = offsets.tolist()
+    return {key: list(zip(*(column[offsets[i]:offsets[i + 1]] for column in columns)))
+            for i, key in enumerate(keys.tolist())}
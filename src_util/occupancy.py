@@ -0,0 +1,247 @@
+# -*- coding: utf-8 -*-
+"""
+자원 점유 비트맵
+- DayOccupancy (하루 단위): 장비유형별 (자원 수 × 10분 슬롯) bool 배열, 자원 1대가 1행
+- OccupancyCube (기간 전체): (자원 × 날짜 × 10분 슬롯) uint8 배열 1개
+  값은 비트 플래그 (BOOKED = 예약, UNAVAILABLE = 캘린더 사용 불가), 0이면 빈 슬롯
+  기존 예약은 슬롯 차분 배열 + 누적합으로 한 번에 채움 (행 단위 반복 없음)
+  예약 추천 (연속 빈 슬롯 탐색), 점유 표시 (reservation_viewer), 사용률 집계가 같은 배열을 읽음
+- "k개 연속 빈 슬롯" 조회는 누적합 차분으로 전체 시작 슬롯을 한 번에 계산
+- 자원 목록은 RESOURCE.csv (RESOURCE_ID, EQUIPMENT_TYPE) 기준
+- 자원 캘린더의 사용 불가 구간(운영시간 외, 점검)은 생성 시 점유로 미리 채움
+"""
+
+import numpy as np
+import pandas as pd
+
+SLOT_MIN = 10
+SLOTS_PER_DAY = 24 * 60 // SLOT_MIN
+
+BOOKED = 1                      # OccupancyCube 슬롯 플래그: 예약
+UNAVAILABLE = 2                 # OccupancyCube 슬롯 플래그: 운영시간 외 / 점검
+
+
+def slots_needed(duration):
+    """소요시간(분) → 점유 슬롯 수 (10분 단위 올림)"""
+    return max(1, -(-int(duration) // SLOT_MIN))
+
+
+def consecutive_free(free, n_slots):
+    """마지막 축 기준 n_slots 연속 빈 슬롯의 시작 위치 (free와 같은 모양 bool, 끝까지 못 채우는 시작은 False)"""
+    n_slots = min(n_slots, free.shape[-1])
+    run = np.zeros(free.shape[:-1] + (free.shape[-1] + 1,), dtype=np.int32)
+    np.cumsum(free, axis=-1, out=run[..., 1:])
+
+    fits = np.zeros(free.shape, dtype=bool)
+    n_starts = free.shape[-1] - n_slots + 1
+    fits[..., :n_starts] = (run[..., n_slots:] - run[..., :n_starts]) == n_slots
+    return fits
+
+
+def resources_by_type(resource_df):
+    """RESOURCE DataFrame → {EQUIPMENT_TYPE: [RESOURCE_ID, ...]}"""
+    grouped = {}
+    for row in resource_df.itertuples(index=False):
+        grouped.setdefault(row.EQUIPMENT_TYPE, []).append(row.RESOURCE_ID)
+    return grouped
+
+
+class DayOccupancy:
+    """하루 · 장비유형별 자원 점유 비트맵
+
+    자원이 등록되지 않은 장비유형은 제약 없음으로 취급
+    24시를 넘는 점유(야간 검사)는 당일 24시까지만 기록
+    unavailable: {RESOURCE_ID: [(시작 분, 종료 분), ...]} 사용 불가 구간 (걸친 슬롯 전체를 점유 처리)
+    조회/기록의 resource_ids: 검사를 수행할 수 있는 자원 목록 (목록 순 = 기록 우선순위, None이면 장비유형 전체)
+    """
+
+    def __init__(self, resource_ids_by_type, unavailable=None):
+        self.resource_ids = dict(resource_ids_by_type)
+        self.row_of = {eq: {rid: row for row, rid in enumerate(ids)} for eq, ids in self.resource_ids.items()}
+        self.grid = {eq: np.zeros((len(ids), SLOTS_PER_DAY), dtype=bool)
+                     for eq, ids in self.resource_ids.items()}
+        self._fit_cache = {}    # (eq, n_slots, resource_ids) -> 시작 슬롯별 배치 가능 여부
+
+        for eq, ids in self.resource_ids.items():
+            for row, resource_id in enumerate(ids):
+                for start, end in (unavailable or {}).get(resource_id, []):
+                    self.grid[eq][row, start // SLOT_MIN:-(-end // SLOT_MIN)] = True
+
+    def _rows(self, equipment, resource_ids):
+        """후보 자원 행 번호 배열 (resource_ids 순, 장비유형에 없는 자원은 제외)"""
+        if resource_ids is None:
+            return np.arange(len(self.resource_ids[equipment]))
+        row_of = self.row_of[equipment]
+        return np.array([row_of[rid] for rid in resource_ids if rid in row_of], dtype=np.intp)
+
+    def fit_starts(self, equipment, n_slots, resource_ids=None):
+        """시작 슬롯별로 n_slots 연속 빈 자원이 하나라도 있는지 (길이 SLOTS_PER_DAY bool 배열)"""
+        if equipment not in self.grid:
+            return np.ones(SLOTS_PER_DAY, dtype=bool)
+
+        key = (equipment, n_slots, None if resource_ids is None else tuple(resource_ids))
+        cached = self._fit_cache.get(key)
+        if cached is not None:
+            return cached
+
+        rows = self._rows(equipment, resource_ids)
+        fits = consecutive_free(~self.grid[equipment][rows], n_slots).any(axis=0)
+        self._fit_cache[key] = fits
+        return fits
+
+    def free_resources(self, equipment, start_slot, n_slots, resource_ids=None):
+        """start_slot부터 n_slots 동안 비어 있는 자원 행 번호 배열 (resource_ids 순, 24시 이후는 잘라서 판단)"""
+        end_slot = min(start_slot + n_slots, SLOTS_PER_DAY)
+        rows = self._rows(equipment, resource_ids)
+        return rows[~self.grid[equipment][rows, start_slot:end_slot].any(axis=1)]
+
+    def fits(self, equipment, start_slot, n_slots, resource_ids=None):
+        """단일 시작 슬롯 배치 가능 여부"""
+        if equipment not in self.grid:
+            return True
+        return len(self.free_resources(equipment, start_slot, n_slots, resource_ids)) > 0
+
+    def reserve(self, equipment, start_slot, n_slots, resource_ids=None):
+        """후보 중 첫 빈 자원에 점유 기록 → RESOURCE_ID (자원 미등록 유형/배치 불가 시 None)"""
+        if equipment not in self.grid:
+            return None
+
+        free_rows = self.free_resources(equipment, start_slot, n_slots, resource_ids)
+        if len(free_rows) == 0:
+            return None
+
+        row = free_rows[0]
+        self.grid[equipment][row, start_slot:start_slot + n_slots] = True
+        self._fit_cache = {k: v for k, v in self._fit_cache.items() if k[0] != equipment}
+        return self.resource_ids[equipment][row]
+
+
+class OccupancyCube:
+    """자원 × 날짜 × 10분 슬롯 점유 배열 (grid, uint8 비트 플래그)
+
+    resource_df: RESOURCE (RESOURCE_ID, EQUIPMENT_TYPE) - 행 순서가 자원 축
+    dates: 날짜 축 ('YYYY-MM-DD' 등, 연속일 필요 없음)
+    calendar: ResourceCalendar를 주면 사용 불가 구간(걸친 슬롯 전체)을 UNAVAILABLE로 미리 채움
+    24시를 넘는 점유(야간 검사)는 DayOccupancy와 같이 당일 24시까지만 기록
+    """
+
+    def __init__(self, resource_df, dates, calendar=None):
+        self.resource_ids = resource_df['RESOURCE_ID'].astype(str).tolist()
+        self.equipment = resource_df['EQUIPMENT_TYPE'].astype(str).to_numpy()
+        self.dates = [pd.Timestamp(d).strftime('%Y-%m-%d') for d in dates]
+        self.resource_pos = {rid: i for i, rid in enumerate(self.resource_ids)}
+        self.date_pos = {d: j for j, d in enumerate(self.dates)}
+        self.grid = np.zeros((len(self.resource_ids), len(self.dates), SLOTS_PER_DAY), dtype=np.uint8)
+
+        if calendar is not None:
+            for i, resource_id in enumerate(self.resource_ids):
+                for j, date in enumerate(self.dates):
+                    for start, end in calendar.unavailable(resource_id, date):
+                        self.grid[i, j, start // SLOT_MIN:-(-end // SLOT_MIN)] |= UNAVAILABLE
+
+    @classmethod
+    def from_reservation(cls, resource_df, reservation, dates=None, calendar=None):
+        """RESERVATION (RESOURCE_ID, RESERVATION_DATETIME, END_DATETIME)으로 채운 점유 배열
+
+        dates 생략 시 예약 첫날 ~ 마지막 날 전체
+        """
+        if dates is None:
+            day = reservation['RESERVATION_DATETIME'].dt.normalize()
+            dates = pd.date_range(day.min(), day.max(), freq='D')
+        cube = cls(resource_df, dates, calendar)
+        cube.add_reservation(reservation)
+        return cube
+
+    def add_reservation(self, reservation):
+        """예약 묶음 점유 기록 (축에 없는 자원/날짜, 자원 미배정 예약은 무시)"""
+        rows = pd.Series(self.resource_pos, dtype='float64').reindex(
+            reservation['RESOURCE_ID'].astype(object)).to_numpy()
+        start = reservation['RESERVATION_DATETIME']
+        day = start.dt.normalize()
+        cols = pd.Series(self.date_pos, dtype='float64').reindex(day.dt.strftime('%Y-%m-%d')).to_numpy()
+        keep = ~(np.isnan(rows) | np.isnan(cols))
+        if not keep.any():
+            return
+
+        start_slot = ((start - day) // pd.Timedelta(minutes=SLOT_MIN)).to_numpy()[keep]
+        end_min = ((reservation['END_DATETIME'] - day) // pd.Timedelta(minutes=1)).to_numpy()[keep]
+        end_slot = np.minimum(-(-end_min // SLOT_MIN), SLOTS_PER_DAY)
+        rows, cols = rows[keep].astype(np.intp), cols[keep].astype(np.intp)
+
+        # 구간 시작 +1, 종료 -1 → 누적합 > 0 인 슬롯이 점유 (겹치는 예약도 한 번에)
+        diff = np.zeros(self.grid.shape[:2] + (SLOTS_PER_DAY + 1,), dtype=np.int32)
+        np.add.at(diff, (rows, cols, start_slot), 1)
+        np.add.at(diff, (rows, cols, end_slot), -1)
+        self.grid |= (np.cumsum(diff[..., :SLOTS_PER_DAY], axis=-1) > 0).astype(np.uint8) * np.uint8(BOOKED)
+
+    def book(self, resource_id, date, start_min, end_min):
+        """예약 1건 점유 기록 (분 단위, 걸친 슬롯 전체)"""
+        i, j = self.resource_pos[resource_id], self.date_pos[pd.Timestamp(date).strftime('%Y-%m-%d')]
+        self.grid[i, j, start_min // SLOT_MIN:min(-(-end_min // SLOT_MIN), SLOTS_PER_DAY)] |= BOOKED
+
+    def _resource_rows(self, resources):
+        """장비유형 이름 또는 RESOURCE_ID 목록 → 자원 축 위치 배열"""
+        if isinstance(resources, str):
+            return np.flatnonzero(self.equipment == resources)
+        return np.array([self.resource_pos[rid] for rid in resources], dtype=np.intp)
+
+    def fit_mask(self, resources, duration, window=None):
+        """(자원, 날짜, 시작 슬롯)별 배치 가능 여부 bool 배열 (자원 축은 resources 순)
+
+        duration: 소요시간(분), window: (시작 분, 종료 분) 검사 운영시간 - 검사 전체가 이 안에 들어야 함
+        window는 time_range 결과 그대로 사용 (21:00~06:00 → (1260, 1800)),
+        종료 ≤ 시작인 원래 시각 표기 (1260, 360)도 다음날 종료로 받음
+        날짜 축은 하루 단위이므로 다음날로 넘어가는 부분은 당일 24시에서 자름
+        """
+        return self._fits(self._resource_rows(resources), duration, window)
+
+    def _fits(self, rows, duration, window):
+        free = self.grid[rows] == 0
+        if window is not None:
+            start_min, end_min = window
+            if end_min <= start_min:
+                end_min += 24 * 60
+            inside = np.zeros(SLOTS_PER_DAY, dtype=bool)
+            inside[-(-start_min // SLOT_MIN):min(end_min // SLOT_MIN, SLOTS_PER_DAY)] = True
+            free &= inside
+        return consecutive_free(free, slots_needed(duration))
+
+    def find_slots(self, resources, duration, window=None):
+        """배치 가능한 (RESOURCE_ID, 날짜, 시작 분) 전부 → DataFrame (날짜 · 시작 · 자원 순)"""
+        rows = self._resource_rows(resources)
+        day, slot, res = np.nonzero(self._fits(rows, duration, window).transpose(1, 2, 0))
+        start_min = slot * SLOT_MIN
+        return pd.DataFrame({
+            'RESOURCE_ID': np.array(self.resource_ids, dtype=object)[rows[res]],
+            'RESERVATION_DATE': np.array(self.dates, dtype=object)[day],
+            'START_MIN': start_min,
+            'END_MIN': start_min + int(duration),
+        })
+
+    def earliest_slot(self, resources, duration, window=None):
+        """가장 이른 (날짜, RESOURCE_ID, 시작 분, 종료 분) 또는 None (같은 시각이면 resources 순)"""
+        rows = self._resource_rows(resources)
+        fits = self._fits(rows, duration, window).transpose(1, 2, 0)
+        flat = fits.argmax()
+        if not fits.flat[flat]:
+            return None
+        day, slot, res = np.unravel_index(flat, fits.shape)
+        return self.dates[day], self.resource_ids[rows[res]], int(slot) * SLOT_MIN, int(slot) * SLOT_MIN + int(duration)
+
+    def day_slots(self, resource_id, date):
+        """자원 하루 슬롯 플래그 배열 (점유 표시용, 0 = 빈 슬롯)"""
+        return self.grid[self.resource_pos[resource_id], self.date_pos[pd.Timestamp(date).strftime('%Y-%m-%d')]]
+
+    def utilization(self):
+        """자원 · 날짜별 가용 슬롯 / 예약 슬롯 / 사용률 DataFrame (가용 슬롯이 없는 날 제외)"""
+        open_slots = (self.grid & UNAVAILABLE == 0).sum(axis=-1)
+        booked_slots = (self.grid == BOOKED).sum(axis=-1)
+        i, j = np.nonzero(open_slots)
+        return pd.DataFrame({
+            'RESOURCE_ID': np.array(self.resource_ids, dtype=object)[i],
+            'EQUIPMENT_TYPE': self.equipment[i],
+            'RESERVATION_DATE': np.array(self.dates, dtype=object)[j],
+            'OPEN_MIN': open_slots[i, j] * SLOT_MIN,
+            'BOOKED_MIN': booked_slots[i, j] * SLOT_MIN,
+            'UTILIZATION': booked_slots[i, j] / open_slots[i, j],
+        })
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+환자 분할 병렬 규칙 검증
+- PATIENT_ID 해시로 예약을 N개 파티션으로 분할 (당일/순서/간격 규칙은 환자 안에서 완결)
+- 파티션은 검증에 읽는 컬럼만 Arrow IPC 버퍼로 직렬화해 프로세스 풀에 전달 (DataFrame pickle 없음)
+- 작업 프로세스는 initializer에서 규칙을 한 번 컴파일 (컴파일된 규칙은 함수 객체라 전달 불가)
+- 파티션별 위반 그룹(Arrow 버퍼)을 받아 행 위치를 원본 위치로 되돌리고
+  (그룹 번호, 병합 키) 안정 정렬로 합침 → 직렬 evaluate()와 같은 행 순서 · 같은 값
+- 자원 겹침은 환자를 가로지르므로 메인 프로세스에서 전체 예약으로 검사
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from rule_engine import VIOLATION_COLUMNS, compile_l1_rules
+
+_worker_rules = None        # 작업 프로세스별 컴파일된 규칙 (_init_worker에서 설정)
+
+
+def partition_by_patient(reservation, n_partitions):
+    """PATIENT_ID 해시 → 파티션별 행 위치 배열 목록 (각 배열은 오름차순, 빈 파티션 제외)"""
+    patients = reservation['PATIENT_ID'].astype(object).to_numpy()
+    buckets = pd.util.hash_array(patients) % np.uint64(n_partitions)
+    partitions = [np.flatnonzero(buckets == k) for k in range(n_partitions)]
+    return [rows for rows in partitions if len(rows)]
+
+
+def to_arrow_buffer(frame):
+    """DataFrame → Arrow IPC 스트림 버퍼"""
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def from_arrow_buffer(buffer):
+    """Arrow IPC 스트림 버퍼 → DataFrame"""
+    return pa.ipc.open_stream(buffer).read_all().to_pandas()
+
+
+def _init_worker(exam_master, relation_rules, condition_rules, codes):
+    global _worker_rules
+    _worker_rules = compile_l1_rules(exam_master, relation_rules, condition_rules, codes)
+
+
+def _verify_partition(buffer):
+    """프로세스 풀 작업: 파티션 버퍼 → [(그룹 번호, 병합 키, 위반 버퍼), ...] (POS는 파티션 내 위치)"""
+    partition = from_arrow_buffer(buffer)
+    return [(group, key, to_arrow_buffer(part))
+            for group, key, part in _worker_rules.evaluate_groups(partition, overlap=False)]
+
+
+def merge_groups(partitions, results):
+    """파티션별 위반 그룹 → 원본 행 위치로 바꿔 그룹 순으로 합친 DataFrame 목록"""
+    collected = {}
+    for rows, groups in zip(partitions, results):
+        for group, key, buffer in groups:
+            part = from_arrow_buffer(buffer)
+            part['POS'] = rows[part['POS'].to_numpy()]
+            other = part['OTHER_POS'].to_numpy()
+            part['OTHER_POS'] = np.where(other < 0, -1, rows[np.maximum(other, 0)])
+            collected.setdefault(group, (key, []))[1].append(part)
+
+    merged = []
+    for group in sorted(collected):
+        key, frames = collected[group]
+        part = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        merged.append(part.sort_values(key, kind='stable', ignore_index=True))
+    return merged
+
+
+def evaluate_parallel(rules, reservation, n_workers):
+    """환자 분할 병렬 L1 검증 → 위반 DataFrame (rules.evaluate(reservation)와 같은 결과)"""
+    reservation = reservation.reset_index(drop=True)
+    partitions = partition_by_patient(reservation, n_workers)
+    columns = [c for c in rules.input_columns() if c in reservation.columns]
+    buffers = [to_arrow_buffer(reservation.iloc[rows][columns]) for rows in partitions]
+
+    initargs = (rules.exam_master, rules.relation_rules, rules.condition_rules, rules.codes)
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = pool.map(_verify_partition, buffers)
+        # 작업 프로세스가 도는 동안 자원 겹침은 메인 프로세스에서
+        overlap = None
+        if 'RESOURCE_ID' in reservation.columns and 'END_DATETIME' in reservation.columns:
+            overlap = rules.overlap_violations(reservation)
+        results = list(pending)
+
+    parts = merge_groups(partitions, results)
+    if overlap is not None and len(overlap):
+        parts.append(overlap)
+    if not parts:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)
+    return pd.concat(parts, ignore_index=True)[VIOLATION_COLUMNS]
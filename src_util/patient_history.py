@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""
+환자별 예약 이력 저장소 (충돌 검사용)
+- 규칙(EXAM_RELATION_RULES)에 등장하는 검사만 검사코드별 버킷으로 보관
+- 버킷은 날짜(ordinal) 오름차순 정렬 리스트 → bisect로 최대 GAP 구간만 조회
+- 이력이 수백만 건, 환자가 수만 명으로 늘어도 검사 1회 비용은 일정
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from datetime import date as date_cls
+
+
+class PatientHistory:
+    """환자별 · 규칙 관련 검사코드별 날짜 정렬 이력"""
+
+    def __init__(self, rule_index):
+        self.rule_index = rule_index
+        self.patient_ids = []   # 등록 순서 유지 (재방문 환자 추첨용)
+        self._buckets = {}      # patient_id -> {exam_cd: [date ordinal, ...]}
+
+        # 신규 검사 → 충돌 가능한 기존 검사 목록
+        partners = {}
+        for exam_a, exam_b in rule_index.same_day_pairs:
+            partners.setdefault(exam_a, set()).add(exam_b)
+            partners.setdefault(exam_b, set()).add(exam_a)
+
+        # (기존 검사, 신규 검사) → 최소 간격(일), 일(D) 단위 GAP만 대상
+        self._day_gaps = {}
+        for (exam_a, exam_b), rules in rule_index.gap_pairs.items():
+            days = [r.gap_value for r in rules if r.gap_unit == 'D']
+            if days:
+                self._day_gaps[(exam_a, exam_b)] = max(days)
+                partners.setdefault(exam_b, set()).add(exam_a)
+
+        self._partners = {k: tuple(sorted(v)) for k, v in partners.items()}
+        self.window_days = max(self._day_gaps.values(), default=0)
+
+    def __contains__(self, patient_id):
+        return patient_id in self._buckets
+
+    def __len__(self):
+        return len(self.patient_ids)
+
+    def add(self, patient_id, exam_cd, date):
+        """예약 1건 추가 (규칙과 무관한 검사는 환자 등록만)"""
+        buckets = self._buckets.get(patient_id)
+        if buckets is None:
+            buckets = self._buckets[patient_id] = {}
+            self.patient_ids.append(patient_id)
+
+        if exam_cd in self.rule_index.rule_exams:
+            dates = buckets.setdefault(exam_cd, [])
+            ordinal = date.toordinal()
+            if not dates or dates[-1] <= ordinal:
+                dates.append(ordinal)   # 날짜 순 생성 시 대부분 이 경로
+            else:
+                insort(dates, ordinal)
+
+    def dates_within(self, patient_id, exam_cd, date, days):
+        """date ± days 구간에 있는 해당 검사 날짜(ordinal) 목록"""
+        dates = self._buckets.get(patient_id, {}).get(exam_cd)
+        if not dates:
+            return []
+        ordinal = date.toordinal()
+        lo = bisect_left(dates, ordinal - days)
+        hi = bisect_right(dates, ordinal + days)
+        return dates[lo:hi]
+
+    def records(self, patient_id):
+        """보관 중인 (exam_cd, date) 이력"""
+        for exam_cd, dates in self._buckets.get(patient_id, {}).items():
+            for ordinal in dates:
+                yield exam_cd, date_cls.fromordinal(ordinal)
+
+    def has_conflict(self, patient_id, new_exams, new_date):
+        """신규 검사 목록이 기존 이력과 당일불가/간격(D) 규칙으로 충돌하는지"""
+        buckets = self._buckets.get(patient_id)
+        if not buckets:
+            return False
+
+        ordinal = new_date.toordinal()
+        for new_exam in new_exams:
+            for hist_exam in self._partners.get(new_exam, ()):
+                dates = buckets.get(hist_exam)
+                if not dates:
+                    continue
+
+                lo = bisect_left(dates, ordinal - self.window_days)
+                hi = bisect_right(dates, ordinal + self.window_days)
+                if lo == hi:
+                    continue
+
+                same_day = self.rule_index.is_same_day_forbidden(new_exam, hist_exam)
+                gap_days = self._day_gaps.get((hist_exam, new_exam), 0)
+                for hist_ordinal in dates[lo:hi]:
+                    if same_day and hist_ordinal == ordinal:
+                        return True
+                    if abs(ordinal - hist_ordinal) < gap_days:
+                        return True
+
+        return False
@@ -4,12 +4,15 @@
 - 날짜별 시간표 형식
 - 10분 단위 블럭
 - 마우스 호버 시 예약 정보 표시
+- 블럭 상태(예약/사용 불가/빈 슬롯)는 그날 OccupancyCube 점유 배열 1개에서 읽음
 """
 
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-import os
+
+from data_loader import load_reservation, load_resource
+from occupancy import BOOKED, SLOT_MIN, OccupancyCube
+from resource_calendar import ResourceCalendar, load_calendar
 
 # 페이지 설정
 st.set_page_config(
@@ -35,6 +38,9 @@ st.markdown("""
     .empty {
         background-color: #f5f5f5;
     }
+    .unavailable {
+        background: repeating-linear-gradient(45deg, #ccc, #ccc 4px, #eee 4px, #eee 8px);
+    }
     .resource-header {
         font-weight: bold;
         text-align: center;
@@ -63,16 +69,13 @@ st.markdown("""
 # 데이터 로드
 @st.cache_data
 def load_data():
-    base_path = r'c:\Users\user\Desktop\검사규칙 합성데이터\data'
-    reservation = pd.read_csv(os.path.join(base_path, 'RESERVATION.csv'))
-    resource = pd.read_csv(os.path.join(base_path, 'RESOURCE.csv'))
+    reservation = load_reservation()
+    resource = load_resource()
+    calendar = load_calendar(resource) or ResourceCalendar(resource)
 
-    reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
-    reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(reservation['DURATION_MIN'], unit='m')
+    return reservation, resource, calendar
 
-    return reservation, resource
-
-reservation, resource = load_data()
+reservation, resource, calendar = load_data()
 
 # 사이드바
 st.sidebar.title("📅 검사 예약 시간표")
@@ -92,9 +95,12 @@ selected_equipment = st.sidebar.selectbox(
     ['전체'] + equipment_types
 )
 
-# 시간 범위
-start_hour = st.sidebar.slider("시작 시간", 6, 12, 8)
-end_hour = st.sidebar.slider("종료 시간", 14, 22, 16)
+# 시간 범위 (기본값: 그날 병원 운영시간)
+facility_hours = calendar.facility_hours(selected_date)
+default_start = min(max(facility_hours[0][0] // 60, 6), 12) if facility_hours else 8
+default_end = min(max(-(-facility_hours[-1][1] // 60), 14), 22) if facility_hours else 16
+start_hour = st.sidebar.slider("시작 시간", 6, 12, default_start)
+end_hour = st.sidebar.slider("종료 시간", 14, 22, default_end)
 
 # 메인 화면
 st.title(f"📅 {selected_date} 예약 시간표")
@@ -110,6 +116,9 @@ else:
 
 st.caption(f"총 {len(day_reservations)}건의 예약")
 
+# 그날 점유 배열: 예약 + 자원 캘린더 사용 불가(운영시간 외/점검/휴무)를 한 번에 채움
+day_cube = OccupancyCube.from_reservation(resource, day_reservations, [selected_date], calendar)
+
 # 10분 단위 시간 슬롯 생성
 time_slots = []
 current = datetime.strptime(f"{selected_date} {start_hour:02d}:00", "%Y-%m-%d %H:%M")
@@ -156,8 +165,11 @@ for equip_type in equipment_groups:
     for i, res_id in enumerate(equip_resources):
         cols[i + 1].markdown(f"**{res_id}**")
 
+    resource_slots = {res_id: day_cube.day_slots(res_id, selected_date) for res_id in equip_resources}
+
     # 시간 슬롯별 표시
     for time_slot in time_slots:
+        slot = (time_slot.hour * 60 + time_slot.minute) // SLOT_MIN
         cols = st.columns([1] + [2] * len(equip_resources))
 
         # 시간 라벨 (정각만 표시)
@@ -168,11 +180,11 @@ for equip_type in equipment_groups:
 
         # 각 자원별 블럭
         for i, res_id in enumerate(equip_resources):
-            res_data = day_reservations[day_reservations['RESOURCE_ID'] == res_id]
-            reservation_info = get_reservation_at_time(res_id, time_slot, res_data)
+            flags = resource_slots[res_id][slot]
 
-            if reservation_info is not None:
+            if flags & BOOKED:
                 # 예약 있음 - 색상 블럭 + 툴팁
+                reservation_info = get_reservation_at_time(res_id, time_slot, day_reservations)
                 tooltip_text = f"""
                 🏷️ {reservation_info['EXAM_CD']}
                 📋 {reservation_info['EXAM_NM']}
@@ -183,6 +195,12 @@ for equip_type in equipment_groups:
                     f"""<div class="time-block occupied" title="{tooltip_text.strip()}"></div>""",
                     unsafe_allow_html=True
                 )
+            elif flags:
+                # 가용 시간 외 (운영시간 외/점검/휴무)
+                cols[i + 1].markdown(
+                    f"""<div class="time-block unavailable"></div>""",
+                    unsafe_allow_html=True
+                )
             else:
                 # 빈 슬롯
                 cols[i + 1].markdown(
@@ -197,6 +215,7 @@ st.markdown("""
 ### 범례
 - 🟩 **녹색**: 예약됨 (마우스 올리면 상세 정보)
 - ⬜ **회색**: 비어있음
+- ▨ **빗금**: 사용 불가 (운영시간 외/점검/휴무 - 자원 캘린더)
 """)
 
 # 해당 날짜 예약 목록
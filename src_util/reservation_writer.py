@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+예약 데이터 월별 파티션 스트리밍 저장
+- 날짜 순으로 들어오는 예약 행을 chunk_rows 단위로만 메모리에 보관
+- RESERVATION_YYYY-MM.csv (또는 .parquet) 월별 파일로 이어 쓰기
+- parquet 저장은 pyarrow 필요
+"""
+
+import os
+
+import pandas as pd
+
+
+class MonthlyPartitionWriter:
+    """예약 행(dict)을 월별 CSV/Parquet 파티션으로 저장"""
+
+    def __init__(self, output_dir, file_format='csv', chunk_rows=50000, prefix='RESERVATION',
+                 to_frame=pd.DataFrame):
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f'지원하지 않는 형식: {file_format}')
+
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.chunk_rows = chunk_rows
+        self.prefix = prefix
+        self.to_frame = to_frame    # 행 목록 → DataFrame (출력 직전 변환)
+
+        self.partition_rows = {}    # 파티션 경로 -> 저장 건수
+        self._buffer = []
+        self._buffer_month = None
+        self._parquet_writers = {}
+        self._parquet_schema = None
+
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def partition_path(self, month):
+        return os.path.join(self.output_dir, f'{self.prefix}_{month}.{self.file_format}')
+
+    def write_rows(self, rows):
+        """예약 행 목록 추가 (RESERVATION_DATE 기준 월이 바뀌면 이전 월 flush)"""
+        for row in rows:
+            month = row['RESERVATION_DATE'][:7]
+            if month != self._buffer_month:
+                self.flush()
+                self._buffer_month = month
+            self._buffer.append(row)
+            if len(self._buffer) >= self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        """버퍼에 쌓인 행을 해당 월 파티션에 기록"""
+        if not self._buffer:
+            return
+
+        path = self.partition_path(self._buffer_month)
+        chunk = self.to_frame(self._buffer)
+
+        if self.file_format == 'csv':
+            is_new = path not in self.partition_rows
+            chunk.to_csv(path, mode='w' if is_new else 'a', header=is_new,
+                         index=False, encoding='utf-8-sig')
+        else:
+            self._write_parquet(path, chunk)
+
+        self.partition_rows[path] = self.partition_rows.get(path, 0) + len(chunk)
+        self._buffer = []
+
+    def _write_parquet(self, path, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(chunk, schema=self._parquet_schema, preserve_index=False)
+        if self._parquet_schema is None:
+            self._parquet_schema = table.schema
+
+        writer = self._parquet_writers.get(path)
+        if writer is None:
+            writer = self._parquet_writers[path] = pq.ParquetWriter(path, self._parquet_schema)
+        writer.write_table(table)
+
+    def close(self):
+        """남은 행 flush 후 파일 닫기 → {파티션 경로: 건수}"""
+        self.flush()
+        for writer in self._parquet_writers.values():
+            writer.close()
+        self._parquet_writers = {}
+        return self.partition_rows
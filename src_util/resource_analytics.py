@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+자원별 사용률 / 단편화(빈 시간 조각) 분석
+- 자원 · 날짜별: 예약 수, 사용 시간, 운영시간 내 사용/유휴 시간, 유휴 구간 수와 길이, 첫 시작/마지막 종료
+- 자원 · 날짜 · 시간대(1시간)별 사용 시간
+- 자원별 요약: 사용률, 유휴 구간 길이 분포(p50/p90, 짧은 조각 수)
+- 전 과정 numpy 정렬/누적 연산 (행 단위 Python 반복 없음), 결과는 CSV 또는 Parquet 저장
+
+운영시간: 평일 08:30~17:30, 토요일 08:30~12:30, 일요일 휴무 (generate_reservation.py와 동일)
+겹치는 예약(이중 배정)은 합쳐서 사용 시간으로 계산
+야간 검사처럼 24시를 넘는 사용은 사용 시간에는 포함, 시간대별 표에서는 24시까지만 집계
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from time_model import MINUTES_PER_DAY, format_hhmm, parse_hhmm
+
+OPEN_MIN = parse_hhmm('08:30')
+WEEKDAY_CLOSE_MIN = parse_hhmm('17:30')
+SATURDAY_CLOSE_MIN = parse_hhmm('12:30')
+
+SHORT_GAP_MIN = 30              # 이보다 짧은 유휴 구간 = 쓰기 어려운 조각
+GAP_BINS = [0, 10, 30, 60, 120, MINUTES_PER_DAY]
+GAP_LABELS = ['GAP_LT10', 'GAP_10_30', 'GAP_30_60', 'GAP_60_120', 'GAP_GE120']
+
+_KEY_SPAN = 4 * MINUTES_PER_DAY  # 그룹 간 분 값이 섞이지 않도록 띄우는 폭 (야간 검사 포함)
+
+
+def close_minutes(dates):
+    """날짜 배열(datetime64) → 운영 종료 분 (일요일 = OPEN_MIN, 운영시간 0)"""
+    weekday = pd.DatetimeIndex(dates).weekday.to_numpy()
+    return np.select([weekday == 6, weekday == 5], [OPEN_MIN, SATURDAY_CLOSE_MIN], WEEKDAY_CLOSE_MIN)
+
+
+def _busy_blocks(reservation):
+    """(자원, 날짜)별로 겹치는 예약을 합친 사용 구간
+
+    → (블록 DataFrame, 그룹별 예약 수, 자원 ID 배열, 날짜 문자열, 날짜 datetime64)
+    블록 START/END: 예약일 00:00 기준 분
+    """
+    resource_codes, resource_ids = pd.factorize(reservation['RESOURCE_ID'].astype(object))
+    date_codes, date_labels = pd.factorize(reservation['RESERVATION_DATE'].astype(object))
+    date_values = pd.to_datetime(pd.Index(date_labels)).to_numpy(dtype='datetime64[ns]')
+
+    valid = resource_codes >= 0
+    valid &= np.asarray(reservation['RESOURCE_ID'].astype(object) != '')
+    resource_codes = resource_codes[valid]
+    date_codes = date_codes[valid]
+
+    starts_ns = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]')[valid]
+    start = ((starts_ns - date_values[date_codes]) // np.timedelta64(1, 'm')).astype(np.int64)
+    end = start + reservation['DURATION_MIN'].to_numpy(dtype=np.int64)[valid]
+
+    order = np.lexsort((start, date_codes, resource_codes))
+    resource_codes, date_codes = resource_codes[order], date_codes[order]
+    start, end = start[order], end[order]
+
+    group_change = np.r_[True, (resource_codes[1:] != resource_codes[:-1]) | (date_codes[1:] != date_codes[:-1])]
+    group = np.cumsum(group_change) - 1
+
+    # 그룹 내 누적 최대 종료 시각 (그룹 번호를 키에 더해 전체 누적 최대 1번으로 계산)
+    running_end = np.maximum.accumulate(group * _KEY_SPAN + end) - group * _KEY_SPAN
+    prev_running_end = np.r_[0, running_end[:-1]]
+    block_start_flag = group_change | (start >= prev_running_end)
+    block = np.cumsum(block_start_flag) - 1
+
+    block_first = np.flatnonzero(block_start_flag)
+    block_last = np.r_[block_first[1:], len(block)] - 1
+    blocks = pd.DataFrame({
+        'GROUP': group[block_first],
+        'RESOURCE_CODE': resource_codes[block_first],
+        'DATE_CODE': date_codes[block_first],
+        'START': start[block_first],
+        'END': running_end[block_last],
+    })
+    bookings = np.bincount(group)
+    return blocks, bookings, np.asarray(resource_ids, dtype=object), date_labels, date_values
+
+
+def analyze_utilization(reservation, resource_ids=None):
+    """자원 사용률/단편화 분석 → {'daily', 'hourly', 'gaps', 'summary'} DataFrame
+
+    reservation: RESOURCE_ID, RESERVATION_DATE, RESERVATION_DATETIME(datetime), DURATION_MIN 컬럼 필요
+    resource_ids: 전체 자원 목록 (주면 예약이 없는 자원·운영일도 유휴로 포함)
+    """
+    blocks, bookings, resource_labels, date_labels, date_values = _busy_blocks(reservation)
+
+    # --- (자원, 날짜) 그룹 단위 ---
+    first_block = np.flatnonzero(np.r_[True, blocks['GROUP'].to_numpy()[1:] != blocks['GROUP'].to_numpy()[:-1]])
+    group_resource = blocks['RESOURCE_CODE'].to_numpy()[first_block]
+    group_date = blocks['DATE_CODE'].to_numpy()[first_block]
+
+    block_group = blocks['GROUP'].to_numpy()
+    block_start = blocks['START'].to_numpy()
+    block_end = blocks['END'].to_numpy()
+    close = close_minutes(date_values)[blocks['DATE_CODE'].to_numpy()]
+
+    clipped = np.clip(np.minimum(block_end, close) - np.maximum(block_start, OPEN_MIN), 0, None)
+    n_groups = len(first_block)
+    busy = np.bincount(block_group, weights=block_end - block_start, minlength=n_groups)
+    busy_in_hours = np.bincount(block_group, weights=clipped, minlength=n_groups)
+
+    # 유휴 구간: 운영 시작(또는 앞 블록 종료) ~ 블록 시작, 마지막 블록 종료 ~ 운영 종료
+    is_first = np.zeros(len(blocks), dtype=bool)
+    is_first[first_block] = True
+    prev_end = np.where(is_first, OPEN_MIN, np.r_[0, block_end[:-1]])
+    gap_before = np.minimum(block_start, close) - np.maximum(prev_end, OPEN_MIN)
+    last_block = np.r_[first_block[1:], len(blocks)] - 1
+    group_close = close[last_block]
+    gap_after = group_close - np.maximum(block_end[last_block], OPEN_MIN)
+
+    gaps = pd.DataFrame({
+        'GROUP': np.r_[block_group, block_group[last_block]],
+        'GAP_START': np.r_[np.maximum(prev_end, OPEN_MIN), np.maximum(block_end[last_block], OPEN_MIN)],
+        'GAP_MIN': np.r_[gap_before, gap_after],
+    })
+    gaps = gaps[gaps['GAP_MIN'] > 0].sort_values(['GROUP', 'GAP_START'], kind='stable')
+    gap_group = gaps['GROUP'].to_numpy()
+    gap_len = gaps['GAP_MIN'].to_numpy()
+
+    window = group_close - OPEN_MIN
+    daily = pd.DataFrame({
+        'RESOURCE_ID': resource_labels[group_resource],
+        'RESERVATION_DATE': np.asarray(date_labels, dtype=object)[group_date],
+        'BOOKINGS': bookings,
+        'BUSY_MIN': busy.astype(np.int64),
+        'BUSY_IN_HOURS_MIN': busy_in_hours.astype(np.int64),
+        'OPERATING_MIN': window,
+        'IDLE_MIN': np.maximum(window - busy_in_hours, 0).astype(np.int64),
+        'IDLE_GAPS': np.bincount(gap_group, minlength=n_groups),
+        'MAX_GAP_MIN': _group_max(gap_group, gap_len, n_groups),
+        'SHORT_GAPS': np.bincount(gap_group, weights=gap_len < SHORT_GAP_MIN, minlength=n_groups).astype(np.int64),
+        'FIRST_START': format_hhmm(block_start[first_block]),
+        'LAST_END': format_hhmm(block_end[last_block]),
+    })
+
+    gaps_out = pd.DataFrame({
+        'RESOURCE_ID': resource_labels[group_resource[gap_group]],
+        'RESERVATION_DATE': np.asarray(date_labels, dtype=object)[group_date[gap_group]],
+        'GAP_START': format_hhmm(gaps['GAP_START'].to_numpy()),
+        'GAP_MIN': gap_len,
+    })
+
+    if resource_ids is not None:
+        daily = _add_idle_days(daily, resource_ids, date_labels, date_values)
+        # 예약 없는 운영일 = 운영시간 전체가 유휴 구간 1개
+        idle_days = daily[(daily['BOOKINGS'] == 0) & (daily['OPERATING_MIN'] > 0)]
+        gaps_out = pd.concat([gaps_out, pd.DataFrame({
+            'RESOURCE_ID': idle_days['RESOURCE_ID'].to_numpy(),
+            'RESERVATION_DATE': idle_days['RESERVATION_DATE'].to_numpy(),
+            'GAP_START': format_hhmm(OPEN_MIN),
+            'GAP_MIN': idle_days['OPERATING_MIN'].to_numpy(),
+        })], ignore_index=True)
+
+    daily = daily.sort_values(['RESOURCE_ID', 'RESERVATION_DATE']).reset_index(drop=True)
+    gaps_out = gaps_out.sort_values(['RESOURCE_ID', 'RESERVATION_DATE', 'GAP_START']).reset_index(drop=True)
+
+    hourly = _hourly_busy(blocks, resource_labels, date_labels)
+    summary = _summarize(daily, gaps_out)
+    return {'daily': daily, 'hourly': hourly, 'gaps': gaps_out, 'summary': summary}
+
+
+def _group_max(groups, values, n_groups):
+    result = np.zeros(n_groups, dtype=np.int64)
+    np.maximum.at(result, groups, values)
+    return result
+
+
+def _add_idle_days(daily, resource_ids, date_labels, date_values):
+    """예약 없는 (자원, 운영일)을 전체 유휴 행으로 추가 (운영일 = 데이터 기간 중 일요일 제외)"""
+    first, last = date_values.min(), date_values.max()
+    all_days = pd.date_range(first, last, freq='D')
+    all_days = all_days[all_days.weekday != 6]
+    day_text = all_days.strftime('%Y-%m-%d')
+
+    full = pd.MultiIndex.from_product([list(resource_ids), day_text], names=['RESOURCE_ID', 'RESERVATION_DATE'])
+    existing = pd.MultiIndex.from_frame(daily[['RESOURCE_ID', 'RESERVATION_DATE']])
+    missing = full.difference(existing)
+    if len(missing) == 0:
+        return daily
+
+    missing_dates = pd.to_datetime(missing.get_level_values(1))
+    window = close_minutes(missing_dates.to_numpy()) - OPEN_MIN
+    idle = pd.DataFrame({
+        'RESOURCE_ID': missing.get_level_values(0),
+        'RESERVATION_DATE': missing.get_level_values(1),
+        'BOOKINGS': 0,
+        'BUSY_MIN': 0,
+        'BUSY_IN_HOURS_MIN': 0,
+        'OPERATING_MIN': window,
+        'IDLE_MIN': window,
+        'IDLE_GAPS': (window > 0).astype(np.int64),
+        'MAX_GAP_MIN': window,
+        'SHORT_GAPS': ((window > 0) & (window < SHORT_GAP_MIN)).astype(np.int64),
+        'FIRST_START': None,
+        'LAST_END': None,
+    })
+    return pd.concat([daily, idle], ignore_index=True)
+
+
+def _hourly_busy(blocks, resource_labels, date_labels):
+    """사용 구간을 1시간 단위로 나눠 (자원, 날짜, 시)별 사용 분 (24시까지)"""
+    start = np.clip(blocks['START'].to_numpy(), 0, MINUTES_PER_DAY)
+    end = np.clip(blocks['END'].to_numpy(), 0, MINUTES_PER_DAY)
+    keep = end > start
+    start, end = start[keep], end[keep]
+    resource_code = blocks['RESOURCE_CODE'].to_numpy()[keep]
+    date_code = blocks['DATE_CODE'].to_numpy()[keep]
+
+    first_hour = start // 60
+    n_hours = (end - 1) // 60 - first_hour + 1
+    row = np.repeat(np.arange(len(start)), n_hours)
+    hour = first_hour[row] + np.arange(n_hours.sum()) - np.repeat(np.cumsum(n_hours) - n_hours, n_hours)
+    minutes = np.minimum(end[row], (hour + 1) * 60) - np.maximum(start[row], hour * 60)
+
+    hourly = pd.DataFrame({
+        'RESOURCE_CODE': resource_code[row],
+        'DATE_CODE': date_code[row],
+        'HOUR': hour,
+        'BUSY_MIN': minutes,
+    }).groupby(['RESOURCE_CODE', 'DATE_CODE', 'HOUR'], sort=False, as_index=False)['BUSY_MIN'].sum()
+
+    return pd.DataFrame({
+        'RESOURCE_ID': resource_labels[hourly['RESOURCE_CODE'].to_numpy()],
+        'RESERVATION_DATE': np.asarray(date_labels, dtype=object)[hourly['DATE_CODE'].to_numpy()],
+        'HOUR': hourly['HOUR'].to_numpy(),
+        'BUSY_MIN': hourly['BUSY_MIN'].to_numpy(),
+    }).sort_values(['RESOURCE_ID', 'RESERVATION_DATE', 'HOUR']).reset_index(drop=True)
+
+
+def _summarize(daily, gaps):
+    """자원별 요약 (사용률 = 운영시간 내 사용 / 운영시간)"""
+    summary = daily.groupby('RESOURCE_ID', sort=True).agg(
+        DAYS=('RESERVATION_DATE', 'size'),
+        ACTIVE_DAYS=('BOOKINGS', lambda s: int((s > 0).sum())),
+        BOOKINGS=('BOOKINGS', 'sum'),
+        BUSY_MIN=('BUSY_MIN', 'sum'),
+        BUSY_IN_HOURS_MIN=('BUSY_IN_HOURS_MIN', 'sum'),
+        OPERATING_MIN=('OPERATING_MIN', 'sum'),
+        IDLE_MIN=('IDLE_MIN', 'sum'),
+        IDLE_GAPS=('IDLE_GAPS', 'sum'),
+        SHORT_GAPS=('SHORT_GAPS', 'sum'),
+    )
+    summary['UTILIZATION'] = (summary['BUSY_IN_HOURS_MIN'] / summary['OPERATING_MIN'].where(summary['OPERATING_MIN'] > 0)).round(4)
+
+    gap_stats = gaps.groupby('RESOURCE_ID', sort=True)['GAP_MIN'].quantile([0.5, 0.9]).unstack()
+    gap_stats.columns = ['GAP_P50_MIN', 'GAP_P90_MIN']
+    bins = pd.cut(gaps['GAP_MIN'], GAP_BINS, right=False, labels=GAP_LABELS)
+    gap_hist = pd.crosstab(gaps['RESOURCE_ID'], bins).reindex(columns=GAP_LABELS, fill_value=0)
+
+    summary = summary.join(gap_stats).join(gap_hist)
+    summary[GAP_LABELS] = summary[GAP_LABELS].fillna(0).astype(np.int64)
+    return summary.reset_index()
+
+
+def write_analytics(tables, path_prefix, file_format='csv'):
+    """분석 결과 저장: <prefix>_<표 이름>.csv / .parquet → 경로 목록"""
+    if file_format not in ('csv', 'parquet'):
+        raise ValueError(f'지원하지 않는 형식: {file_format}')
+
+    os.makedirs(os.path.dirname(path_prefix) or '.', exist_ok=True)
+    paths = []
+    for name, df in tables.items():
+        path = f'{path_prefix}_{name}.{file_format}'
+        if file_format == 'csv':
+            df.to_csv(path, index=False, encoding='utf-8-sig')
+        else:
+            df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
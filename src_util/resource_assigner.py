@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+자원(장비) 배정 - 구간 분할(interval partitioning)
+- (장비유형, 예약일) 그룹마다 시작 시각 순으로 처리
+- 자원별 종료 시각을 최소 힙으로 관리: 가장 먼저 비는 자원(동률이면 앞 번호) 선택
+  → 기존 "비어 있는 자원 중 가장 먼저 빈 자원, 없으면 가장 빨리 끝나는 자원" 규칙과 같은 결과
+- 결과는 RESOURCE_ID 배열로 반환 (한 번에 컬럼 대입)
+- calendar(ResourceCalendar)를 주면 그날 가용 구간 밖인 자원은 제외 (가용 제한이 있는 날만 자원별 선형 탐색)
+- 이중 배정 검증: (RESOURCE_ID, 시작 시각) 정렬 1회 + searchsorted로 겹치는 예약 쌍 전부 추출
+"""
+
+import heapq
+
+import numpy as np
+import pandas as pd
+
+from resource_calendar import covers
+
+FREE_AT_START = np.iinfo(np.int64).min      # 하루 시작 시 자원 종료 시각 (pd.Timestamp.min 역할)
+NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def resource_lists_from_counts(resource_counts):
+    """{장비유형: 대수} → {장비유형: [RESOURCE_ID, ...]} (CT_01, CT_02, ...)"""
+    return {equip_type: [f'{equip_type}_{i:02d}' for i in range(1, count + 1)]
+            for equip_type, count in resource_counts.items()}
+
+
+def _datetime_ns(series):
+    return series.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def minutes_from_midnight(reservation, column):
+    """datetime 컬럼 → 예약일(RESERVATION_DATE) 00:00 기준 분 오프셋 배열 (캘린더 구간과 같은 단위)"""
+    midnight = _datetime_ns(pd.to_datetime(reservation['RESERVATION_DATE'].astype(object)))
+    return (_datetime_ns(reservation[column]) - midnight) // NS_PER_MINUTE
+
+
+def _assign_group_with_calendar(positions, starts, ends, start_minutes, end_minutes, availability):
+    """가용 구간 제약이 있는 그룹 배정 → [(행 위치, 자원 번호, 부족 여부), ...]
+
+    비어 있고 [시작, 종료)가 가용 구간 안인 자원 중 가장 먼저 빈 자원 (동률이면 앞 번호)
+    그런 자원이 없으면 가용 구간과 무관하게 가장 먼저 비는 자원 (부족)
+    """
+    free_at = [FREE_AT_START] * len(availability)
+    assigned = []
+    for pos in positions:
+        best = None
+        for i, intervals in enumerate(availability):
+            if free_at[i] <= starts[pos] and covers(intervals, start_minutes[pos], end_minutes[pos]):
+                if best is None or free_at[i] < free_at[best]:
+                    best = i
+        shortage = best is None
+        if shortage:
+            best = min(range(len(free_at)), key=lambda i: (free_at[i], i))
+        free_at[best] = ends[pos]
+        assigned.append((pos, best, shortage))
+    return assigned
+
+
+def assign_resources(reservation, resource_lists, calendar=None):
+    """예약별 RESOURCE_ID 배정 → (RESOURCE_ID 배열, 자원 부족 목록)
+
+    reservation: RESERVATION_DATETIME / END_DATETIME(datetime), RESERVATION_DATE, EQUIPMENT_TYPE 컬럼 필요
+    resource_lists: {장비유형: [RESOURCE_ID, ...]} (목록 순서 = 동률 시 우선순위)
+    calendar: ResourceCalendar (생략 시 가용시간 미적용)
+    자원 부족 목록: [(예약일, 장비유형, 시작 시각), ...] - 모든 자원이 사용 중(또는 가용 시간 밖)이라 겹치게 배정된 예약
+    목록에 없는 장비유형은 '' 로 남김
+    """
+    resource_ids = np.full(len(reservation), '', dtype=object)
+    shortages = []
+    if len(reservation) == 0:
+        return resource_ids, shortages
+
+    start_times = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]')
+    starts = start_times.view(np.int64)
+    ends = _datetime_ns(reservation['END_DATETIME'])
+    groups = reservation.groupby(['EQUIPMENT_TYPE', 'RESERVATION_DATE'], sort=True, observed=True).indices
+    if calendar is not None:
+        start_minutes = minutes_from_midnight(reservation, 'RESERVATION_DATETIME')
+        end_minutes = minutes_from_midnight(reservation, 'END_DATETIME')
+
+    for (equip_type, date), positions in groups.items():
+        resources = resource_lists.get(equip_type)
+        if not resources:
+            continue
+
+        # 기존 sort_values('RESERVATION_DATETIME')와 같은 정렬 (동시각 순서 포함)
+        positions = positions[np.argsort(start_times[positions], kind='quicksort')]
+
+        if calendar is not None:
+            # 그날 예약 전체 구간을 모든 자원이 수용하면 제약 없음 → 힙 배정
+            availability = [calendar.availability(rid, date) for rid in resources]
+            bounds = (int(start_minutes[positions].min()), int(end_minutes[positions].max()))
+            if not all(covers(intervals, *bounds) for intervals in availability):
+                for pos, i, shortage in _assign_group_with_calendar(positions, starts, ends, start_minutes,
+                                                                     end_minutes, availability):
+                    if shortage:
+                        shortages.append((date, equip_type, pd.Timestamp(start_times[pos])))
+                    resource_ids[pos] = resources[i]
+                continue
+
+        heap = [(FREE_AT_START, i) for i in range(len(resources))]
+        for pos in positions:
+            end, i = heap[0]
+            if end > starts[pos]:
+                shortages.append((date, equip_type, pd.Timestamp(start_times[pos])))
+            resource_ids[pos] = resources[i]
+            heapq.heapreplace(heap, (ends[pos], i))
+
+    return resource_ids, shortages
+
+
+def find_double_bookings(reservation):
+    """같은 자원에 시간이 겹치는 예약 쌍 전부 → DataFrame
+
+    (RESOURCE_ID, 시작 시각) 정렬 1회 후, 각 예약 i에 대해 같은 자원에서
+    i 이후에 시작해 i 종료 전에 시작하는 예약 j를 searchsorted로 한 번에 찾음
+    (인접 쌍만 보는 방식과 달리 긴 검사에 여러 건이 겹친 경우도 모두 포함)
+    RESOURCE_ID가 비어 있는 예약은 제외, POS_1/POS_2는 원본 행 위치
+    """
+    columns = ['RESOURCE_ID', 'RESERVATION_ID_1', 'EXAM_CD_1', 'START_1', 'END_1',
+               'RESERVATION_ID_2', 'EXAM_CD_2', 'START_2', 'END_2', 'OVERLAP_MIN', 'POS_1', 'POS_2']
+
+    codes, uniques = pd.factorize(reservation['RESOURCE_ID'])
+    valid = codes >= 0
+    if '' in set(uniques):
+        valid &= codes != list(uniques).index('')
+    positions = np.flatnonzero(valid)
+    if len(positions) < 2:
+        return pd.DataFrame(columns=columns)
+
+    codes = codes[positions].astype(np.int64)
+    starts = _datetime_ns(reservation['RESERVATION_DATETIME'])[positions] // 10**9     # 초 단위
+    ends = _datetime_ns(reservation['END_DATETIME'])[positions] // 10**9
+
+    # (자원 코드, 시작) 합성 키: 자원 간 구간이 섞이지 않도록 전체 시간 폭만큼 띄움
+    base = starts.min()
+    span = int(max(ends.max(), starts.max()) - base) + 1
+    start_keys = codes * span + (starts - base)
+    order = np.argsort(start_keys, kind='stable')
+    start_keys = start_keys[order]
+    end_keys = (codes * span + (ends - base))[order]
+
+    # i 뒤에서 start < end_i 인 마지막 위치 → 겹치는 j 범위 (i, hi)
+    hi = np.searchsorted(start_keys, end_keys, side='left')
+    counts = np.maximum(hi - np.arange(len(order)) - 1, 0)
+    n_pairs = int(counts.sum())
+    if n_pairs == 0:
+        return pd.DataFrame(columns=columns)
+
+    first = np.repeat(np.arange(len(order)), counts)
+    second = first + 1 + np.arange(n_pairs) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    pos_1 = positions[order[first]]
+    pos_2 = positions[order[second]]
+    rows_1 = reservation.iloc[pos_1]
+    rows_2 = reservation.iloc[pos_2]
+    end_1 = rows_1['END_DATETIME'].to_numpy()
+    start_2 = rows_2['RESERVATION_DATETIME'].to_numpy()
+    end_2 = rows_2['END_DATETIME'].to_numpy()
+    overlap = (np.minimum(end_1, end_2) - start_2) // np.timedelta64(1, 'm')
+
+    return pd.DataFrame({
+        'RESOURCE_ID': rows_1['RESOURCE_ID'].astype(object).to_numpy(),
+        'RESERVATION_ID_1': rows_1['RESERVATION_ID'].to_numpy(),
+        'EXAM_CD_1': rows_1['EXAM_CD'].astype(object).to_numpy(),
+        'START_1': rows_1['RESERVATION_DATETIME'].to_numpy(),
+        'END_1': end_1,
+        'RESERVATION_ID_2': rows_2['RESERVATION_ID'].to_numpy(),
+        'EXAM_CD_2': rows_2['EXAM_CD'].astype(object).to_numpy(),
+        'START_2': start_2,
+        'END_2': end_2,
+        'OVERLAP_MIN': overlap.astype(np.int64),
+        'POS_1': pos_1,
+        'POS_2': pos_2,
+    })
@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+"""
+자원 가용 캘린더 (구간 집합)
+- 가용 시간 = 하루 00:00 기준 분 구간 [(시작, 종료), ...] 정렬·비겹침 목록 (time_model과 같은 분 오프셋)
+  종료 ≤ 시작인 행은 다음날로 넘어가는 야간 구간 (21:00~06:00 → (1260, 1800))
+- RESOURCE_CALENDAR 행 종류 (TARGET: 비움 = 병원 전체, 장비유형, RESOURCE_ID)
+  WEEKLY: 요일별 기본 운영시간 (반복 템플릿)
+  HOURS:  특정 날짜 운영시간 (반일 근무 등, 그날 WEEKLY 대신 적용)
+  CLOSED: 특정 날짜 휴무
+  BLOCK:  특정 날짜 사용 불가 구간 (점검/고장) → 가용 시간에서 차감
+- 자원의 가용 시간: WEEKLY/HOURS는 가장 구체적인 TARGET(자원 → 장비유형 → 전체) 1개 적용,
+  CLOSED/BLOCK은 해당되는 TARGET 전부 적용
+- block()/close()는 예외 1건 추가 + 그 날짜 캐시만 무효화 (전체 데이터 재작성 없음)
+"""
+
+import os
+from bisect import bisect_right, insort
+from datetime import date as date_type
+
+import pandas as pd
+
+from data_loader import data_path, load_csv
+from time_model import MINUTES_PER_DAY, format_hhmm, parse_hhmm
+
+FACILITY = ''                   # 병원 전체 TARGET
+CALENDAR_PATH = data_path('RESOURCE_CALENDAR')
+
+CALENDAR_COLUMNS = ['CALENDAR_TYPE', 'TARGET', 'WEEKDAY', 'CALENDAR_DATE', 'START_TIME', 'END_TIME', 'NOTE']
+
+# 캘린더 파일에 병원 전체 WEEKLY 행이 없을 때의 기본 운영시간 (월=0 … 일=6)
+DEFAULT_WEEKLY = {
+    0: [('08:30', '17:30')],
+    1: [('08:30', '17:30')],
+    2: [('08:30', '17:30')],
+    3: [('08:30', '17:30')],
+    4: [('08:30', '17:30')],
+    5: [('08:30', '12:30')],
+    6: [],
+}
+
+
+# =============================================================================
+# 구간 집합 연산 (입력/출력 모두 정렬·비겹침 [(시작, 종료), ...])
+# =============================================================================
+
+def normalize_intervals(intervals):
+    """임의 구간 목록 → 정렬·병합된 구간 집합 (길이 0 이하 구간 제거)"""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(base, removed):
+    """base - removed"""
+    result = []
+    j = 0
+    for start, end in base:
+        while j < len(removed) and removed[j][1] <= start:
+            j += 1
+        k = j
+        while k < len(removed) and removed[k][0] < end:
+            if removed[k][0] > start:
+                result.append((start, removed[k][0]))
+            start = max(start, removed[k][1])
+            k += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def intersect_intervals(a, b):
+    """a ∩ b"""
+    result = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start < end:
+            result.append((start, end))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return result
+
+
+def covers(intervals, start, end):
+    """[start, end)가 구간 하나 안에 완전히 들어가는지 (이분 탐색)"""
+    i = bisect_right(intervals, (start, float('inf'))) - 1
+    return i >= 0 and intervals[i][1] >= end
+
+
+def free_windows(available, busy, min_length=1):
+    """가용 구간 - 사용 중 구간 중 길이 min_length 이상인 빈 구간"""
+    return [(s, e) for s, e in subtract_intervals(available, normalize_intervals(busy)) if e - s >= min_length]
+
+
+def total_minutes(intervals):
+    return sum(end - start for start, end in intervals)
+
+
+def time_range(start_text, end_text):
+    """'HH:MM', 'HH:MM' → (시작 분, 종료 분) (종료 ≤ 시작이면 다음날)"""
+    start = parse_hhmm(start_text)
+    end = parse_hhmm(end_text)
+    if end <= start:
+        end += MINUTES_PER_DAY
+    return start, end
+
+
+def date_key(date):
+    """date/datetime/Timestamp/문자열 → 'YYYY-MM-DD'"""
+    if hasattr(date, 'strftime'):
+        return date.strftime('%Y-%m-%d')
+    return str(date)[:10]
+
+
+# =============================================================================
+# 캘린더
+# =============================================================================
+
+class ResourceCalendar:
+    """자원별 · 날짜별 가용 구간 집합
+
+    resource_df: RESOURCE (RESOURCE_ID, EQUIPMENT_TYPE) - 자원 → 장비유형 TARGET 조회용
+    calendar_df: RESOURCE_CALENDAR (없으면 DEFAULT_WEEKLY만 적용)
+    """
+
+    def __init__(self, resource_df, calendar_df=None):
+        self.resource_type = dict(zip(resource_df['RESOURCE_ID'], resource_df['EQUIPMENT_TYPE']))
+        self.weekly = {}            # TARGET -> {요일: [구간]}
+        self.hours = {}             # (TARGET, 날짜) -> [구간]
+        self.closed = set()         # (TARGET, 날짜)
+        self.blocks = {}            # (TARGET, 날짜) -> [구간] (정렬·병합)
+        self._cache = {}            # 날짜 -> {RESOURCE_ID: [구간]}
+
+        if calendar_df is not None:
+            for row in calendar_df.itertuples(index=False):
+                self._add_row(row)
+        if FACILITY not in self.weekly:
+            for weekday, ranges in DEFAULT_WEEKLY.items():
+                for start_text, end_text in ranges:
+                    self.add_weekly(FACILITY, weekday, *time_range(start_text, end_text))
+                self.weekly.setdefault(FACILITY, {}).setdefault(weekday, [])
+
+    def _add_row(self, row):
+        target = '' if pd.isna(row.TARGET) else str(row.TARGET)
+        kind = row.CALENDAR_TYPE
+        if kind == 'WEEKLY':
+            self.add_weekly(target, int(row.WEEKDAY), *time_range(row.START_TIME, row.END_TIME))
+        elif kind == 'HOURS':
+            self.set_hours(row.CALENDAR_DATE, [time_range(row.START_TIME, row.END_TIME)], target, replace=False)
+        elif kind == 'CLOSED':
+            self.close(row.CALENDAR_DATE, target)
+        elif kind == 'BLOCK':
+            self.block(target, row.CALENDAR_DATE, *time_range(row.START_TIME, row.END_TIME))
+        else:
+            raise ValueError(f'알 수 없는 CALENDAR_TYPE: {kind}')
+
+    # 변경 (해당 날짜 캐시만 무효화)
+
+    def add_weekly(self, target, weekday, start_min, end_min):
+        days = self.weekly.setdefault(target, {})
+        days[weekday] = normalize_intervals(days.get(weekday, []) + [(start_min, end_min)])
+        self._cache.clear()
+
+    def set_hours(self, date, intervals, target=FACILITY, replace=True):
+        """특정 날짜 운영시간 지정 (replace=False면 기존 HOURS에 합침)"""
+        key = (target, date_key(date))
+        previous = [] if replace else self.hours.get(key, [])
+        self.hours[key] = normalize_intervals(previous + list(intervals))
+        self._cache.pop(key[1], None)
+
+    def close(self, date, target=FACILITY):
+        self.closed.add((target, date_key(date)))
+        self._cache.pop(date_key(date), None)
+
+    def block(self, target, date, start_min, end_min):
+        """사용 불가 구간 1개 추가 (예: CT_02 오전 점검)"""
+        key = (target, date_key(date))
+        intervals = self.blocks.setdefault(key, [])
+        insort(intervals, (start_min, end_min))
+        if len(intervals) > 1:
+            self.blocks[key] = normalize_intervals(intervals)
+        self._cache.pop(key[1], None)
+
+    # 조회
+
+    def _targets(self, resource_id):
+        """구체적인 것부터: RESOURCE_ID → 장비유형 → 전체"""
+        if resource_id == FACILITY:
+            return [FACILITY]
+        equip_type = self.resource_type.get(resource_id)
+        return [resource_id] + ([equip_type] if equip_type else []) + [FACILITY]
+
+    def _resolve(self, targets, day):
+        if any((target, day) in self.closed for target in targets):
+            return []
+
+        base = None
+        for target in targets:
+            if (target, day) in self.hours:
+                base = self.hours[(target, day)]
+                break
+        if base is None:
+            weekday = date_type.fromisoformat(day).weekday()
+            for target in targets:
+                if target in self.weekly:
+                    base = self.weekly[target].get(weekday, [])
+                    break
+
+        for target in targets:
+            removed = self.blocks.get((target, day))
+            if removed:
+                base = subtract_intervals(base, removed)
+        return base
+
+    def availability(self, resource_id, date):
+        """자원의 그날 가용 구간 집합"""
+        day = date_key(date)
+        cached = self._cache.setdefault(day, {})
+        intervals = cached.get(resource_id)
+        if intervals is None:
+            intervals = cached[resource_id] = self._resolve(self._targets(resource_id), day)
+        return intervals
+
+    def facility_hours(self, date):
+        """병원 전체 운영시간 (자원 지정 없는 WEEKLY/HOURS/CLOSED/BLOCK)"""
+        return self.availability(FACILITY, date)
+
+    def is_available(self, resource_id, date, start_min, end_min):
+        return covers(self.availability(resource_id, date), start_min, end_min)
+
+    def unavailable(self, resource_id, date, day_end=MINUTES_PER_DAY):
+        """00:00~day_end 중 사용 불가 구간 (점유 비트맵에 미리 채울 구간)"""
+        return subtract_intervals([(0, day_end)], self.availability(resource_id, date))
+
+    def day_unavailable(self, date, day_end=MINUTES_PER_DAY):
+        """{RESOURCE_ID: 사용 불가 구간} (종일 가용한 자원은 제외)"""
+        unavailable = {}
+        for resource_id in self.resource_type:
+            intervals = self.unavailable(resource_id, date, day_end)
+            if intervals:
+                unavailable[resource_id] = intervals
+        return unavailable
+
+
+def calendar_rows(kind, target, start_min, end_min, date='', weekday='', note=''):
+    """캘린더 행 1개 (파일 추가용 DataFrame)"""
+    return pd.DataFrame([{
+        'CALENDAR_TYPE': kind, 'TARGET': target, 'WEEKDAY': weekday, 'CALENDAR_DATE': date_key(date) if date else '',
+        'START_TIME': format_hhmm(start_min), 'END_TIME': format_hhmm(end_min), 'NOTE': note,
+    }], columns=CALENDAR_COLUMNS)
+
+
+def append_calendar_rows(path, rows):
+    """캘린더 CSV 끝에 행 추가 (기존 행은 다시 쓰지 않음)"""
+    if not hasattr(rows, 'to_csv'):
+        rows = pd.DataFrame(rows, columns=CALENDAR_COLUMNS)
+    exists = os.path.exists(path)
+    rows[CALENDAR_COLUMNS].to_csv(path, mode='a' if exists else 'w', header=not exists, index=False,
+                                  encoding='utf-8' if exists else 'utf-8-sig')
+
+
+def load_calendar(resource_df, path=CALENDAR_PATH):
+    """RESOURCE_CALENDAR.csv가 있으면 ResourceCalendar, 없으면 None (자원별 가용시간 미적용)"""
+    if not os.path.exists(path):
+        return None
+    return ResourceCalendar(resource_df, load_csv(path))
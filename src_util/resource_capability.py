@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+"""
+검사-자원 수행 가능 매트릭스 + 제약 배정
+- RESOURCE_CAPABILITY: 자원별 허용 방식 (ALL / TAG / EXAM)
+- 검사 태그는 EXAM_MASTER에서 도출 (3T, HC: 검사명 접두어 / CONTRAST, SEDATION: 여부 컬럼)
+- 자원이 검사를 수행 가능 = 같은 장비유형 이고 (ALL 이거나, 검사 코드가 허용되었거나, 검사 태그를 모두 보유)
+- 배정: (장비유형, 날짜)별 시작 순 탐욕 배정
+  빈 자원 중 (수행 가능 검사 수가 적은 자원 → 직전 예약이 먼저 끝난 자원 → 앞 번호) 선택
+  빈 자원이 없으면 증가 경로 보정: 겹치는 예약 1건을 다른 수행 가능 자원으로 옮기고 그 자리에 배치 (최대 REPAIR_DEPTH 단계)
+  보정은 겹치는 예약이 정확히 1건인 자원에서만 시도 (2건 이상이 막고 있으면 옮기지 않음 → 자원 부족)
+  그래도 자리가 없으면 자원 부족: RESOURCE_ID를 비워 두고 부족 목록에 보고 (겹치는 자원으로 표시하지 않음)
+- 모든 자원이 ALL이면 assign_resources(최소 힙)와 같은 결과
+- calendar(ResourceCalendar)를 주면 가용 구간 밖인 자원은 후보에서 제외
+"""
+
+from bisect import bisect_left, insort
+
+import numpy as np
+import pandas as pd
+
+from resource_assigner import FREE_AT_START, minutes_from_midnight
+from resource_calendar import covers
+
+# 검사 태그: 태그 -> (EXAM_MASTER 컬럼, 정규식)
+EXAM_TAG_RULES = {
+    '3T': ('EXAM_NM', r'^\(3T\)'),
+    'HC': ('EXAM_NM', r'^\(HC\)'),
+    'CONTRAST': ('CONTRAST_YN', r'^Y$'),
+    'SEDATION': ('SEDATION_YN', r'^Y$'),
+}
+
+REPAIR_DEPTH = 3
+
+
+def exam_required_tags(exam_master):
+    """EXAM_CD -> 필요한 태그 frozenset"""
+    tags = {exam_cd: set() for exam_cd in exam_master['EXAM_CD']}
+    for tag, (column, pattern) in EXAM_TAG_RULES.items():
+        matched = exam_master[column].fillna('').astype(str).str.contains(pattern, regex=True)
+        for exam_cd in exam_master.loc[matched, 'EXAM_CD']:
+            tags[exam_cd].add(tag)
+    return {exam_cd: frozenset(t) for exam_cd, t in tags.items()}
+
+
+class CapabilityMatrix:
+    """검사별 수행 가능 자원 목록
+
+    capability_df가 없으면 모든 자원을 ALL로 취급 (장비유형만 보는 기존 방식)
+    """
+
+    def __init__(self, resource_df, exam_master, capability_df=None):
+        self.resource_order = list(resource_df['RESOURCE_ID'])
+        self.resource_type = dict(zip(resource_df['RESOURCE_ID'], resource_df['EQUIPMENT_TYPE']))
+        self.resources_by_type = {}
+        for resource_id in self.resource_order:
+            self.resources_by_type.setdefault(self.resource_type[resource_id], []).append(resource_id)
+
+        allow_all = set(self.resource_order) if capability_df is None else set()
+        resource_tags = {resource_id: set() for resource_id in self.resource_order}
+        resource_exams = {resource_id: set() for resource_id in self.resource_order}
+        if capability_df is not None:
+            for row in capability_df.itertuples(index=False):
+                if row.RESOURCE_ID not in resource_tags:
+                    continue
+                if row.CAPABILITY_TYPE == 'ALL':
+                    allow_all.add(row.RESOURCE_ID)
+                elif row.CAPABILITY_TYPE == 'TAG':
+                    resource_tags[row.RESOURCE_ID].add(row.CAPABILITY_VALUE)
+                elif row.CAPABILITY_TYPE == 'EXAM':
+                    resource_exams[row.RESOURCE_ID].add(row.CAPABILITY_VALUE)
+                else:
+                    raise ValueError(f'알 수 없는 CAPABILITY_TYPE: {row.CAPABILITY_TYPE}')
+
+        required = exam_required_tags(exam_master)
+        self.allowed = {}       # EXAM_CD -> [RESOURCE_ID, ...] (자원 순서)
+        for exam_cd, equip_type in zip(exam_master['EXAM_CD'], exam_master['EQUIPMENT_TYPE']):
+            self.allowed[exam_cd] = [
+                resource_id for resource_id in self.resources_by_type.get(equip_type, [])
+                if resource_id in allow_all
+                or exam_cd in resource_exams[resource_id]
+                or required[exam_cd] <= resource_tags[resource_id]
+            ]
+
+        # 자원별 수행 가능 검사 수 (적을수록 먼저 사용 → 범용 자원을 남겨 둠)
+        self.versatility = {resource_id: 0 for resource_id in self.resource_order}
+        for resources in self.allowed.values():
+            for resource_id in resources:
+                self.versatility[resource_id] += 1
+
+    def resources_for(self, exam_cd, equip_type):
+        """검사 수행 가능 자원 (마스터에 없는 검사는 장비유형 전체)"""
+        allowed = self.allowed.get(exam_cd)
+        if allowed is None:
+            return self.resources_by_type.get(equip_type, [])
+        return allowed
+
+    def matrix(self):
+        """RESOURCE_ID × EXAM_CD 수행 가능 여부 DataFrame"""
+        matrix = pd.DataFrame(False, index=self.resource_order, columns=list(self.allowed))
+        for exam_cd, resources in self.allowed.items():
+            matrix.loc[resources, exam_cd] = True
+        matrix.index.name = 'RESOURCE_ID'
+        return matrix
+
+
+class _DaySchedule:
+    """(장비유형, 날짜) 1개의 자원별 타임라인 [(시작, 종료, 행 위치), ...] (자원마다 겹침 없음)"""
+
+    def __init__(self, resources, capability, available=None):
+        self.order = {resource_id: i for i, resource_id in enumerate(resources)}
+        self.available = available      # (RESOURCE_ID, 행 위치) -> 가용 구간 안 여부 (None이면 항상 가능)
+        self.versatility = capability.versatility
+        self.timelines = {resource_id: [] for resource_id in resources}
+        self.placed = {}            # 행 위치 -> RESOURCE_ID
+
+    def overlapping(self, resource_id, start, end):
+        """[start, end)와 겹치는 예약 목록"""
+        timeline = self.timelines[resource_id]
+        i = bisect_left(timeline, (end,)) - 1
+        found = []
+        while i >= 0 and timeline[i][1] > start:
+            found.append(timeline[i])
+            i -= 1
+        return found
+
+    def insert(self, resource_id, booking):
+        insort(self.timelines[resource_id], booking)
+        self.placed[booking[2]] = resource_id
+
+    def remove(self, resource_id, booking):
+        self.timelines[resource_id].remove(booking)
+        del self.placed[booking[2]]
+
+    def _choice_key(self, resource_id, end):
+        timeline = self.timelines[resource_id]
+        k = bisect_left(timeline, (end,))
+        prev_end = timeline[k - 1][1] if k else FREE_AT_START
+        return self.versatility.get(resource_id, 0), prev_end, self.order[resource_id]
+
+    def place(self, booking, candidates, allowed_of, depth, visited=frozenset()):
+        """빈 자원에 배치, 없으면 depth 단계까지 겹치는 예약을 옮겨 자리 확보 → 성공 여부
+
+        옮기는 예약은 자원마다 1건 (그 자원에서 [시작, 종료)와 겹치는 예약이 2건 이상이면 그 자원은 건너뜀)
+        """
+        start, end, _ = booking
+        candidates = [r for r in candidates if r in self.timelines and r not in visited
+                      and (self.available is None or self.available(r, booking[2]))]
+
+        free = [r for r in candidates if not self.overlapping(r, start, end)]
+        if free:
+            self.insert(min(free, key=lambda r: self._choice_key(r, end)), booking)
+            return True
+        if depth == 0:
+            return False
+
+        for resource_id in sorted(candidates, key=lambda r: (self.versatility.get(r, 0), self.order[r])):
+            blocking = self.overlapping(resource_id, start, end)
+            if len(blocking) != 1:
+                continue
+            moved = blocking[0]
+            self.remove(resource_id, moved)
+            self.insert(resource_id, booking)
+            if self.place(moved, allowed_of(moved[2]), allowed_of, depth - 1, visited | {resource_id}):
+                return True
+            self.remove(resource_id, booking)
+            self.insert(resource_id, moved)
+        return False
+
+
+def assign_with_capabilities(reservation, capability, repair_depth=REPAIR_DEPTH, calendar=None):
+    """수행 가능 자원 제약 배정 → (RESOURCE_ID 배열, 자원 부족 목록, 보정 배치 건수)
+
+    자원 부족 목록: [(예약일, 장비유형, 시작 시각, EXAM_CD), ...]
+    부족 예약은 RESOURCE_ID '' (미배정)로 남김 → 배정 결과에는 이중 배정이 생기지 않음
+    calendar: ResourceCalendar (생략 시 가용시간 미적용)
+    """
+    resource_ids = np.full(len(reservation), '', dtype=object)
+    shortages = []
+    repairs = 0
+    if len(reservation) == 0:
+        return resource_ids, shortages, repairs
+
+    start_times = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]')
+    starts = start_times.view(np.int64)
+    ends = reservation['END_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    exam_codes = reservation['EXAM_CD'].astype(object).to_numpy()
+    groups = reservation.groupby(['EQUIPMENT_TYPE', 'RESERVATION_DATE'], sort=True, observed=True).indices
+    if calendar is not None:
+        start_minutes = minutes_from_midnight(reservation, 'RESERVATION_DATETIME')
+        end_minutes = minutes_from_midnight(reservation, 'END_DATETIME')
+
+    for (equip_type, date), positions in groups.items():
+        resources = capability.resources_by_type.get(equip_type)
+        if not resources:
+            continue
+
+        positions = positions[np.argsort(start_times[positions], kind='quicksort')]
+
+        available = None
+        if calendar is not None:
+            availability = {rid: calendar.availability(rid, date) for rid in resources}
+
+            def available(resource_id, pos, availability=availability):
+                return covers(availability[resource_id], start_minutes[pos], end_minutes[pos])
+
+        day = _DaySchedule(resources, capability, available)
+
+        def allowed_of(pos):
+            return capability.resources_for(exam_codes[pos], equip_type)
+
+        for pos in positions:
+            booking = (starts[pos], ends[pos], pos)
+            allowed = allowed_of(pos)
+            if day.place(booking, allowed, allowed_of, 0):
+                continue
+            if day.place(booking, allowed, allowed_of, repair_depth):
+                repairs += 1
+                continue
+
+            shortages.append((date, equip_type, pd.Timestamp(start_times[pos]), exam_codes[pos]))
+
+        for pos, resource_id in day.placed.items():
+            resource_ids[pos] = resource_id
+
+    return resource_ids, shortages, repairs
+
+
+def capability_violations(reservation, capability):
+    """수행할 수 없는 자원에 배정된 예약 → DataFrame"""
+    exam_codes = reservation['EXAM_CD'].astype(object).to_numpy()
+    equip_types = reservation['EQUIPMENT_TYPE'].astype(object).to_numpy()
+    resource_ids = reservation['RESOURCE_ID'].astype(object).to_numpy()
+    bad = np.array([bool(r) and r not in capability.resources_for(e, t)
+                    for e, t, r in zip(exam_codes, equip_types, resource_ids)], dtype=bool)
+    return reservation[bad]
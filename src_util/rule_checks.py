@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+예약 규칙 검증 (벡터화)
+- 당일 시행 불가(SAME_DAY_CD=N): 규칙 검사만 남긴 예약을 (PATIENT_ID, RESERVATION_DATE)로 자기 조인,
+  검사 쌍을 (작은 코드, 큰 코드)로 정규화한 뒤 정규화된 규칙 쌍 테이블과 inner merge
+- 검사 간 간격(GAP/REV_GAP): 규칙을 방향별 최소 간격(분) 제약으로 한 번 변환
+  A → B 순서면 GAP, B → A 순서면 REV_GAP (같은 쌍에 규칙이 여러 개면 가장 긴 간격)
+  예약을 (시각, 행 위치) 순위로 정렬해 두고, 뒤 예약마다 "간격 안에 있는 앞 예약" 순위 구간을
+  searchsorted로 구해 위반 쌍 전체를 한 번에 펼침
+- 결과는 위반 쌍 DataFrame (건수 = 행 수, 기존 환자·날짜별 이중 루프와 같은 집계)
+"""
+
+import numpy as np
+import pandas as pd
+
+from rule_index import gap_to_minutes
+
+
+def normalized_pairs(exam_a, exam_b):
+    """검사 쌍 배열 → (작은 코드, 큰 코드) 배열 (순서 무관 비교용)"""
+    exam_a = np.asarray(exam_a, dtype=object)
+    exam_b = np.asarray(exam_b, dtype=object)
+    swap = exam_a > exam_b
+    return np.where(swap, exam_b, exam_a), np.where(swap, exam_a, exam_b)
+
+
+def same_day_rule_pairs(relation_rules):
+    """SAME_DAY_CD=N 규칙 → 정규화된 검사 쌍 DataFrame (PAIR_1, PAIR_2, RULE_ROW: 같은 쌍의 첫 규칙 행 위치)"""
+    rule_rows = np.flatnonzero((relation_rules['SAME_DAY_CD'] == 'N').to_numpy())
+    rules = relation_rules.iloc[rule_rows]
+    pair_1, pair_2 = normalized_pairs(rules['EXAM_A'], rules['EXAM_B'])
+    return (pd.DataFrame({'PAIR_1': pair_1, 'PAIR_2': pair_2, 'RULE_ROW': rule_rows})
+            .drop_duplicates(['PAIR_1', 'PAIR_2']).reset_index(drop=True))
+
+
+def same_day_pairs(reservation, exams):
+    """같은 환자 · 같은 날 예약 쌍 (행 위치 POS_1 < POS_2, 두 검사 모두 exams에 포함) → DataFrame"""
+    columns = ['PATIENT_ID', 'RESERVATION_DATE', 'EXAM_CD']
+    candidates = reservation[columns].astype({'EXAM_CD': object})
+    candidates = candidates.assign(POS=np.arange(len(reservation)))
+    candidates = candidates[candidates['EXAM_CD'].isin(exams)]
+
+    pairs = candidates.merge(candidates, on=['PATIENT_ID', 'RESERVATION_DATE'], suffixes=('_1', '_2'))
+    return pairs[pairs['POS_1'] < pairs['POS_2']]
+
+
+def same_day_violations(reservation, relation_rules, rule_pairs=None, pairs=None):
+    """당일 시행 불가 위반 쌍 → DataFrame
+
+    컬럼: PATIENT_ID, RESERVATION_DATE, EXAM_A, EXAM_B, POS_A, POS_B, RULE_ROW
+    EXAM_A/POS_A: 원본 행 순서상 앞 예약 (기존 보고서 출력 순서와 같게 환자 → 날짜 → 행 순 정렬)
+    rule_pairs(same_day_rule_pairs 결과)와 pairs(same_day_pairs 결과)는 미리 만든 것을 재사용 가능
+    (pairs는 rule_pairs의 검사를 모두 포함하는 exams로 만든 것이어야 함)
+    """
+    if rule_pairs is None:
+        rule_pairs = same_day_rule_pairs(relation_rules)
+    if pairs is None:
+        pairs = same_day_pairs(reservation, set(rule_pairs['PAIR_1']) | set(rule_pairs['PAIR_2']))
+
+    pair_1, pair_2 = normalized_pairs(pairs['EXAM_CD_1'], pairs['EXAM_CD_2'])
+    matched = pairs.assign(PAIR_1=pair_1, PAIR_2=pair_2).merge(rule_pairs, on=['PAIR_1', 'PAIR_2'])
+
+    return (matched.rename(columns={'EXAM_CD_1': 'EXAM_A', 'EXAM_CD_2': 'EXAM_B', 'POS_1': 'POS_A', 'POS_2': 'POS_B'})
+            .sort_values(['PATIENT_ID', 'RESERVATION_DATE', 'POS_A', 'POS_B'])
+            [['PATIENT_ID', 'RESERVATION_DATE', 'EXAM_A', 'EXAM_B', 'POS_A', 'POS_B', 'RULE_ROW']]
+            .reset_index(drop=True))
+
+
+def gap_constraints(relation_rules):
+    """GAP/REV_GAP 규칙 → 방향별 최소 간격 제약 DataFrame
+
+    컬럼: FIRST, SECOND, KIND('GAP'/'REV_GAP'), REQUIRED_MIN, GAP_VALUE, GAP_UNIT, RULE_EXAM_A, RULE_EXAM_B, RULE_ROW
+    FIRST 검사 뒤에 SECOND 검사가 오면 REQUIRED_MIN분 이상 떨어져야 함 (RULE_ROW: 규칙 행 위치)
+    """
+    rows = []
+    for rule_row, row in enumerate(relation_rules.itertuples(index=False)):
+        gap_min = gap_to_minutes(row.GAP_VALUE, row.GAP_UNIT)
+        if gap_min is not None:
+            rows.append((row.EXAM_A, row.EXAM_B, 'GAP', gap_min, int(row.GAP_VALUE), row.GAP_UNIT,
+                         row.EXAM_A, row.EXAM_B, rule_row))
+        rev_gap_min = gap_to_minutes(row.REV_GAP_VALUE, row.REV_GAP_UNIT)
+        if rev_gap_min is not None:
+            rows.append((row.EXAM_B, row.EXAM_A, 'REV_GAP', rev_gap_min, int(row.REV_GAP_VALUE), row.REV_GAP_UNIT,
+                         row.EXAM_A, row.EXAM_B, rule_row))
+
+    columns = ['FIRST', 'SECOND', 'KIND', 'REQUIRED_MIN', 'GAP_VALUE', 'GAP_UNIT', 'RULE_EXAM_A', 'RULE_EXAM_B', 'RULE_ROW']
+    constraints = pd.DataFrame(rows, columns=columns)
+
+    # 같은 방향 제약이 여러 개면 가장 긴 간격 1개 (GAP이 REV_GAP보다 우선)
+    constraints = constraints.sort_values(['FIRST', 'SECOND', 'REQUIRED_MIN', 'KIND'], ascending=[True, True, False, True])
+    return constraints.drop_duplicates(['FIRST', 'SECOND']).reset_index(drop=True)
+
+
+def gap_violations(reservation, relation_rules, constraints=None):
+    """검사 간 간격 위반 쌍 → DataFrame
+
+    같은 환자의 예약 쌍 (앞, 뒤) (시각 순, 같은 시각이면 행 순)에 대해
+    (앞 검사, 뒤 검사) 제약이 있고 뒤 시작 - 앞 시작 < REQUIRED_MIN 이면 위반
+    컬럼: PATIENT_ID, EXAM_FIRST, EXAM_SECOND, KIND, START_FIRST, START_SECOND, ACTUAL_GAP_MIN,
+          REQUIRED_MIN, GAP_VALUE, GAP_UNIT, RULE_EXAM_A, RULE_EXAM_B, RULE_ROW, POS_FIRST, POS_SECOND
+    constraints: 미리 변환한 gap_constraints() 결과 (반복 검증 시 재사용, 없으면 규칙에서 변환)
+    """
+    if constraints is None:
+        constraints = gap_constraints(relation_rules)
+    exams = set(constraints['FIRST']) | set(constraints['SECOND'])
+
+    exam_codes = reservation['EXAM_CD'].astype(object)
+    keep = np.flatnonzero(exam_codes.isin(exams).to_numpy())
+    times = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]').view(np.int64)[keep]
+    patient_codes, _ = pd.factorize(reservation['PATIENT_ID'].to_numpy()[keep])
+
+    # (시각, 행 위치) 순위: 앞/뒤 판정과 시간 창을 모두 순위 구간으로 표현
+    order = np.lexsort((keep, times))
+    rank = np.empty(len(keep), dtype=np.int64)
+    rank[order] = np.arange(len(keep))
+    sorted_times = times[order]
+    n = max(len(keep), 1)
+
+    rows = pd.DataFrame({'ROW': np.arange(len(keep)), 'EXAM_CD': exam_codes.to_numpy()[keep]})
+    constraint_ids = constraints.reset_index().rename(columns={'index': 'CID'})
+    first = rows.merge(constraint_ids[['CID', 'FIRST']], left_on='EXAM_CD', right_on='FIRST')
+    second = rows.merge(constraint_ids[['CID', 'SECOND', 'REQUIRED_MIN']], left_on='EXAM_CD', right_on='SECOND')
+
+    # 그룹 = (환자, 제약), 키 = 그룹 * n + 순위
+    n_constraints = max(len(constraints), 1)
+    first_rows = first['ROW'].to_numpy()
+    first_keys = (patient_codes[first_rows] * n_constraints + first['CID'].to_numpy()) * n + rank[first_rows]
+    first_order = np.argsort(first_keys, kind='stable')
+    first_keys = first_keys[first_order]
+    first_rows = first_rows[first_order]
+
+    second_rows = second['ROW'].to_numpy()
+    group_base = (patient_codes[second_rows] * n_constraints + second['CID'].to_numpy()) * n
+    window_ns = second['REQUIRED_MIN'].to_numpy(dtype=np.int64) * 60_000_000_000
+    # 앞 예약 시작 > 뒤 예약 시작 - 간격 인 첫 순위 ~ 뒤 예약 순위 직전
+    rank_lo = np.searchsorted(sorted_times, times[second_rows] - window_ns, side='right')
+    lo = np.searchsorted(first_keys, group_base + rank_lo, side='left')
+    hi = np.searchsorted(first_keys, group_base + rank[second_rows], side='left')
+    counts = np.maximum(hi - lo, 0)
+
+    pair_second = np.repeat(np.arange(len(second_rows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    row_first = first_rows[np.repeat(lo, counts) + offsets]
+    row_second = second_rows[pair_second]
+    cids = second['CID'].to_numpy()[pair_second]
+
+    matched = constraints.iloc[cids].reset_index(drop=True)
+    start_first = times[row_first].astype('datetime64[ns]')
+    start_second = times[row_second].astype('datetime64[ns]')
+    result = pd.DataFrame({
+        'PATIENT_ID': reservation['PATIENT_ID'].to_numpy()[keep[row_first]],
+        'EXAM_FIRST': matched['FIRST'].to_numpy(),
+        'EXAM_SECOND': matched['SECOND'].to_numpy(),
+        'KIND': matched['KIND'].to_numpy(),
+        'START_FIRST': start_first,
+        'START_SECOND': start_second,
+        'ACTUAL_GAP_MIN': (times[row_second] - times[row_first]) // 60_000_000_000,
+        'REQUIRED_MIN': matched['REQUIRED_MIN'].to_numpy(),
+        'GAP_VALUE': matched['GAP_VALUE'].to_numpy(),
+        'GAP_UNIT': matched['GAP_UNIT'].to_numpy(),
+        'RULE_EXAM_A': matched['RULE_EXAM_A'].to_numpy(),
+        'RULE_EXAM_B': matched['RULE_EXAM_B'].to_numpy(),
+        'RULE_ROW': matched['RULE_ROW'].to_numpy(),
+        'POS_FIRST': keep[row_first],
+        'POS_SECOND': keep[row_second],
+    })
+    return result.sort_values(['PATIENT_ID', 'START_FIRST', 'POS_FIRST', 'START_SECOND', 'POS_SECOND']).reset_index(drop=True)
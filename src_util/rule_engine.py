@@ -0,0 +1,493 @@
+# -*- coding: utf-8 -*-
+"""
+L1 필수 규칙 컴파일 + 일괄 검증
+- 입력: EXAM_MASTER, EXAM_RELATION_RULES, EXAM_CONDITION_RULES, code_definition.csv
+- compile_l1_rules(): 규칙 CSV를 한 번 읽어 벡터 조건식(행 단위)과 조인 계획(예약 쌍 단위)으로 변환
+  행 단위: 일요일, NOWEEKEND, TIMEONLY, 검사 운영시간(AVAIL_START/END_TIME), 나이(MIN/MAX_AGE), 소요시간
+  쌍 단위: (환자, 날짜) 자기 조인 1회 → 당일 불가(N) / 조건부(C) / 순서(SEQ_REQ_YN=Y)
+           (환자, 제약) 시간 창 조인 → 간격(GAP/REV_GAP), (자원) 구간 조인 → 자원 중복
+- CompiledRules.evaluate(): 예약 프레임의 파생 컬럼(요일, 시작/종료 분, 검사 속성)을 1회 계산 후
+  모든 조건식·조인 계획을 적용해 위반 테이블 1개 반환 (RULE_ID 포함)
+- 환자 정보(나이, 질환, 의료기기 등)가 필요한 규칙은 해당 컬럼이 프레임에 있을 때만 검사,
+  없으면 coverage()에 미검사 사유로 남김
+- 안내성 조치(GUARD, FASTING, CONSENT, PRETEST, STOPMED, ALLOWED)는 L1이 아니므로 컴파일 대상 아님
+"""
+
+import os
+import re
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from resource_assigner import NS_PER_MINUTE, find_double_bookings
+from resource_calendar import DEFAULT_WEEKLY, time_range
+from rule_checks import gap_constraints, gap_violations, same_day_pairs, same_day_rule_pairs, same_day_violations
+from time_model import MINUTES_PER_DAY
+
+CODE_DEFINITION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'code_definition.csv')
+
+# 검증에 항상 읽는 예약 컬럼 (규칙별 추가 컬럼은 RowRule.requires)
+INPUT_COLUMNS = ['RESERVATION_ID', 'PATIENT_ID', 'EXAM_CD', 'RESERVATION_DATE', 'RESERVATION_DATETIME', 'DURATION_MIN']
+
+# 위반 레코드: 규칙 키, 관련 예약 2건(두 번째는 쌍 규칙만), 간격 규칙의 필요/실제 간격(분)
+VIOLATION_COLUMNS = ['RULE_ID', 'RULE_TYPE', 'PATIENT_ID', 'RESERVATION_DATE', 'EXAM_CD', 'RESERVATION_ID', 'POS',
+                     'OTHER_EXAM_CD', 'OTHER_RESERVATION_ID', 'OTHER_POS', 'REQUIRED_MIN', 'ACTUAL_MIN', 'DETAIL']
+
+# 규칙 파일에 ID가 없는 규칙의 RULE_ID
+SYSTEM_RULES = {
+    'SYS_SUNDAY': ('SUNDAY', '일요일 예약 불가'),
+    'MST_AVAIL_TIME': ('AVAIL_TIME', '검사 운영시간(AVAIL_START/END_TIME) 내 배정'),
+    'MST_AGE': ('AGE_LIMIT', '검사 가능 나이(MIN_AGE/MAX_AGE)'),
+    'MST_DURATION': ('DURATION', '소요시간(DURATION_MIN) 만큼 슬롯 확보'),
+    'RES_OVERLAP': ('RESOURCE_OVERLAP', '동일 자원 동일 시간 중복 배정 불가'),
+}
+RELATION_RULE_PREFIX = 'REL'        # EXAM_RELATION_RULES 행 위치 → REL001, REL002, ...
+
+L1_ACTIONS = {'NOWEEKEND', 'TIMEONLY'}
+WEEKEND = frozenset({5, 6})
+WEEKDAY_CHARS = {'월': 0, '화': 1, '수': 2, '목': 3, '금': 4, '토': 5, '일': 6}
+NOON = 12 * 60
+
+# COND_TYPE → 예약 프레임의 환자 정보 컬럼 (없으면 해당 조건 규칙은 미검사)
+PATIENT_COLUMNS = {'AGE': 'PATIENT_AGE'}
+
+# 규칙 값 검사에 쓰는 코드 종류 (code_definition.csv의 CODE_TYPE)
+CHECKED_CODE_TYPES = {
+    'EXAM_RELATION_RULES': {'SAME_DAY_CD': 'SAME_DAY_CD', 'GAP_UNIT': 'GAP_UNIT', 'REV_GAP_UNIT': 'GAP_UNIT',
+                            'SEQ_REQ_YN': 'YN', 'REASON_CD': 'REASON_CD'},
+    'EXAM_CONDITION_RULES': {'COND_TYPE': 'COND_TYPE', 'COND_OP': 'COND_OP', 'ACTION_CD': 'ACTION_CD'},
+}
+
+AGE_OPS = {
+    '<': np.less, '<=': np.less_equal, '>': np.greater, '>=': np.greater_equal,
+    '=': np.equal, '!=': np.not_equal,
+}
+
+RowRule = namedtuple('RowRule', ['rule_id', 'rule_type', 'exams', 'requires', 'predicate', 'detail'])
+
+
+def load_code_definition(path=CODE_DEFINITION_PATH):
+    """code_definition.csv → {CODE_TYPE: {CODE_VALUE: CODE_NAME}} (파일이 없으면 빈 dict)"""
+    if not os.path.exists(path):
+        return {}
+    table = pd.read_csv(path, skiprows=1, encoding='utf-8-sig', dtype=str)
+    table = table.dropna(subset=['CODE_TYPE', 'CODE_VALUE'])
+    codes = {}
+    for row in table.itertuples(index=False):
+        codes.setdefault(row.CODE_TYPE, {})[row.CODE_VALUE] = row.CODE_NAME
+    return codes
+
+
+def unknown_codes(relation_rules, condition_rules, codes):
+    """코드 정의서에 없는 규칙 값 → [(테이블, 컬럼, 값), ...]"""
+    found = []
+    tables = {'EXAM_RELATION_RULES': relation_rules, 'EXAM_CONDITION_RULES': condition_rules}
+    for table_name, columns in CHECKED_CODE_TYPES.items():
+        table = tables[table_name]
+        for column, code_type in columns.items():
+            if column not in table.columns or code_type not in codes:
+                continue
+            for value in sorted(set(table[column].dropna().astype(str)) - set(codes[code_type])):
+                found.append((table_name, column, value))
+    return found
+
+
+def relation_rule_id(rule_row):
+    return f'{RELATION_RULE_PREFIX}{rule_row + 1:03d}'
+
+
+def parse_weekdays(text):
+    """'토/일', '토요일', '토/일오후' → (요일 집합, 오후만 여부)"""
+    text = str(text)
+    return frozenset(WEEKDAY_CHARS[c] for c in text.replace('요일', '') if c in WEEKDAY_CHARS), '오후' in text
+
+
+def time_only_window(action_val):
+    """TIMEONLY ACTION_VAL → (요일 집합 또는 None, 시작 하한 분, 시작 상한 분, 종료 상한 분) (해석 불가면 None)
+
+    'HH:MM~HH:MM': 그 사이에 시작, '오전...': 12:00 전 시작, '평일 근무시간내': 평일 운영시간 안
+    """
+    text = str(action_val).strip()
+    matched = re.fullmatch(r'(\d{1,2}:\d{2})\s*~\s*(\d{1,2}:\d{2})', text)
+    if matched:
+        start, end = time_range(matched.group(1), matched.group(2))
+        return None, start, end, None
+    if text.startswith('오전'):
+        return None, 0, NOON, None
+    if text == '평일 근무시간내':
+        start, end = time_range(*DEFAULT_WEEKLY[0][0])
+        return frozenset(range(5)), start, end, end
+    return None
+
+
+class _ReservationFrame:
+    """검증용 파생 컬럼 (한 번만 계산)"""
+
+    def __init__(self, reservation, exam_master):
+        self.reservation = reservation
+        self.exam = reservation['EXAM_CD'].astype(object).to_numpy()
+        self.patient = reservation['PATIENT_ID'].astype(object).to_numpy()
+        self.reservation_id = (reservation['RESERVATION_ID'].astype(object).to_numpy()
+                               if 'RESERVATION_ID' in reservation.columns else np.full(len(reservation), None))
+        dates = pd.to_datetime(reservation['RESERVATION_DATE'].astype(object))
+        self.date = dates.to_numpy(dtype='datetime64[ns]')
+        self.weekday = dates.dt.weekday.to_numpy()
+        starts = reservation['RESERVATION_DATETIME'].to_numpy(dtype='datetime64[ns]')
+        self.start_min = (starts.view(np.int64) - self.date.view(np.int64)) // NS_PER_MINUTE
+        self.duration = pd.to_numeric(reservation['DURATION_MIN'], errors='coerce').to_numpy(dtype=float)
+        self.end_min = self.start_min + np.nan_to_num(self.duration).astype(np.int64)
+
+        # 검사 속성: EXAM_MASTER 행 위치로 한 번 매핑
+        master_pos = pd.Index(exam_master['EXAM_CD']).get_indexer(self.exam)
+        self.known_exam = master_pos >= 0
+        self.master_pos = np.where(self.known_exam, master_pos, 0)
+
+    def columns(self):
+        return set(self.reservation.columns)
+
+    def master_values(self, values):
+        """EXAM_MASTER 컬럼 배열 → 예약 행별 값 (마스터에 없는 검사는 NaN)"""
+        values = np.asarray(values, dtype=float)
+        return np.where(self.known_exam, values[self.master_pos], np.nan)
+
+    def exam_in(self, exams):
+        return np.isin(self.exam, list(exams))
+
+
+class CompiledRules:
+    """컴파일된 L1 규칙 (행 조건식 + 조인 계획)"""
+
+    def __init__(self, exam_master, relation_rules, condition_rules, codes=None):
+        self.exam_master = exam_master.reset_index(drop=True)
+        self.relation_rules = relation_rules.reset_index(drop=True)
+        self.condition_rules = condition_rules.reset_index(drop=True)
+        self.codes = codes or {}
+        self.unknown_codes = unknown_codes(relation_rules, condition_rules, self.codes)
+        self.row_rules = []
+        self.skipped = []           # [(RULE_ID, 사유), ...] 컴파일 단계에서 검사 불가로 판정된 규칙
+        self.notices = []           # L1이 아닌 안내성 규칙 RULE_ID
+
+        self._compile_master()
+        self._compile_conditions(condition_rules)
+        self._compile_relations()
+
+    # -------------------------------------------------------------------------
+    # 컴파일
+    # -------------------------------------------------------------------------
+
+    def _compile_master(self):
+        master = self.exam_master
+        self.row_rules.append(RowRule('SYS_SUNDAY', 'SUNDAY', None, None,
+                                      lambda f: f.weekday == 6, lambda f, m: '일요일'))
+
+        # 검사 운영시간 (야간 검사는 종료 + 24시간, 예약이 다음날 새벽에 시작해도 같은 창으로 비교)
+        avail = master[master['AVAIL_START_TIME'].notna() & master['AVAIL_END_TIME'].notna()]
+        windows = [time_range(s, e) for s, e in zip(avail['AVAIL_START_TIME'], avail['AVAIL_END_TIME'])]
+        window_start = np.full(len(master), np.nan)
+        window_end = np.full(len(master), np.nan)
+        window_start[avail.index] = [w[0] for w in windows]
+        window_end[avail.index] = [w[1] for w in windows]
+
+        def outside_avail(f):
+            start = f.master_values(window_start)
+            end = f.master_values(window_end)
+            inside = ((f.start_min >= start) & (f.end_min <= end)) | \
+                     ((f.start_min + MINUTES_PER_DAY >= start) & (f.end_min + MINUTES_PER_DAY <= end))
+            return ~np.isnan(start) & ~inside
+
+        def avail_detail(f, mask):
+            codes = master['AVAIL_START_TIME'].to_numpy(dtype=object)
+            ends = master['AVAIL_END_TIME'].to_numpy(dtype=object)
+            pos = f.master_pos[mask]
+            return [f'운영:{s}~{e}, 예약:{_hhmm(a)}~{_hhmm(b)}'
+                    for s, e, a, b in zip(codes[pos], ends[pos], f.start_min[mask], f.end_min[mask])]
+
+        self.row_rules.append(RowRule('MST_AVAIL_TIME', 'AVAIL_TIME', set(avail['EXAM_CD']), None,
+                                      outside_avail, avail_detail))
+
+        # 나이 제한 (환자 나이 컬럼 필요)
+        min_age = pd.to_numeric(master['MIN_AGE'], errors='coerce').to_numpy(dtype=float)
+        max_age = pd.to_numeric(master['MAX_AGE'], errors='coerce').to_numpy(dtype=float)
+        age_exams = set(master.loc[~np.isnan(min_age) | ~np.isnan(max_age), 'EXAM_CD'])
+        age_column = PATIENT_COLUMNS['AGE']
+
+        def outside_age(f):
+            age = pd.to_numeric(f.reservation[age_column], errors='coerce').to_numpy(dtype=float)
+            low = f.master_values(min_age)
+            high = f.master_values(max_age)
+            return (~np.isnan(low) & (age < low)) | (~np.isnan(high) & (age > high))
+
+        self.row_rules.append(RowRule('MST_AGE', 'AGE_LIMIT', age_exams, age_column, outside_age,
+                                      lambda f, m: [f'나이:{a}' for a in f.reservation[age_column].to_numpy()[m]]))
+
+        # 소요시간: 예약 슬롯이 마스터 DURATION_MIN보다 짧으면 위반
+        duration = pd.to_numeric(master['DURATION_MIN'], errors='coerce').to_numpy(dtype=float)
+
+        def short_duration(f):
+            required = f.master_values(duration)
+            return ~np.isnan(required) & (f.duration < required)
+
+        self.row_rules.append(RowRule(
+            'MST_DURATION', 'DURATION', None, None, short_duration,
+            lambda f, m: [f'필요:{r:.0f}분, 예약:{d:.0f}분'
+                          for r, d in zip(f.master_values(duration)[m], f.duration[m])]))
+
+    def _compile_conditions(self, condition_rules):
+        keys = ['RULE_ID', 'COND_TYPE', 'COND_OP', 'COND_VAL', 'ACTION_CD', 'ACTION_VAL']
+        for key, rows in condition_rules.groupby(keys, sort=False, dropna=False):
+            rule = dict(zip(keys, key))
+            exams = set(rows['EXAM_CD'])
+            if rule['ACTION_CD'] not in L1_ACTIONS:
+                self.notices.append(rule['RULE_ID'])
+                continue
+
+            condition = self._condition(rule)
+            if isinstance(condition, str):
+                self.skipped.append((rule['RULE_ID'], condition))
+                continue
+            requires, applies = condition
+
+            if rule['ACTION_CD'] == 'NOWEEKEND':
+                weekdays = parse_weekdays(rule['COND_VAL'])[0] if rule['COND_TYPE'] == 'WEEKDAY' else WEEKEND
+
+                def predicate(f, applies=applies, weekdays=weekdays):
+                    return applies(f) & np.isin(f.weekday, list(weekdays))
+
+                self.row_rules.append(RowRule(rule['RULE_ID'], 'NOWEEKEND', exams, requires, predicate,
+                                              lambda f, m: [f'요일:{"월화수목금토일"[w]}' for w in f.weekday[m]]))
+                continue
+
+            window = time_only_window(rule['ACTION_VAL'])
+            if window is None:
+                self.skipped.append((rule['RULE_ID'], f"시간대 해석 불가: {rule['ACTION_VAL']}"))
+                continue
+            weekdays, start_low, start_high, end_high = window
+
+            def predicate(f, applies=applies, weekdays=weekdays, start_low=start_low, start_high=start_high,
+                          end_high=end_high):
+                allowed = (f.start_min >= start_low) & (f.start_min < start_high)
+                if weekdays is not None:
+                    allowed &= np.isin(f.weekday, list(weekdays))
+                if end_high is not None:
+                    allowed &= f.end_min <= end_high
+                return applies(f) & ~allowed
+
+            self.row_rules.append(RowRule(
+                rule['RULE_ID'], 'TIMEONLY', exams, requires, predicate,
+                lambda f, m, text=rule['ACTION_VAL']: [f'허용:{text}, 예약:{_hhmm(s)}' for s in f.start_min[m]]))
+
+    def _condition(self, rule):
+        """조건 → (필요 컬럼, 조건식) / 검사 불가면 사유 문자열"""
+        cond_type = rule['COND_TYPE']
+        if cond_type == 'WEEKDAY':
+            weekdays, afternoon = parse_weekdays(rule['COND_VAL'])
+            if not weekdays:
+                return f"요일 해석 불가: {rule['COND_VAL']}"
+            if rule['ACTION_CD'] == 'NOWEEKEND':
+                return None, lambda f: np.ones(len(f.exam), dtype=bool)
+
+            def applies(f):
+                mask = np.isin(f.weekday, list(weekdays))
+                return mask & (f.start_min >= NOON) if afternoon else mask
+            return None, applies
+
+        column = PATIENT_COLUMNS.get(cond_type)
+        if column is None:
+            return f'환자 정보 조건 ({cond_type}) - 예약 데이터에 없음'
+        if rule['COND_OP'] not in AGE_OPS:
+            return f"연산자 해석 불가: {rule['COND_OP']}"
+        op = AGE_OPS[rule['COND_OP']]
+        value = float(rule['COND_VAL'])
+
+        def applies(f):
+            return op(pd.to_numeric(f.reservation[column], errors='coerce').to_numpy(dtype=float), value)
+        return column, applies
+
+    def _compile_relations(self):
+        rules = self.relation_rules.assign(RULE_ID=[relation_rule_id(i) for i in range(len(self.relation_rules))])
+
+        # 당일 불가: 정규화 쌍 → 첫 규칙 행 (rule_checks.same_day_violations와 같은 테이블)
+        self.same_day_n = same_day_rule_pairs(self.relation_rules)
+
+        # 순서 필수 (같은 날): 뒤 검사 → 앞 검사 규칙이 있으면 위반
+        seq = rules[rules['SEQ_REQ_YN'] == 'Y']
+        self.sequence = seq[['EXAM_A', 'EXAM_B', 'RULE_ID']].drop_duplicates(['EXAM_A', 'EXAM_B'])
+
+        # 조건부(C): 순서 필수 규칙이 아니고 역방향 간격도 없으면 같은 날은 A → B 순서만 허용
+        conditional = rules[(rules['SAME_DAY_CD'] == 'C') & (rules['SEQ_REQ_YN'] != 'Y') & rules['REV_GAP_VALUE'].isna()]
+        self.conditional = conditional[['EXAM_A', 'EXAM_B', 'RULE_ID']].drop_duplicates(['EXAM_A', 'EXAM_B'])
+
+        self.same_day_exams = (set(self.same_day_n['PAIR_1']) | set(self.same_day_n['PAIR_2'])
+                               | set(self.sequence['EXAM_A']) | set(self.sequence['EXAM_B'])
+                               | set(self.conditional['EXAM_A']) | set(self.conditional['EXAM_B']))
+
+        # 간격: 방향별 제약은 한 번만 변환 (검증마다 재사용)
+        self.gap_constraints = gap_constraints(self.relation_rules)
+
+    # -------------------------------------------------------------------------
+    # 검증
+    # -------------------------------------------------------------------------
+
+    def coverage(self, reservation):
+        """규칙별 검사 여부 → DataFrame (RULE_ID, RULE_TYPE, STATUS, REASON, DESCRIPTION)"""
+        columns = set(reservation.columns)
+        rows = []
+        for rule in self.row_rules:
+            if rule.requires and rule.requires not in columns:
+                rows.append((rule.rule_id, rule.rule_type, 'SKIPPED', f'{rule.requires} 컬럼 없음'))
+            elif rule.exams is not None and not rule.exams:
+                rows.append((rule.rule_id, rule.rule_type, 'SKIPPED', '대상 검사 없음'))
+            else:
+                rows.append((rule.rule_id, rule.rule_type, 'CHECKED', ''))
+        for rule_type in ('SAME_DAY_NOT_ALLOWED', 'SAME_DAY_CONDITIONAL', 'SEQ_ORDER', 'GAP_INTERVAL'):
+            rows.append((RELATION_RULE_PREFIX, rule_type, 'CHECKED', ''))
+        has_resource = 'RESOURCE_ID' in columns and 'END_DATETIME' in columns
+        rows.append(('RES_OVERLAP', 'RESOURCE_OVERLAP', 'CHECKED' if has_resource else 'SKIPPED',
+                     '' if has_resource else 'RESOURCE_ID/END_DATETIME 컬럼 없음'))
+        rows += [(rule_id, 'CONDITION', 'SKIPPED', reason) for rule_id, reason in self.skipped]
+        rows += [(rule_id, 'NOTICE', 'NOT_L1', '안내성 조치') for rule_id in dict.fromkeys(self.notices)]
+
+        coverage = pd.DataFrame(rows, columns=['RULE_ID', 'RULE_TYPE', 'STATUS', 'REASON'])
+        action_names = self.codes.get('ACTION_CD', {})
+        coverage['DESCRIPTION'] = [SYSTEM_RULES[r][1] if r in SYSTEM_RULES else action_names.get(t, '')
+                                   for r, t in zip(coverage['RULE_ID'], coverage['RULE_TYPE'])]
+        return coverage
+
+    def input_columns(self):
+        """검증에 읽는 예약 컬럼 (병렬 검증 시 파티션에 실어 보낼 컬럼)"""
+        return INPUT_COLUMNS + sorted({rule.requires for rule in self.row_rules if rule.requires})
+
+    def evaluate(self, reservation):
+        """모든 L1 규칙 적용 → 위반 DataFrame (VIOLATION_COLUMNS)"""
+        parts = [part for _, _, part in self.evaluate_groups(reservation)]
+        if not parts:
+            return pd.DataFrame(columns=VIOLATION_COLUMNS)
+        return pd.concat(parts, ignore_index=True)[VIOLATION_COLUMNS]
+
+    def evaluate_groups(self, reservation, overlap=True):
+        """규칙 그룹별 위반 → [(그룹 번호, 병합 키, DataFrame), ...] (위반이 있는 그룹만, 그룹 번호 순)
+
+        병합 키: 행 규칙은 'POS' (행 순), 환자 단위 쌍 규칙은 'PATIENT_ID' (환자 순, 같은 환자 안은 그룹 내 순서)
+        → 환자별로 나눠 검증한 결과를 그룹 번호 · 병합 키로 안정 정렬하면 전체 검증 순서와 같음
+        overlap=False: 자원 겹침(환자를 가로지르는 규칙) 제외
+        """
+        frame = _ReservationFrame(reservation, self.exam_master)
+        columns = frame.columns()
+        groups = []
+
+        for group, rule in enumerate(self.row_rules):
+            if rule.requires and rule.requires not in columns:
+                continue
+            mask = rule.predicate(frame)
+            if rule.exams is not None:
+                mask &= frame.exam_in(rule.exams)
+            if mask.any():
+                groups.append((group, 'POS', self._row_violations(rule, frame, mask)))
+
+        group = len(self.row_rules)
+        pair_parts = self._same_day_violations(frame) + [self._gap_violations(reservation, frame)]
+        for offset, part in enumerate(pair_parts):
+            groups.append((group + offset, 'PATIENT_ID', part))
+        if overlap and 'RESOURCE_ID' in columns and 'END_DATETIME' in columns:
+            groups.append((self.overlap_group, 'POS', self._overlap_violations(reservation, frame)))
+        return [(group, key, part) for group, key, part in groups if len(part)]
+
+    @property
+    def overlap_group(self):
+        """자원 겹침 그룹 번호 (행 규칙 + 당일 3종 + 간격 다음)"""
+        return len(self.row_rules) + 4
+
+    def overlap_violations(self, reservation):
+        """자원 겹침 위반만 → DataFrame (VIOLATION_COLUMNS, 파생 컬럼은 겹친 행에만 계산)"""
+        overlaps = find_double_bookings(reservation)
+        pos = overlaps['POS_1'].to_numpy(dtype=np.int64)
+        other_pos = overlaps['POS_2'].to_numpy(dtype=np.int64)
+        involved = np.unique(np.concatenate([pos, other_pos]))
+        frame = _ReservationFrame(reservation.iloc[involved].reset_index(drop=True), self.exam_master)
+        violations = self._overlap_table(overlaps, frame, np.searchsorted(involved, pos),
+                                         np.searchsorted(involved, other_pos))
+        violations['POS'] = pos
+        violations['OTHER_POS'] = other_pos
+        return violations
+
+    def _row_violations(self, rule, frame, mask):
+        pos = np.flatnonzero(mask)
+        return pd.DataFrame({
+            'RULE_ID': rule.rule_id, 'RULE_TYPE': rule.rule_type,
+            'PATIENT_ID': frame.patient[pos], 'RESERVATION_DATE': frame.date[pos],
+            'EXAM_CD': frame.exam[pos], 'RESERVATION_ID': frame.reservation_id[pos], 'POS': pos,
+            'OTHER_EXAM_CD': None, 'OTHER_RESERVATION_ID': None, 'OTHER_POS': -1,
+            'REQUIRED_MIN': np.nan, 'ACTUAL_MIN': np.nan, 'DETAIL': rule.detail(frame, mask),
+        })
+
+    @staticmethod
+    def _pair_violations(rule_type, matched, frame, pos, other_pos, detail, required=np.nan, actual=np.nan):
+        return pd.DataFrame({
+            'RULE_ID': matched['RULE_ID'].to_numpy(), 'RULE_TYPE': rule_type,
+            'PATIENT_ID': frame.patient[pos], 'RESERVATION_DATE': frame.date[pos],
+            'EXAM_CD': frame.exam[pos], 'RESERVATION_ID': frame.reservation_id[pos], 'POS': pos,
+            'OTHER_EXAM_CD': frame.exam[other_pos], 'OTHER_RESERVATION_ID': frame.reservation_id[other_pos],
+            'OTHER_POS': other_pos, 'REQUIRED_MIN': required, 'ACTUAL_MIN': actual, 'DETAIL': detail,
+        })
+
+    def _same_day_violations(self, frame):
+        """(환자, 날짜) 자기 조인 1회로 당일 불가 / 조건부 / 순서 규칙 검사"""
+        pairs = same_day_pairs(frame.reservation, self.same_day_exams)
+        parts = []
+
+        matched = same_day_violations(frame.reservation, self.relation_rules, self.same_day_n, pairs)
+        matched = matched.sort_values(['PATIENT_ID', 'POS_A', 'POS_B'])
+        matched['RULE_ID'] = [relation_rule_id(r) for r in matched['RULE_ROW']]
+        parts.append(self._pair_violations('SAME_DAY_NOT_ALLOWED', matched, frame, matched['POS_A'].to_numpy(),
+                                           matched['POS_B'].to_numpy(), '당일 시행 불가'))
+
+        # 앞/뒤 예약: (시작 분, 행 위치) 순
+        start = frame.start_min
+        swap = start[pairs['POS_2'].to_numpy()] < start[pairs['POS_1'].to_numpy()]
+        ordered = pd.DataFrame({
+            'PATIENT_ID': pairs['PATIENT_ID'].to_numpy(),
+            'EARLY': np.where(swap, pairs['POS_2'], pairs['POS_1']),
+            'LATE': np.where(swap, pairs['POS_1'], pairs['POS_2']),
+        })
+        ordered['EXAM_EARLY'] = frame.exam[ordered['EARLY'].to_numpy()]
+        ordered['EXAM_LATE'] = frame.exam[ordered['LATE'].to_numpy()]
+
+        for rule_type, table, label in (('SEQ_ORDER', self.sequence, '먼저'),
+                                        ('SAME_DAY_CONDITIONAL', self.conditional, '먼저 (조건부 당일)')):
+            matched = ordered.merge(table, left_on=['EXAM_LATE', 'EXAM_EARLY'], right_on=['EXAM_A', 'EXAM_B'])
+            matched = matched.sort_values(['PATIENT_ID', 'EARLY', 'LATE'])
+            late = matched['LATE'].to_numpy()
+            parts.append(self._pair_violations(rule_type, matched, frame, matched['EARLY'].to_numpy(), late,
+                                               [f'규칙:{exam}가 {label}' for exam in frame.exam[late]]))
+        return parts
+
+    def _gap_violations(self, reservation, frame):
+        gap = gap_violations(reservation, self.relation_rules, self.gap_constraints)
+        pos = gap['POS_FIRST'].to_numpy()
+        detail = [f'필요:{v}{u}, 실제:{pd.Timedelta(minutes=int(m))}' + (' (역방향)' if k == 'REV_GAP' else '')
+                  for v, u, m, k in zip(gap['GAP_VALUE'], gap['GAP_UNIT'], gap['ACTUAL_GAP_MIN'], gap['KIND'])]
+        matched = pd.DataFrame({'RULE_ID': [relation_rule_id(r) for r in gap['RULE_ROW']]})
+        return self._pair_violations('GAP_INTERVAL', matched, frame, pos, gap['POS_SECOND'].to_numpy(), detail,
+                                     gap['REQUIRED_MIN'].to_numpy(dtype=float), gap['ACTUAL_GAP_MIN'].to_numpy(dtype=float))
+
+    def _overlap_violations(self, reservation, frame):
+        overlaps = find_double_bookings(reservation)
+        return self._overlap_table(overlaps, frame, overlaps['POS_1'].to_numpy(dtype=np.int64),
+                                   overlaps['POS_2'].to_numpy(dtype=np.int64))
+
+    def _overlap_table(self, overlaps, frame, pos, other_pos):
+        detail = [f'자원:{r}, 겹침:{m}분' for r, m in zip(overlaps['RESOURCE_ID'], overlaps['OVERLAP_MIN'])]
+        matched = pd.DataFrame({'RULE_ID': np.full(len(overlaps), 'RES_OVERLAP', dtype=object)})
+        return self._pair_violations('RESOURCE_OVERLAP', matched, frame, pos, other_pos, detail)
+
+
+def _hhmm(minutes):
+    return f'{int(minutes) // 60:02d}:{int(minutes) % 60:02d}'
+
+
+def compile_l1_rules(exam_master, relation_rules, condition_rules, codes=None):
+    """규칙 테이블 → CompiledRules (codes 생략 시 code_definition.csv 로드)"""
+    if codes is None:
+        codes = load_code_definition()
+    return CompiledRules(exam_master, relation_rules, condition_rules, codes)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+EXAM_RELATION_RULES 컴파일 인덱스
+- 당일 시행 불가(SAME_DAY_CD=N) 검사 쌍: 순서 무관 해시 집합
+- (EXAM_A, EXAM_B) → 순서/간격/역간격 규칙 레코드 딕셔너리
+- 규칙 테이블을 한 번만 읽어 두고 생성기/검증기/스케줄러에서 O(1)로 조회
+"""
+
+from collections import namedtuple
+
+import pandas as pd
+
+# 간격 단위 → 분 환산
+GAP_UNIT_MINUTES = {'D': 24 * 60, 'H': 60, 'M': 1}
+
+PairRule = namedtuple('PairRule', [
+    'exam_a', 'exam_b',
+    'seq_req',          # SEQ_REQ_YN == 'Y'
+    'same_day_cd',      # Y / N / C
+    'gap_value', 'gap_unit', 'gap_minutes',
+    'rev_gap_value', 'rev_gap_unit', 'rev_gap_minutes',
+    'reason_cd',
+])
+
+
+def gap_to_minutes(value, unit):
+    """GAP_VALUE/GAP_UNIT → 분 (값이 없거나 단위를 모르면 None)"""
+    if pd.isna(value) or unit not in GAP_UNIT_MINUTES:
+        return None
+    return int(value) * GAP_UNIT_MINUTES[unit]
+
+
+def pair_key(exam_a, exam_b):
+    """순서 무관 검사 쌍 키"""
+    return (exam_a, exam_b) if exam_a <= exam_b else (exam_b, exam_a)
+
+
+class RuleIndex:
+    """EXAM_RELATION_RULES 조회용 인덱스"""
+
+    def __init__(self, relation_rules):
+        self.same_day_pairs = set()
+        self.pair_rules = {}
+        self.rule_exams = set()
+
+        for row in relation_rules.itertuples(index=False):
+            gap_value = int(row.GAP_VALUE) if pd.notna(row.GAP_VALUE) else None
+            rev_gap_value = int(row.REV_GAP_VALUE) if pd.notna(row.REV_GAP_VALUE) else None
+            rule = PairRule(
+                exam_a=row.EXAM_A,
+                exam_b=row.EXAM_B,
+                seq_req=row.SEQ_REQ_YN == 'Y',
+                same_day_cd=row.SAME_DAY_CD,
+                gap_value=gap_value,
+                gap_unit=row.GAP_UNIT if gap_value is not None else None,
+                gap_minutes=gap_to_minutes(row.GAP_VALUE, row.GAP_UNIT),
+                rev_gap_value=rev_gap_value,
+                rev_gap_unit=row.REV_GAP_UNIT if rev_gap_value is not None else None,
+                rev_gap_minutes=gap_to_minutes(row.REV_GAP_VALUE, row.REV_GAP_UNIT),
+                reason_cd=row.REASON_CD if pd.notna(row.REASON_CD) else None,
+            )
+
+            # 같은 (A, B) 쌍에 규칙이 여러 개일 수 있음 (예: RC060003→NM020003 1D/3D)
+            self.pair_rules.setdefault((rule.exam_a, rule.exam_b), []).append(rule)
+            self.rule_exams.add(rule.exam_a)
+            self.rule_exams.add(rule.exam_b)
+
+            if rule.same_day_cd == 'N':
+                self.same_day_pairs.add(pair_key(rule.exam_a, rule.exam_b))
+
+        # 조회 결과는 변경 불가 튜플로 고정
+        self.pair_rules = {k: tuple(v) for k, v in self.pair_rules.items()}
+        self.gap_pairs = {k: tuple(r for r in v if r.gap_minutes is not None)
+                          for k, v in self.pair_rules.items()}
+        self.gap_pairs = {k: v for k, v in self.gap_pairs.items() if v}
+        self.seq_pairs = {k for k, v in self.pair_rules.items() if any(r.seq_req for r in v)}
+
+        gap_minutes = [r.gap_minutes for v in self.pair_rules.values() for r in v if r.gap_minutes]
+        gap_minutes += [r.rev_gap_minutes for v in self.pair_rules.values() for r in v if r.rev_gap_minutes]
+        self.max_gap_minutes = max(gap_minutes) if gap_minutes else 0
+
+    def is_same_day_forbidden(self, exam_a, exam_b):
+        """두 검사가 같은 날 시행 불가인지 (순서 무관)"""
+        return pair_key(exam_a, exam_b) in self.same_day_pairs
+
+    def get_rules(self, exam_a, exam_b):
+        """(EXAM_A, EXAM_B) 방향 규칙 레코드 목록"""
+        return self.pair_rules.get((exam_a, exam_b), ())
+
+    def get_gap_rules(self, exam_a, exam_b):
+        """(EXAM_A, EXAM_B) 방향 중 GAP_VALUE가 있는 규칙 레코드 목록"""
+        return self.gap_pairs.get((exam_a, exam_b), ())
+
+    def is_seq_required(self, exam_a, exam_b):
+        """EXAM_A → EXAM_B 순서가 필수인지"""
+        return (exam_a, exam_b) in self.seq_pairs
+
+
+def build_rule_index(relation_rules):
+    """DataFrame 또는 CSV 경로로부터 RuleIndex 생성"""
+    if isinstance(relation_rules, str):
+        relation_rules = pd.read_csv(relation_rules)
+    return RuleIndex(relation_rules)
@@ -8,19 +8,32 @@
 
 import pandas as pd
 from datetime import datetime, timedelta
+import os
 import sys
 
+from data_loader import (data_path, load_condition_rules, load_exam_master, load_relation_rules,
+                         load_reservation, load_resource, load_resource_capability)
+from incremental_assigner import PARTITION_DIR, IncrementalAssigner
+from free_interval_index import FreeIntervalIndex
+from resource_calendar import ResourceCalendar, load_calendar
+from resource_capability import CapabilityMatrix
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # 데이터 로드
-reservation = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESERVATION.csv')
-exam_master = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_MASTER.csv')
-resource = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESOURCE.csv')
-relation_rules = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_RELATION_RULES.csv')
-condition_rules = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_CONDITION_RULES.csv')
+reservation = load_reservation()
+exam_master = load_exam_master()
+resource = load_resource()
+relation_rules = load_relation_rules()
+condition_rules = load_condition_rules()
+
+# 자원 캘린더 (RESOURCE_CALENDAR.csv 없으면 기본 운영시간)
+calendar = load_calendar(resource) or ResourceCalendar(resource)
 
-reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
-reservation['END_DATETIME'] = reservation['RESERVATION_DATETIME'] + pd.to_timedelta(reservation['DURATION_MIN'], unit='m')
+# 검사-자원 수행 가능 매트릭스 (RESOURCE_CAPABILITY.csv 없으면 장비유형 단위)
+capability = None
+if os.path.exists(data_path('RESOURCE_CAPABILITY')):
+    capability = CapabilityMatrix(resource, exam_master, load_resource_capability())
 
 print('='*70)
 print('시나리오: 새 환자 검사 예약')
@@ -102,53 +115,9 @@ print('\n' + '='*70)
 print('3. 예약 가능 슬롯 탐색 (2026년 2월)')
 print('='*70)
 
-def find_available_slot(exam_cd, target_date, reservation_df, resource_df, exam_master_df):
-    """특정 검사의 가용 슬롯 찾기"""
-    exam_info = exam_master_df[exam_master_df['EXAM_CD'] == exam_cd].iloc[0]
-    equip_type = exam_info['EQUIPMENT_TYPE']
-    duration = int(exam_info['DURATION_MIN'])
-
-    # 해당 장비의 자원 목록
-    resources = resource_df[resource_df['EQUIPMENT_TYPE'] == equip_type]['RESOURCE_ID'].tolist()
-
-    # 해당 날짜의 예약 현황
-    day_reservations = reservation_df[
-        (reservation_df['RESERVATION_DATE'] == target_date) &
-        (reservation_df['EQUIPMENT_TYPE'] == equip_type)
-    ].copy()
-
-    # 운영 시간 (08:00~15:00)
-    start_hour = 8
-    end_hour = 15
-
-    available_slots = []
-
-    for resource_id in resources:
-        res_reservations = day_reservations[day_reservations['RESOURCE_ID'] == resource_id].sort_values('RESERVATION_DATETIME')
-
-        # 빈 슬롯 찾기
-        current_time = datetime.strptime(f'{target_date} {start_hour:02d}:00', '%Y-%m-%d %H:%M')
-        end_time = datetime.strptime(f'{target_date} {end_hour:02d}:00', '%Y-%m-%d %H:%M')
-
-        for _, res in res_reservations.iterrows():
-            res_start = res['RESERVATION_DATETIME']
-            if current_time + timedelta(minutes=duration) <= res_start:
-                available_slots.append({
-                    'resource_id': resource_id,
-                    'start_time': current_time,
-                    'end_time': current_time + timedelta(minutes=duration)
-                })
-            current_time = max(current_time, res['END_DATETIME'])
-
-        # 마지막 예약 이후 슬롯
-        if current_time + timedelta(minutes=duration) <= end_time:
-            available_slots.append({
-                'resource_id': resource_id,
-                'start_time': current_time,
-                'end_time': current_time + timedelta(minutes=duration)
-            })
-
-    return available_slots
+# 자원 · 날짜별 빈 구간 인덱스 (기존 예약으로 1회 구축, 슬롯 확정 시 book()으로 갱신)
+slot_index = FreeIntervalIndex(calendar, reservation)
+resource_lists = resource.groupby('EQUIPMENT_TYPE', sort=True)['RESOURCE_ID'].apply(list).to_dict()
 
 # 2월 평일 목록
 feb_dates = []
@@ -166,23 +135,32 @@ for order in orders:
     exam_cd = order['exam_cd']
     exam_nm = order['exam_nm']
     exam_info = exam_master[exam_master['EXAM_CD'] == exam_cd].iloc[0]
+    duration = int(exam_info['DURATION_MIN'])
 
-    for target_date in feb_dates:
-        slots = find_available_slot(exam_cd, target_date, reservation, resource, exam_master)
-        if slots:
-            slot = slots[0]  # 첫 번째 가용 슬롯
-            proposed_schedule.append({
-                'exam_cd': exam_cd,
-                'exam_nm': exam_nm,
-                'date': target_date,
-                'start_time': slot['start_time'],
-                'end_time': slot['end_time'],
-                'resource_id': slot['resource_id'],
-                'equipment_type': exam_info['EQUIPMENT_TYPE'],
-                'duration': exam_info['DURATION_MIN']
-            })
-            print(f"  {exam_cd}: {target_date} {slot['start_time'].strftime('%H:%M')}~{slot['end_time'].strftime('%H:%M')} ({slot['resource_id']})")
-            break
+    # 검사를 수행할 수 있는 자원에서만 탐색 (배정 단계와 같은 후보)
+    if capability is not None:
+        candidates = capability.resources_for(exam_cd, exam_info['EQUIPMENT_TYPE'])
+    else:
+        candidates = resource_lists.get(exam_info['EQUIPMENT_TYPE'], [])
+    slot = slot_index.earliest_fit(candidates, feb_dates, duration)
+    if slot is None:
+        continue
+    target_date, resource_id, start_min, end_min = slot
+    slot_index.book(resource_id, target_date, start_min, end_min)
+
+    start_time = pd.Timestamp(target_date) + timedelta(minutes=start_min)
+    end_time = start_time + timedelta(minutes=duration)
+    proposed_schedule.append({
+        'exam_cd': exam_cd,
+        'exam_nm': exam_nm,
+        'date': target_date,
+        'start_time': start_time,
+        'end_time': end_time,
+        'resource_id': resource_id,
+        'equipment_type': exam_info['EQUIPMENT_TYPE'],
+        'duration': exam_info['DURATION_MIN']
+    })
+    print(f"  {exam_cd}: {target_date} {start_time.strftime('%H:%M')}~{end_time.strftime('%H:%M')} ({resource_id})")
 
 # =============================================================================
 # 4. 규칙 기반 스케줄 조정
@@ -312,6 +290,33 @@ for sched in final_schedule:
     else:
         print(f"  ✓ {sched['EXAM_CD']}: {target_date} {sched['RESERVATION_TIME']} ({resource_id}) - 충돌 없음")
 
+# =============================================================================
+# 7. 증분 자원 배정 (변경된 날짜 파티션만 저장)
+# =============================================================================
+print('\n' + '='*70)
+print('7. 증분 자원 배정')
+print('='*70)
+
+if os.path.isdir(PARTITION_DIR):
+    assigner = IncrementalAssigner(resource_lists, PARTITION_DIR, calendar, capability)
+else:
+    print(f'날짜 파티션 없음 → 전체 예약으로 초기 구축: {PARTITION_DIR}')
+    assigner = IncrementalAssigner.from_reservation(reservation, resource_lists, PARTITION_DIR, calendar,
+                                                    capability)
+
+# 제안 자원(RESOURCE_ID)은 무시하고 그날 타임라인 기준으로 다시 배정
+placed, shortages = assigner.upsert(final_schedule)
+for row in placed.itertuples(index=False):
+    print(f"  {row.EXAM_CD}: {row.RESERVATION_DATE} {row.RESERVATION_TIME} → {row.RESOURCE_ID or '배정 불가'}")
+if len(placed) == 0:
+    print('  변경 없음 (이미 배정된 예약)')
+if shortages:
+    print(f'  자원 부족: {len(shortages)}건')
+
+for path in assigner.flush():
+    print(f'  저장: {os.path.basename(path)}')
+print('  (최신 배정은 날짜 파티션 기준, RESERVATION.csv 반영은 IncrementalAssigner.export())')
+
 print('\n' + '='*70)
 print('시나리오 완료')
 print('='*70)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+대용량 예약 파일 스트리밍 검증 (메모리 상한)
+- 날짜순 RESERVATION CSV를 청크 단위로 읽으며 검증 (파일 전체를 메모리에 올리지 않음)
+- 청크마다 [넘겨받은 예약 + 새 청크]에 compile_l1_rules().evaluate() 적용,
+  새 청크 행이 포함된 위반만 보고 (넘겨받은 예약끼리의 위반은 앞 청크에서 이미 보고됨)
+- 넘겨받는 예약(상태): 앞으로 읽을 예약과 같은 규칙 범위에 들 수 있는 행만 유지
+  모든 행: 마지막 날짜 0시 - MIN_HORIZON_MIN 이후 시작 (당일/순서/조건부, 자원 겹침)
+  간격 규칙 검사 행: 마지막 날짜 0시 - 최대 간격 이후 시작
+  → 범위를 벗어난 환자 예약은 청크마다 제거, 상태 크기는 파일 길이가 아니라 기간당 예약 밀도에 비례
+- POS/OTHER_POS는 파일 전체 행 번호 (메모리 적재 후 evaluate()와 같은 위반 집합)
+- 예약일이 거꾸로 가는 행이 있으면 ValueError (정렬되지 않은 파일은 메모리 적재 검증 사용)
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CHUNK_ROWS, iter_reservation_chunks
+from incremental_verifier import MIN_HORIZON_MIN
+from violation_writer import ViolationWriter
+
+
+def peak_rss_mb():
+    """현재 프로세스 최대 RSS (MB, 측정 불가면 None)
+
+    Linux는 /proc VmHWM (ru_maxrss는 fork 후 exec한 자식에 부모 최대값이 남음), 그 외 resource, Windows는 None
+    """
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+
+
+class StreamingVerifier:
+    """청크 단위 검증 + 규칙 범위 안의 예약만 넘겨받는 상태"""
+
+    def __init__(self, rules):
+        self.rules = rules
+        gap = rules.gap_constraints
+        self.gap_exams = set(gap['FIRST']) | set(gap['SECOND'])
+        max_gap = gap['REQUIRED_MIN'].max()
+        self.day_horizon = pd.Timedelta(minutes=MIN_HORIZON_MIN)
+        self.gap_horizon = pd.Timedelta(minutes=max(max_gap if pd.notna(max_gap) else 0, MIN_HORIZON_MIN))
+
+        self.carry = None               # 넘겨받은 예약 DataFrame
+        self.carry_rows = np.empty(0, dtype=np.int64)   # 넘겨받은 예약의 파일 행 번호
+        self.rows_read = 0
+        self.last_date = None
+        self.max_carry = 0              # 상태 최대 행 수
+
+    def feed(self, chunk):
+        """청크 검증 → 새 청크 행이 포함된 위반 DataFrame (POS/OTHER_POS는 파일 행 번호)"""
+        chunk = chunk.reset_index(drop=True)
+        dates = pd.to_datetime(chunk['RESERVATION_DATE'].astype(object))
+        if not dates.is_monotonic_increasing or (self.last_date is not None and dates.iloc[0] < self.last_date):
+            raise ValueError(f'예약일 순으로 정렬되지 않은 파일 (행 {self.rows_read} 부근)')
+
+        rows = np.arange(self.rows_read, self.rows_read + len(chunk))
+        n_carry = 0 if self.carry is None else len(self.carry)
+        context = pd.concat([self.carry, chunk], ignore_index=True) if n_carry else chunk
+        context_rows = np.concatenate([self.carry_rows, rows])
+
+        violations = self.rules.evaluate(context)
+        pos = violations['POS'].to_numpy(dtype=np.int64)
+        other = violations['OTHER_POS'].to_numpy(dtype=np.int64)
+        involved = (pos >= n_carry) | (other >= n_carry)
+        violations = violations[involved].reset_index(drop=True)
+        violations['POS'] = context_rows[pos[involved]]
+        violations['OTHER_POS'] = np.where(other[involved] < 0, -1, context_rows[np.maximum(other[involved], 0)])
+
+        # 상태 갱신: 앞으로 읽을 예약은 last_date 0시 이후 시작
+        self.rows_read += len(chunk)
+        self.last_date = dates.iloc[-1]
+        starts = context['RESERVATION_DATETIME']
+        keep = ((starts >= self.last_date - self.day_horizon)
+                | (context['EXAM_CD'].astype(object).isin(self.gap_exams)
+                   & (starts >= self.last_date - self.gap_horizon))).to_numpy()
+        self.carry = context[keep].reset_index(drop=True)
+        self.carry_rows = context_rows[keep]
+        self.max_carry = max(self.max_carry, len(self.carry))
+        return violations
+
+
+def iter_violations(rules, path=None, chunk_rows=CHUNK_ROWS, verifier=None):
+    """파일을 청크로 읽으며 청크별 위반 DataFrame 반환 (verifier를 넘기면 진행 상태 확인 가능)"""
+    verifier = verifier or StreamingVerifier(rules)
+    for chunk in iter_reservation_chunks(path, chunk_rows):
+        yield verifier.feed(chunk)
+
+
+def stream_report(rules, path=None, chunk_rows=CHUNK_ROWS, output=None):
+    """스트리밍 검증 보고서 출력 → {RULE_TYPE: 건수}
+
+    output: 위반 레코드 저장 경로 (.jsonl/.parquet, 청크마다 바로 기록), 건수는 같은 레코드에서 집계
+    """
+    verifier = StreamingVerifier(rules)
+    t0 = time.perf_counter()
+    with ViolationWriter(output) as writer:
+        for violations in iter_violations(rules, path, chunk_rows, verifier):
+            writer.write(violations)
+    counts = writer.counts
+    elapsed = time.perf_counter() - t0
+
+    print(f'\n### 스트리밍 검증 ({chunk_rows:,}행 청크) ###')
+    for rule_type in sorted(counts):
+        print(f'  {rule_type:<24} {counts[rule_type]:>10,}건')
+    print(f'총 위반: {sum(counts.values()):,}건')
+    print(f'처리: {verifier.rows_read:,}행, {elapsed:.1f}초, {verifier.rows_read / max(elapsed, 1e-9):,.0f}행/초')
+    print(f'상태 최대: {verifier.max_carry:,}행')
+    rss = peak_rss_mb()
+    print(f"최대 RSS: {f'{rss:,.0f}MB' if rss is not None else '측정 불가'}")
+    if output:
+        print(f'위반 레코드 저장: {output} ({writer.records:,}건)')
+    return counts
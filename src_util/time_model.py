@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+분 단위 정수 시간 모델
+- 시각은 해당 일 00:00 기준 분 오프셋(int)으로 표현 (08:30 → 510)
+- 'HH:MM' 파싱은 마스터 로드 시 1회만 수행
+- RESERVATION_TIME / RESERVATION_DATETIME 문자열은 출력 직전 벡터 연산으로 일괄 생성
+"""
+
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+
+# 분 오프셋 → 'HH:MM' 조회표
+HHMM_TABLE = np.array([f'{m // 60:02d}:{m % 60:02d}' for m in range(MINUTES_PER_DAY)], dtype=object)
+
+
+def parse_hhmm(text):
+    """'HH:MM' → 분 오프셋 (값이 없으면 None)"""
+    if text is None or pd.isna(text):
+        return None
+    hour, minute = str(text).strip().split(':')
+    return int(hour) * 60 + int(minute)
+
+
+def format_hhmm(minutes):
+    """분 오프셋 → 'HH:MM' (24시 이후는 다음날 시각)"""
+    return HHMM_TABLE[minutes % MINUTES_PER_DAY]
+
+
+def format_reservation_times(dates, start_minutes):
+    """날짜('YYYY-MM-DD')와 분 오프셋 → (RESERVATION_TIME, RESERVATION_DATETIME) 배열
+
+    야간 검사처럼 오프셋이 24시를 넘으면 DATETIME의 날짜도 다음날로 넘어감
+    """
+    start_minutes = np.asarray(start_minutes, dtype=np.int64)
+    dates = np.asarray(dates, dtype=object)
+
+    times = HHMM_TABLE[start_minutes % MINUTES_PER_DAY]
+
+    day_offsets = start_minutes // MINUTES_PER_DAY
+    if day_offsets.any():
+        rolled = day_offsets != 0
+        dates = dates.copy()
+        dates[rolled] = (pd.to_datetime(dates[rolled])
+                         + pd.to_timedelta(day_offsets[rolled], unit='D')).strftime('%Y-%m-%d')
+
+    datetimes = dates + ' ' + times
+    return times, datetimes
@@ -1,39 +1,99 @@
 # -*- coding: utf-8 -*-
 """
 생성된 RESERVATION 데이터의 규칙 준수 여부 검증
+- 기본: 전체 예약 검증 보고서
+- --delta <새 예약 CSV>: 기존 예약 인덱스 기준으로 새 예약 묶음만 검증 (incremental_verifier.py)
+- --workers N: 환자 분할 병렬 검증 (parallel_verifier.py, 보고서 출력은 직렬과 같음)
+- --stream [CSV]: 날짜순 파일을 청크로 읽으며 검증 (streaming_verifier.py, 위반 유형별 건수 · 행/초 · 최대 RSS)
+- --output <JSONL|Parquet>: 모든 위반을 레코드로 저장 (violation_writer.py, 요약 건수도 같은 레코드에서 집계)
 """
 
 import pandas as pd
-from datetime import datetime, timedelta
 import sys
 
+from data_loader import load_condition_rules, load_exam_master, load_relation_rules, load_reservation
+from incremental_verifier import VerificationIndex
+from parallel_verifier import evaluate_parallel
+from streaming_verifier import stream_report
+from rule_engine import compile_l1_rules
+from violation_writer import ViolationWriter
+
 sys.stdout.reconfigure(encoding='utf-8')
 
 # 데이터 로드
-reservation = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\RESERVATION.csv')
-relation_rules = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_RELATION_RULES.csv')
-condition_rules = pd.read_csv(r'c:\Users\user\Desktop\검사규칙 합성데이터\data\EXAM_CONDITION_RULES.csv')
-
-# 날짜/시간 변환
+relation_rules = load_relation_rules()
+condition_rules = load_condition_rules()
+exam_master = load_exam_master()
+output_path = sys.argv[sys.argv.index('--output') + 1] if '--output' in sys.argv else None
+
+# 스트리밍 모드: 예약 파일 전체를 올리지 않고 청크 단위 검증
+if '--stream' in sys.argv:
+    stream_args = sys.argv[sys.argv.index('--stream') + 1:]
+    stream_path = stream_args[0] if stream_args and not stream_args[0].startswith('--') else None
+    print('='*60)
+    print(f"규칙 위반 스트리밍 검사: {stream_path or 'RESERVATION.csv'}")
+    print('='*60)
+    stream_report(compile_l1_rules(exam_master, relation_rules, condition_rules), stream_path, output=output_path)
+    sys.exit(0)
+
+reservation = load_reservation()
+
+# 날짜 변환 (RESERVATION_DATETIME은 로더에서 변환됨, 요일·시각 파생은 rule_engine에서 1회)
 reservation['RESERVATION_DATE'] = pd.to_datetime(reservation['RESERVATION_DATE'])
-reservation['RESERVATION_DATETIME'] = pd.to_datetime(reservation['RESERVATION_DATETIME'])
-reservation['WEEKDAY'] = reservation['RESERVATION_DATE'].dt.day_name()
 
 print('='*60)
 print('규칙 위반 검사 보고서')
 print('='*60)
 print(f'총 예약 건수: {len(reservation)}건')
 
+# L1 규칙 컴파일 후 1회 검증 (rule_engine.py) - 아래 항목은 위반 테이블을 RULE_TYPE별로 나눠 출력
+rules = compile_l1_rules(exam_master, relation_rules, condition_rules)
+
+# 새 예약 묶음 검증 모드: 전체 보고서 대신 새 예약이 포함된 위반만 출력
+if '--delta' in sys.argv:
+    delta_path = sys.argv[sys.argv.index('--delta') + 1]
+    delta = load_reservation(delta_path, use_cache=False)
+    delta['RESERVATION_DATE'] = pd.to_datetime(delta['RESERVATION_DATE'])
+
+    index = VerificationIndex(rules, reservation)
+    found = index.check(delta)
+    with ViolationWriter(output_path) as writer:
+        writer.write(found)
+    print(f'\n### 새 예약 검증: {delta_path} ({len(delta)}건) ###')
+    for row in found.itertuples(index=False):
+        other = f", 상대:{row.OTHER_EXAM_CD}({row.OTHER_SOURCE} {row.OTHER_POS})" if row.OTHER_POS >= 0 else ''
+        print(f"  [{row.RULE_ID}] {row.RULE_TYPE} 환자:{row.PATIENT_ID}, {row.EXAM_CD}({row.SOURCE} {row.POS}){other}, {row.DETAIL}")
+    print(f'\n위반: {len(found)}건' if len(found) else '\n✓ 위반 없음 - 예약 가능')
+    sys.exit(1 if len(found) else 0)
+
+n_workers = int(sys.argv[sys.argv.index('--workers') + 1]) if '--workers' in sys.argv else 1
+l1 = evaluate_parallel(rules, reservation, n_workers) if n_workers > 1 else rules.evaluate(reservation)
+coverage = rules.coverage(reservation)
+
+# 위반 레코드 저장 (--output 없으면 집계만) - 요약 건수는 저장한 레코드에서 집계
+with ViolationWriter(output_path) as writer:
+    writer.write(l1)
+
 violations = []
+summary = []
+
+
+def report(rule_type, label):
+    """RULE_TYPE 위반 행 → 요약 목록에 추가 (건수는 레코드 집계 값)"""
+    found = l1[l1['RULE_TYPE'] == rule_type]
+    count = writer.counts.get(rule_type, 0)
+    summary.append((label, count))
+    if count > 0:
+        violations.append({'type': rule_type, 'count': count})
+    return found
+
 
 # =============================================================================
 # 1. 일요일 예약 검사
 # =============================================================================
 print('\n### 1. 일요일 예약 검사 ###')
-sunday_reservations = reservation[reservation['WEEKDAY'] == 'Sunday']
+sunday_reservations = report('SUNDAY', '일요일 예약')
 print(f'일요일 예약: {len(sunday_reservations)}건')
-if len(sunday_reservations) > 0:
-    violations.append({'type': 'SUNDAY', 'count': len(sunday_reservations)})
 
 # =============================================================================
 # 2. 주말 예약 위반 검사 (NOWEEKEND 규칙)
@@ -43,131 +103,90 @@ print('\n### 2. 주말 예약 위반 검사 (NOWEEKEND) ###')
 noweekend_exams = condition_rules[condition_rules['ACTION_CD'] == 'NOWEEKEND']['EXAM_CD'].unique()
 print(f'NOWEEKEND 대상 검사: {list(noweekend_exams)}')
 
-saturday_violations = reservation[
-    (reservation['WEEKDAY'] == 'Saturday') &
-    (reservation['EXAM_CD'].isin(noweekend_exams))
-]
-
-print(f'토요일 NOWEEKEND 위반: {len(saturday_violations)}건')
-if len(saturday_violations) > 0:
-    violations.append({'type': 'NOWEEKEND', 'count': len(saturday_violations)})
-    for _, row in saturday_violations.head(5).iterrows():
-        print(f"  {row['EXAM_CD']}, {row['RESERVATION_DATE'].strftime('%Y-%m-%d')}")
+weekend_violations = report('NOWEEKEND', 'NOWEEKEND 위반')
+print(f'주말 NOWEEKEND 위반: {len(weekend_violations)}건')
+for row in weekend_violations.head(5).itertuples(index=False):
+    print(f"  {row.EXAM_CD}, {row.RESERVATION_DATE.strftime('%Y-%m-%d')}, {row.RULE_ID}")
 
 # =============================================================================
 # 3. 당일 시행 불가 위반 검사 (SAME_DAY_CD=N)
 # =============================================================================
 print('\n### 3. 당일 시행 불가 위반 검사 (SAME_DAY_CD=N) ###')
 
-same_day_not_allowed = relation_rules[relation_rules['SAME_DAY_CD'] == 'N'].copy()
-same_day_violation_count = 0
+# (환자, 날짜) 자기 조인 + 정규화된 규칙 쌍과 merge
+same_day = report('SAME_DAY_NOT_ALLOWED', '당일시행불가 위반')
+for row in same_day.head(5).itertuples(index=False):
+    print(f"  환자:{row.PATIENT_ID}, {row.EXAM_CD} + {row.OTHER_EXAM_CD}, 날짜:{str(row.RESERVATION_DATE)[:10]}")
 
-for patient_id, patient_reservations in reservation.groupby('PATIENT_ID'):
-    for date, date_reservations in patient_reservations.groupby('RESERVATION_DATE'):
-        if len(date_reservations) < 2:
-            continue
-
-        exam_codes = date_reservations['EXAM_CD'].tolist()
-
-        for i, exam_a in enumerate(exam_codes):
-            for exam_b in exam_codes[i+1:]:
-                rule = same_day_not_allowed[
-                    ((same_day_not_allowed['EXAM_A'] == exam_a) & (same_day_not_allowed['EXAM_B'] == exam_b)) |
-                    ((same_day_not_allowed['EXAM_A'] == exam_b) & (same_day_not_allowed['EXAM_B'] == exam_a))
-                ]
-
-                if len(rule) > 0:
-                    same_day_violation_count += 1
-                    if same_day_violation_count <= 5:
-                        print(f"  환자:{patient_id}, {exam_a} + {exam_b}, 날짜:{str(date)[:10]}")
-
-print(f'당일시행불가 위반 총: {same_day_violation_count}건')
-if same_day_violation_count > 0:
-    violations.append({'type': 'SAME_DAY_NOT_ALLOWED', 'count': same_day_violation_count})
+print(f'당일시행불가 위반 총: {len(same_day)}건')
 
 # =============================================================================
 # 4. 검사 간 간격 위반 검사
 # =============================================================================
 print('\n### 4. 검사 간 간격 위반 검사 (GAP) ###')
 
-gap_rules = relation_rules[relation_rules['GAP_VALUE'].notna()].copy()
-gap_rules['GAP_VALUE'] = gap_rules['GAP_VALUE'].astype(int)
-
-gap_violation_count = 0
-
-for patient_id, patient_reservations in reservation.groupby('PATIENT_ID'):
-    patient_reservations = patient_reservations.sort_values('RESERVATION_DATETIME')
+# 규칙 검사만 남겨 (환자, 제약)별 시간 창 조인 - A → B는 GAP, B → A는 REV_GAP
+gap = report('GAP_INTERVAL', '간격 위반')
+reverse_gap_count = int(gap['DETAIL'].str.endswith('(역방향)').sum())
 
-    for i, row1 in patient_reservations.iterrows():
-        for j, row2 in patient_reservations.iterrows():
-            if i >= j:
-                continue
+for row in gap.head(5).itertuples(index=False):
+    print(f"  환자:{row.PATIENT_ID}, {row.EXAM_CD}->{row.OTHER_EXAM_CD}, {row.DETAIL}")
 
-            exam_a = row1['EXAM_CD']
-            exam_b = row2['EXAM_CD']
-
-            rule = gap_rules[(gap_rules['EXAM_A'] == exam_a) & (gap_rules['EXAM_B'] == exam_b)]
-
-            if len(rule) > 0:
-                rule = rule.iloc[0]
-                gap_value = int(rule['GAP_VALUE'])
-                gap_unit = rule['GAP_UNIT']
-
-                date1 = row1['RESERVATION_DATETIME']
-                date2 = row2['RESERVATION_DATETIME']
-                actual_gap = date2 - date1
-
-                if gap_unit == 'D':
-                    required_gap = timedelta(days=gap_value)
-                elif gap_unit == 'H':
-                    required_gap = timedelta(hours=gap_value)
-                elif gap_unit == 'M':
-                    required_gap = timedelta(minutes=gap_value)
-                else:
-                    continue
-
-                if actual_gap < required_gap:
-                    gap_violation_count += 1
-                    if gap_violation_count <= 5:
-                        print(f"  환자:{patient_id}, {exam_a}->{exam_b}, 필요:{gap_value}{gap_unit}, 실제:{actual_gap}")
-
-print(f'간격 위반 총: {gap_violation_count}건')
-if gap_violation_count > 0:
-    violations.append({'type': 'GAP_INTERVAL', 'count': gap_violation_count})
+print(f'역방향(REV_GAP) 위반: {reverse_gap_count}건')
+print(f'간격 위반 총: {len(gap)}건')
 
 # =============================================================================
-# 5. 순서 위반 검사 (SEQ_REQ_YN=Y) - 같은 날 예약에 대해서만 체크
+# 5. 순서 위반 검사 (SEQ_REQ_YN=Y / SAME_DAY_CD=C) - 같은 날 예약에 대해서만 체크
 # =============================================================================
 print('\n### 5. 순서 위반 검사 (SEQ_REQ_YN=Y, 같은 날) ###')
 
-seq_required = relation_rules[relation_rules['SEQ_REQ_YN'] == 'Y'].copy()
-seq_violation_count = 0
+# 같은 날 (앞 예약, 뒤 예약) 쌍 중 뒤 검사 → 앞 검사 순서가 필수인 경우
+sequence = report('SEQ_ORDER', '순서 위반')
+for row in sequence.head(5).itertuples(index=False):
+    print(f"  환자:{row.PATIENT_ID}, 실제:{row.EXAM_CD}->{row.OTHER_EXAM_CD}, {row.DETAIL}")
+print(f'순서 위반 총: {len(sequence)}건')
 
-for patient_id, patient_reservations in reservation.groupby('PATIENT_ID'):
-    # 같은 날짜별로 그룹화
-    for date, date_reservations in patient_reservations.groupby('RESERVATION_DATE'):
-        if len(date_reservations) < 2:
-            continue
+conditional = report('SAME_DAY_CONDITIONAL', '조건부 당일 순서 위반')
+for row in conditional.head(5).itertuples(index=False):
+    print(f"  환자:{row.PATIENT_ID}, 실제:{row.EXAM_CD}->{row.OTHER_EXAM_CD}, {row.DETAIL}")
+print(f'조건부 당일(SAME_DAY_CD=C) 순서 위반: {len(conditional)}건')
 
-        date_reservations = date_reservations.sort_values('RESERVATION_DATETIME')
-        exams_in_order = list(zip(date_reservations['EXAM_CD'], date_reservations['RESERVATION_DATETIME']))
+# =============================================================================
+# 6. 시간 위반 검사 (검사 운영시간, TIMEONLY, 소요시간, 나이)
+# =============================================================================
+print('\n### 6. 시간 위반 검사 (AVAIL_START/END_TIME, TIMEONLY, DURATION_MIN) ###')
 
-        for i, (exam_a, time_a) in enumerate(exams_in_order):
-            for j, (exam_b, time_b) in enumerate(exams_in_order):
-                if i >= j:
-                    continue
+for rule_type, label in [('AVAIL_TIME', '검사 운영시간 위반'), ('TIMEONLY', '시간대 제한 위반'),
+                         ('DURATION', '소요시간 부족'), ('AGE_LIMIT', '나이 제한 위반')]:
+    found = report(rule_type, label)
+    print(f'{label}: {len(found)}건')
+    for row in found.head(5).itertuples(index=False):
+        print(f"  {row.RULE_ID}, {row.EXAM_CD}, {str(row.RESERVATION_DATE)[:10]}, {row.DETAIL}")
 
-                # B -> A 순서가 필수인데, 실제로 A -> B 순서인 경우 체크
-                rule = seq_required[(seq_required['EXAM_A'] == exam_b) & (seq_required['EXAM_B'] == exam_a)]
+# =============================================================================
+# 7. 자원 중복 배정 검사
+# =============================================================================
+print('\n### 7. 자원 중복 배정 검사 (RESOURCE_ID) ###')
 
-                if len(rule) > 0:
-                    seq_violation_count += 1
-                    if seq_violation_count <= 5:
-                        print(f"  환자:{patient_id}, 실제:{exam_a}->{exam_b}, 규칙:{exam_b}가 먼저")
+overlaps = report('RESOURCE_OVERLAP', '자원 중복 배정')
+for row in overlaps.head(5).itertuples(index=False):
+    print(f"  {row.EXAM_CD} + {row.OTHER_EXAM_CD}, {str(row.RESERVATION_DATE)[:10]}, {row.DETAIL}")
+print(f'자원 중복 배정: {len(overlaps)}건')
 
-print(f'순서 위반 총: {seq_violation_count}건')
-if seq_violation_count > 0:
-    violations.append({'type': 'SEQ_ORDER', 'count': seq_violation_count})
+# =============================================================================
+# 8. 규칙 검사 범위
+# =============================================================================
+print('\n### 8. 규칙 검사 범위 ###')
+
+status_counts = coverage['STATUS'].value_counts()
+print(f"검사: {status_counts.get('CHECKED', 0)}개, 미검사: {status_counts.get('SKIPPED', 0)}개, "
+      f"안내성(L1 아님): {status_counts.get('NOT_L1', 0)}개")
+for row in coverage[coverage['STATUS'] == 'SKIPPED'].itertuples(index=False):
+    print(f'  미검사 {row.RULE_ID} ({row.RULE_TYPE}): {row.REASON}')
+if rules.unknown_codes:
+    print(f'코드 정의서에 없는 규칙 값: {len(rules.unknown_codes)}개')
+    for table_name, column, value in rules.unknown_codes:
+        print(f'  {table_name}.{column} = {value}')
 
 # =============================================================================
 # 요약
@@ -177,12 +196,12 @@ print('위반 요약')
 print('='*60)
 
 total_violations = sum(v['count'] for v in violations)
-print(f'1. 일요일 예약: {len(sunday_reservations)}건')
-print(f'2. NOWEEKEND 위반: {len(saturday_violations)}건')
-print(f'3. 당일시행불가 위반: {same_day_violation_count}건')
-print(f'4. 간격 위반: {gap_violation_count}건')
-print(f'5. 순서 위반: {seq_violation_count}건')
+for i, (label, count) in enumerate(summary, 1):
+    print(f'{i}. {label}: {count}건')
+
 print(f'\n총 위반: {total_violations}건')
+if output_path:
+    print(f'위반 레코드 저장: {output_path} ({writer.records}건)')
 
 if total_violations == 0:
     print('\n✓ 모든 규칙을 준수합니다!')
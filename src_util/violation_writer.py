@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+규칙 위반 레코드 스트리밍 저장
+- 검증 결과(VIOLATION_COLUMNS DataFrame)를 찾는 대로 JSONL 또는 Parquet 파일에 이어 쓰기
+- 레코드 1건 = 위반 1건 (VIOLATION_COLUMNS): 규칙 유형/키, 관련 RESERVATION_ID(쌍 규칙은 2건),
+  간격 규칙의 필요/실제 간격(분), POS/OTHER_POS (검증 입력 행 위치, RESERVATION_ID가 없는 데이터용)
+- 요약 건수(RULE_TYPE별)도 같은 레코드 흐름에서 집계 → 파일과 요약이 항상 일치
+- path=None이면 파일 없이 집계만
+- 위반이 0건이어도 close() 후에는 파일이 있음 (JSONL 빈 파일, Parquet 스키마만 있는 빈 파일)
+- parquet 저장은 pyarrow 필요
+"""
+
+import os
+
+import pandas as pd
+
+from rule_engine import VIOLATION_COLUMNS
+
+
+class ViolationWriter:
+    """위반 DataFrame 묶음을 JSONL/Parquet 레코드로 저장 + RULE_TYPE별 건수 집계"""
+
+    def __init__(self, path=None, file_format=None):
+        if file_format is None and path is not None:
+            file_format = 'parquet' if path.endswith('.parquet') else 'jsonl'
+        if path is not None and file_format not in ('jsonl', 'parquet'):
+            raise ValueError(f'지원하지 않는 형식: {file_format}')
+
+        self.path = path
+        self.file_format = file_format
+        self.counts = {}            # RULE_TYPE -> 건수
+        self.records = 0
+        self._file = None
+        self._parquet_writer = None
+        self._closed = False
+
+        if path is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        if path is not None and file_format == 'jsonl':
+            self._file = open(path, 'w', encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, violations):
+        """위반 DataFrame 1묶음 기록 (빈 묶음은 건너뜀)"""
+        if len(violations) == 0:
+            return
+        records = violations[VIOLATION_COLUMNS]
+        for rule_type, n in records['RULE_TYPE'].value_counts(sort=False).items():
+            self.counts[rule_type] = self.counts.get(rule_type, 0) + int(n)
+        self.records += len(records)
+
+        if self._file is not None:
+            # lines=True 출력은 줄바꿈으로 끝나므로 묶음을 그대로 이어 붙임
+            self._file.write(records.to_json(orient='records', lines=True, date_format='iso',
+                                             date_unit='s', force_ascii=False))
+        elif self.path is not None:
+            self._write_parquet(records)
+
+    def _write_parquet(self, records):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self._parquet_writer is None:
+            self._parquet_writer = pq.ParquetWriter(self.path, _parquet_schema(pa))
+        self._parquet_writer.write_table(pa.Table.from_pandas(records, schema=self._parquet_writer.schema,
+                                                              preserve_index=False))
+
+    def close(self):
+        """파일 닫기 → {RULE_TYPE: 건수} (Parquet에 쓴 묶음이 없으면 스키마만 있는 빈 파일 생성)"""
+        if self._closed:
+            return self.counts
+        self._closed = True
+        if self.path is not None and self.file_format == 'parquet' and self._parquet_writer is None:
+            self._write_parquet(pd.DataFrame(columns=VIOLATION_COLUMNS))
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+        return self.counts
+
+
+def _parquet_schema(pa):
+    """묶음마다 타입이 달라지지 않도록 고정 스키마 (쌍이 없는 묶음의 OTHER_* 등)"""
+    string = pa.string()
+    return pa.schema([
+        ('RULE_ID', string), ('RULE_TYPE', string), ('PATIENT_ID', string),
+        ('RESERVATION_DATE', pa.timestamp('ns')), ('EXAM_CD', string), ('RESERVATION_ID', string),
+        ('POS', pa.int64()), ('OTHER_EXAM_CD', string), ('OTHER_RESERVATION_ID', string),
+        ('OTHER_POS', pa.int64()), ('REQUIRED_MIN', pa.float64()), ('ACTUAL_MIN', pa.float64()),
+        ('DETAIL', string),
+    ])
+
+
+def read_violations(path):
+    """저장된 위반 레코드 → DataFrame (JSONL/Parquet)"""
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame(columns=VIOLATION_COLUMNS)     # 위반 0건
+    return pd.read_json(path, lines=True, convert_dates=['RESERVATION_DATE'], dtype={
+        'RESERVATION_ID': str, 'OTHER_RESERVATION_ID': str, 'PATIENT_ID': str})